@@ -0,0 +1,98 @@
+"""
+입장 제어 (admission control) / 부하 차단
+- 라우트(캐시 네임스페이스)별 동시 실행 한도 + 제한된 대기열 + 대기 기한
+- 대기열이 가득 차거나 기한 안에 자리가 나지 않으면 Overloaded → 503 + Retry-After
+- 캐시 히트는 게이트를 거치지 않음 (비싼 계산만 통제)
+- 백그라운드 재계산은 try_acquire로 빈 자리가 있을 때만 실행 (실시간 요청 우선)
+"""
+
+import asyncio
+from collections import deque
+
+
+class Overloaded(Exception):
+    """게이트 포화 - retry_after 초 후 재시도 권장"""
+
+    def __init__(self, gate: str, reason: str, retry_after: int):
+        super().__init__(f"{gate}: {reason}")
+        self.gate = gate
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionGate:
+    """동시 실행 limit개 + 대기 queue_size개, 대기는 최대 timeout초 (FIFO)"""
+
+    def __init__(self, name: str, limit: int, queue_size: int, timeout: float,
+                 retry_after: int = 2):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.waiters = deque()
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.skipped_background = 0
+
+    async def acquire(self):
+        if self.in_flight < self.limit and not self.waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+        if len(self.waiters) >= self.queue_size:
+            self.shed_queue_full += 1
+            raise Overloaded(self.name, "queue full", self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.shed_timeout += 1
+            raise Overloaded(self.name, "queue timeout", self.retry_after)
+        except BaseException:
+            # 클라이언트 연결 종료 등으로 취소됨
+            self._abandon(waiter)
+            raise
+        self.admitted += 1  # release()가 자리를 넘겨줌 (in_flight 유지)
+
+    def _abandon(self, waiter):
+        if waiter.done() and not waiter.cancelled():
+            self.release()  # 자리를 받은 직후 취소 → 다음 대기자에게 넘김
+        else:
+            try:
+                self.waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def try_acquire(self) -> bool:
+        """대기 없이 즉시 자리가 있을 때만 (백그라운드 작업용)"""
+        if self.in_flight < self.limit and not self.waiters:
+            self.in_flight += 1
+            return True
+        self.skipped_background += 1
+        return False
+
+    def release(self):
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "queued": len(self.waiters),
+            "admitted": self.admitted,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_timeout": self.shed_timeout,
+            "skipped_background": self.skipped_background,
+        }
@@ -1,16 +1,64 @@
+import time as time_module
+_PROCESS_START = time_module.perf_counter()
+
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.concurrency import run_in_threadpool
 import sqlite3
 from typing import List, Optional
 import json
-import time as time_module
 import os
 import shutil
+import hashlib
+import contextvars
+from contextlib import asynccontextmanager
+from cache_popularity import PopularityTracker
+from admission import AdmissionGate, Overloaded
+from query_guard import QueryGuard, DisconnectWatchMiddleware, install_guard, detach_request
+from ingest import read_data_version, current_kst_date
+from tx_stream import TransactionBroadcaster, format_event
+from batch_loader import BatchLoader
+from query_plan import ReadPool, QueryFanout
+from query_stats import QueryCounter, install_counter, detach_counter
+from profiling import RequestProfile, SamplingProfiler, ProfiledRoute, profile_call, profile_files
+from request_trace import TraceWriter
+
+# ========== 시작 시간 추적 (콜드 스타트 단계별 소요 시간) ==========
+# r2_utils(boto3) 등 무거운 모듈은 실제로 필요할 때만 import
+STARTUP_TRACE = []
+_last_trace_at = _PROCESS_START
+
+def trace_startup(phase: str):
+    """직전 단계 이후 경과 시간을 기록"""
+    global _last_trace_at
+    now = time_module.perf_counter()
+    STARTUP_TRACE.append({
+        "phase": phase,
+        "ms": round((now - _last_trace_at) * 1000, 1),
+        "at_ms": round((now - _PROCESS_START) * 1000, 1),
+    })
+    _last_trace_at = now
+    print(f"[STARTUP] {phase}: {STARTUP_TRACE[-1]['ms']}ms (t+{STARTUP_TRACE[-1]['at_ms']}ms)", flush=True)
+
+# 준비 상태 (/readyz)
+READY = {"db": False, "cache": False}
+
+trace_startup("imports")
 
 app = FastAPI(title="Sudogwon Insight API")
+app.router.route_class = ProfiledRoute  # ?profile= 요청의 응답 직렬화 시간 측정 (아래 라우트 등록 전에)
+
+# 관리 API(/api/cache/clear, /api/db/reload, /api/admin/*, ?profile=) 공통 secret
+ADMIN_SECRET = os.environ.get("ADMIN_SECRET") or "수집완료"  # 빈 값이면 기본값 (빈 secret 허용 방지)
 
-# ========== 전역 캐시 저장소 (TTL 없음 - 이벤트로 무효화) ==========
+def check_admin(secret: str):
+    if secret != ADMIN_SECRET:
+        raise HTTPException(status_code=403, detail="Invalid secret")
+
+# ========== 전역 캐시 저장소 (이벤트로 stale 표시 + stale-while-revalidate) ==========
+# 값은 CacheEntry (value, created_at, stale)
 CACHE = {
     "search": {},        # key: "검색어:limit"
     "stats": {},         # key: "market"
@@ -19,15 +67,74 @@ CACHE = {
     "transactions": {},  # key: "limit:{n}"
     "apartment": {},     # key: "{apt_id}"
     "history": {},       # key: "{apt_id}:{months}:{area}"
+    "deals": {},         # key: "{apt_id}:{start}:{end}:{area}:{points}:{method}"
+    "bargains": {},      # key: "{lawd_cd|all}:{days}"
+    "leaderboards": {},  # key: "{kind}:{period}:{lawd_cd|all}"
     "region_apartments": {},  # key: "{lawd_cd}:{limit}:{offset}:{sort}"
     "region_stats": {},  # key: "{lawd_cd}"
+    "sitemap": {},       # key: "index" | "shard:{n}" | "ids"
+}
+
+# 네임스페이스별 (soft, hard) 만료(초)
+# - soft 경과 또는 데이터 변경(stale 표시): 즉시 기존 값 응답 + 백그라운드 1회 재계산
+# - hard 경과: 너무 오래된 값은 응답하지 않고 동기 재계산
+CACHE_POLICY = {
+    "search": (3600, 86400),
+    "stats": (21600, 7 * 86400),
+    "stats_regions": (21600, 7 * 86400),
+    "hierarchy": (21600, 7 * 86400),
+    "transactions": (600, 86400),
+    "apartment": (21600, 3 * 86400),
+    "history": (21600, 3 * 86400),
+    "deals": (21600, 3 * 86400),
+    "bargains": (21600, 3 * 86400),
+    "leaderboards": (21600, 3 * 86400),
+    "region_apartments": (21600, 3 * 86400),
+    "region_stats": (21600, 3 * 86400),
+    "sitemap": (21600, 7 * 86400),
 }
 
-def clear_all_cache():
-    """수집 완료 시 호출 - 모든 캐시 클리어"""
+class CacheEntry:
+    __slots__ = ("value", "created_at", "stale")
+
+    def __init__(self, value, created_at: float = None, stale: bool = False):
+        self.value = value
+        self.created_at = created_at or time_module.time()
+        self.stale = stale
+
+    def age(self) -> float:
+        return time_module.time() - self.created_at
+
+_cache_version = 0  # 저장될 때마다 증가 (스냅샷 변경 감지용)
+
+def store_cache(namespace: str, key: str, value, created_at: float = None):
+    global _cache_version
+    CACHE[namespace][key] = CacheEntry(value, created_at)
+    _cache_version += 1
+
+def clear_all_cache(hard: bool = False, event: str = "invalidate", broadcast: bool = True):
+    """
+    수집 완료/DB 교체 시 호출
+    - 기본: 모든 엔트리를 stale로 표시 (계속 응답하면서 백그라운드 갱신)
+    - hard=True: 실제로 비움 (DB 교체: 이전 DB로 계산한 값을 다시 응답하지 않도록)
+    - broadcast: 공유 캐시 사용 시 다른 워커에도 전파 (버스에서 받은 이벤트는 False)
+    """
+    global _cache_version
     for cache_name, cache in CACHE.items():
-        cache.clear()
-    print(f"[CACHE] All caches cleared at {time_module.time()}")
+        if hard:
+            cache.clear()
+        else:
+            for entry in list(cache.values()):
+                entry.stale = True
+    _cache_version += 1
+    # 데이터가 바뀌었으므로 세대 갱신 (이전 세대 스냅샷은 더 이상 복원되지 않음)
+    refresh_db_generation()
+    if broadcast and SHARED is not None:
+        publish_cache_event("clear" if hard else event)
+    action = "cleared" if hard else "marked stale"
+    print(f"[CACHE] All caches {action} at {time_module.time()} (generation: {DB_GENERATION})")
+    schedule_cache_rewarm()
+    schedule_stream_poll()
 
 def get_cache_stats():
     """캐시 통계 반환"""
@@ -36,6 +143,607 @@ def get_cache_stats():
         stats[name] = len(cache)
     return stats
 
+def get_stale_stats():
+    """네임스페이스별 stale 엔트리 수"""
+    return {name: sum(1 for e in list(cache.values()) if e.stale) for name, cache in CACHE.items()}
+
+# ========== 캐시 조회 + 인기 키 재적재 ==========
+CACHE_WARM_TOP_N = int(os.environ.get("CACHE_WARM_TOP_N", "50"))
+CACHE_WARM_CONCURRENCY = int(os.environ.get("CACHE_WARM_CONCURRENCY", "2"))
+CACHE_WARM_YIELD_SEC = 0.02  # 키 하나 채울 때마다 양보 (실시간 요청 우선)
+CACHE_WARM_NAMESPACES = ["apartment", "history", "search", "region_apartments", "bargains", "leaderboards"]
+
+POPULARITY = PopularityTracker(top_n=CACHE_WARM_TOP_N)
+# 네임스페이스별 재계산 함수: 캐시 키(str) → 결과 (각 API 정의부에서 등록)
+CACHE_LOADERS = {}
+_warm_task = None
+_refreshing = set()  # 백그라운드 재계산 중인 (namespace, key)
+
+# ========== 입장 제어 (캐시 미스 계산 경로만 통제, 히트는 통과) ==========
+# 크롤러/사이트맵 생성기가 수천 개 상세 페이지를 긁을 때 비싼 미스가 쌓여
+# 가벼운 라우트까지 느려지는 것을 방지: 라우트별 (동시 실행, 대기열, 대기 기한 초)
+ADMISSION_LIMITS = {
+    "apartment": (4, 32, 3.0),
+    "history": (4, 32, 3.0),
+    "deals": (4, 32, 3.0),
+    "bargains": (1, 8, 10.0),
+    "leaderboards": (2, 16, 3.0),
+    "search": (4, 16, 2.0),
+    "transactions": (2, 16, 3.0),
+    "region_apartments": (2, 16, 3.0),
+    "region_stats": (2, 8, 5.0),
+    "sitemap": (2, 16, 5.0),
+    "stats": (1, 8, 10.0),
+    "stats_regions": (1, 8, 10.0),
+    "hierarchy": (1, 8, 10.0),
+    # 캐시 없는 라우트
+    "regions": (1, 8, 5.0),
+    "apartment_transactions": (4, 32, 3.0),
+    "compare": (2, 16, 3.0),
+}
+ADMISSION_RETRY_AFTER = int(os.environ.get("ADMISSION_RETRY_AFTER", "2"))
+ADMISSION = {
+    name: AdmissionGate(name, limit, queue_size, timeout, ADMISSION_RETRY_AFTER)
+    for name, (limit, queue_size, timeout) in ADMISSION_LIMITS.items()
+}
+
+@asynccontextmanager
+async def admission(name: str):
+    """게이트 통과 후 실행, 포화 시 503 + Retry-After"""
+    gate = ADMISSION[name]
+    try:
+        await gate.acquire()
+    except Overloaded as e:
+        print(f"[ADMISSION] Shed {name}: {e.reason}", flush=True)
+        raise HTTPException(
+            status_code=503,
+            detail=f"Server busy ({name}), retry later",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    try:
+        yield
+    finally:
+        gate.release()
+
+# ========== 쿼리 시간 예산 (기한 초과/클라이언트 이탈 시 SQLite 쿼리 중단) ==========
+QUERY_BUDGET_SEC = float(os.environ.get("QUERY_BUDGET_SEC", "5"))
+QUERY_BUDGETS = {
+    "apartment": 3.0,
+    "history": 3.0,
+    "deals": 3.0,
+    "bargains": 20.0,
+    "leaderboards": 3.0,
+    "search": 2.0,
+    "transactions": 2.0,
+    "region_apartments": 3.0,
+    "region_stats": 5.0,
+    "apartment_transactions": 2.0,
+    "compare": 3.0,
+    # 전체 집계 (첫 화면용, 한 번 계산되면 캐시)
+    "stats": 20.0,
+    "stats_regions": 30.0,
+    "hierarchy": 30.0,
+    "regions": 10.0,
+    "sitemap": 10.0,
+}
+QUERY_ABORTS = {}  # name -> {"timeout": n, "disconnect": n}
+
+async def run_query(name: str, func, *args):
+    """
+    스레드풀에서 DB 작업 실행 (get_db_connection이 기한 검사 handler 설치)
+    - 기한 초과: 504
+    - 클라이언트 연결 종료: 쿼리 즉시 중단 (응답은 전달되지 않음)
+    """
+    with QueryGuard(name, QUERY_BUDGETS.get(name, QUERY_BUDGET_SEC)) as guard:
+        try:
+            result = await run_in_threadpool(profile_call, func, *args)
+        except Exception:
+            if guard.aborted is None:
+                raise
+        # 로더가 중단 오류를 삼키고 일부 결과를 반환했어도 캐시하지 않도록 중단으로 처리
+        if guard.aborted is None:
+            return result
+
+    counts = QUERY_ABORTS.setdefault(name, {"timeout": 0, "disconnect": 0})
+    counts[guard.aborted] += 1
+    print(f"[QUERY] Aborted {name} ({guard.aborted}, budget {guard.budget}s)", flush=True)
+    if guard.aborted == "timeout":
+        raise HTTPException(status_code=504, detail=f"Query time budget exceeded ({name})")
+    raise HTTPException(status_code=499, detail="Client disconnected")
+
+# ========== 단건 조회 묶음 처리 (상세/이력: 몇 ms 안에 들어온 요청을 apt_id IN (...) 한 번으로) ==========
+BATCH_WINDOW_MS = float(os.environ.get("BATCH_WINDOW_MS", "2"))
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "64"))
+
+# ========== 요청 내 독립 쿼리 병렬 실행 (검색/상세의 서로 무관한 조회) ==========
+QUERY_PARALLELISM = int(os.environ.get("QUERY_PARALLELISM", "4"))     # 요청당 동시 쿼리 수
+QUERY_FANOUT_WORKERS = int(os.environ.get("QUERY_FANOUT_WORKERS", "8"))  # 전체 동시 쿼리 수
+FANOUT = QueryFanout(ReadPool(max_idle=QUERY_FANOUT_WORKERS * 2), QUERY_FANOUT_WORKERS,
+                     prepare=lambda conn: prepare_connection(conn), runner=profile_call)
+
+def parallel_reads(tasks: dict) -> dict:
+    """{이름: fn(cursor)}를 읽기 전용 커넥션에서 동시에 실행 → {이름: 결과}"""
+    return FANOUT.parallel_reads(DB_PATH, DB_GENERATION, tasks, QUERY_PARALLELISM)
+
+# 요청별 캐시 상태 (미들웨어가 X-Cache / Age 헤더로 내보냄)
+_cache_info = contextvars.ContextVar("cache_info", default=None)
+
+def _set_cache_info(status: str, age: float):
+    info = _cache_info.get()
+    if info is not None:
+        info["status"] = status
+        info["age"] = int(age)
+
+async def cached(namespace: str, key: str, loader, *args):
+    """
+    캐시 조회 (stale-while-revalidate)
+    - fresh: 그대로 응답
+    - stale/soft 만료: 그대로 응답 + 키당 1회 백그라운드 재계산
+    - 없음/hard 만료: 공유 캐시(다른 워커가 계산한 값) → 없으면 스레드풀에서 계산 후 저장
+    """
+    soft_ttl, hard_ttl = CACHE_POLICY[namespace]
+    entry = CACHE[namespace].get(key)
+    if (entry is None or entry.age() >= hard_ttl) and SHARED is not None:
+        shared = await run_in_threadpool(SHARED.get, namespace, key, cache_generation(namespace))
+        if shared is not None:
+            value, created_at = shared
+            entry = CacheEntry(value, created_at, stale=created_at <= _invalidated_at)
+            CACHE[namespace][key] = entry
+
+    if entry is not None:
+        age = entry.age()
+        if age < hard_ttl:
+            POPULARITY.record(namespace, key)
+            if entry.stale or age >= soft_ttl:
+                _set_cache_info("STALE", age)
+                schedule_cache_refresh(namespace, key)
+            else:
+                _set_cache_info("HIT", age)
+            return entry.value
+
+    async with admission(namespace):
+        # 대기하는 동안 같은 키를 다른 요청이 채웠으면 그 값을 사용
+        entry = CACHE[namespace].get(key)
+        if entry is not None and entry.age() < hard_ttl:
+            POPULARITY.record(namespace, key)
+            _set_cache_info("HIT", entry.age())
+            return entry.value
+        # 404 등 예외는 기록/저장하지 않음
+        result, created_at = await run_query(namespace, compute_shared, namespace, key, loader, *args)
+    store_cache(namespace, key, result, created_at)
+    POPULARITY.record(namespace, key)
+    _set_cache_info("MISS", 0)
+    return result
+
+def compute_shared(namespace: str, key: str, loader, *args):
+    """(스레드풀) 계산 후 공유 캐시에도 기록 → (value, created_at)"""
+    generation = cache_generation(namespace)  # 계산 중 자정이 지나도 계산 시작 기준일의 세대로 기록
+    value = loader(*args)
+    created_at = time_module.time()
+    if SHARED is not None:
+        try:
+            SHARED.put(namespace, key, value, generation, created_at)
+        except sqlite3.Error as e:
+            print(f"[CACHE] Shared cache write failed ({namespace}:{key}): {e}", flush=True)
+    return value, created_at
+
+def fetch_fresh_shared(namespace: str, key: str):
+    """(스레드풀) 다른 워커가 무효화 이후 이미 다시 계산한 값 → (value, created_at) 또는 None"""
+    shared = SHARED.get(namespace, key, cache_generation(namespace))
+    if shared is None or shared[1] <= _invalidated_at:
+        return None
+    if time_module.time() - shared[1] >= CACHE_POLICY[namespace][0]:
+        return None
+    return shared
+
+async def refresh_cache_entry(namespace: str, key: str) -> bool:
+    """
+    캐시 키 하나를 다시 계산 (실패 시 기존 값 유지, 404면 제거)
+    게이트에 빈 자리가 없으면 건너뜀 (stale 값 유지, 다음 접근 시 재시도)
+    """
+    try:
+        shared = None
+        if SHARED is not None:
+            shared = await run_in_threadpool(fetch_fresh_shared, namespace, key)
+        if shared is not None:
+            value, created_at = shared
+        else:
+            gate = ADMISSION[namespace]
+            if not gate.try_acquire():
+                return False
+            try:
+                value, created_at = await run_query(
+                    namespace, compute_shared, namespace, key, CACHE_LOADERS[namespace], key
+                )
+            finally:
+                gate.release()
+        store_cache(namespace, key, value, created_at)
+        return True
+    except HTTPException as e:
+        if e.status_code == 404:
+            CACHE[namespace].pop(key, None)
+    except Exception as e:
+        print(f"[CACHE] Refresh failed ({namespace}:{key}): {e}", flush=True)
+    return False
+
+def schedule_cache_refresh(namespace: str, key: str):
+    """같은 키에 대한 재계산은 동시에 하나만"""
+    import asyncio
+    token = (namespace, key)
+    if token in _refreshing:
+        return
+    _refreshing.add(token)
+
+    async def run():
+        # 요청 컨텍스트에서 생성된 태스크: 원 요청의 연결 종료/헤더와 분리
+        detach_request()
+        detach_counter()
+        _cache_info.set(None)
+        try:
+            await refresh_cache_entry(namespace, key)
+        finally:
+            _refreshing.discard(token)
+
+    asyncio.get_running_loop().create_task(run())
+
+async def rewarm_popular_keys(namespaces: list = None):
+    """무효화 후 네임스페이스별 인기 상위 N개 키를 낮은 우선순위로 재계산 (나머지는 접근 시 갱신)"""
+    import asyncio
+    detach_request()
+    detach_counter()
+    _cache_info.set(None)
+    start = time_module.time()
+    semaphore = asyncio.Semaphore(CACHE_WARM_CONCURRENCY)
+    filled = 0
+
+    async def warm(namespace, key):
+        nonlocal filled
+        async with semaphore:
+            entry = CACHE[namespace].get(key)
+            if entry is not None and not entry.stale:
+                return  # 실시간 요청/백그라운드 갱신이 먼저 채움
+            token = (namespace, key)
+            if token in _refreshing:
+                return
+            _refreshing.add(token)
+            try:
+                if await refresh_cache_entry(namespace, key):
+                    filled += 1
+            finally:
+                _refreshing.discard(token)
+            await asyncio.sleep(CACHE_WARM_YIELD_SEC)
+
+    # 네임스페이스를 번갈아가며 인기 순으로 (한 네임스페이스가 독점하지 않도록)
+    ranked = {ns: POPULARITY.top(ns) for ns in (namespaces or CACHE_WARM_NAMESPACES) if ns in CACHE_LOADERS}
+    order = []
+    for rank in range(CACHE_WARM_TOP_N):
+        for ns, keys in ranked.items():
+            if rank < len(keys):
+                order.append((ns, keys[rank]))
+
+    await asyncio.gather(*(warm(ns, key) for ns, key in order))
+    if order:
+        print(f"[CACHE] Re-warmed {filled}/{len(order)} popular keys in {time_module.time() - start:.2f}s", flush=True)
+
+def schedule_cache_rewarm(namespaces: list = None):
+    """무효화 직후 인기 키 재적재 예약 (진행 중인 이전 작업은 취소)"""
+    import asyncio
+    global _warm_task
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    if _warm_task and not _warm_task.done():
+        _warm_task.cancel()
+    _warm_task = loop.create_task(rewarm_popular_keys(namespaces))
+
+# ========== 워커 간 공유 캐시 + 무효화 버스 (uvicorn --workers N) ==========
+# 워커마다 CACHE(L1)가 따로 있으므로 계산 결과를 SQLite 파일(L2)로 공유하고,
+# 무효화/DB 교체는 이벤트로 기록해 각 워커가 폴링으로 반영
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
+SHARED_CACHE_MODE = os.environ.get("SHARED_CACHE", "auto")  # auto(워커 2개 이상) | 1 | 0
+SHARED_CACHE_PATH = os.environ.get("SHARED_CACHE_PATH", "cache_shared.db")
+CACHE_BUS_POLL_SEC = float(os.environ.get("CACHE_BUS_POLL_SEC", "1.0"))
+
+SHARED = None            # SharedCache (비활성이면 None)
+_last_event_id = 0       # 이 워커가 반영한 마지막 이벤트
+_invalidated_at = 0.0    # 마지막 무효화 시각 (이전에 계산된 공유 엔트리는 stale)
+
+def shared_cache_enabled() -> bool:
+    if SHARED_CACHE_MODE == "auto":
+        return WEB_CONCURRENCY > 1
+    return SHARED_CACHE_MODE == "1"
+
+def init_shared_cache():
+    """공유 캐시 열기 + 이미 지난 이벤트는 건너뜀"""
+    global SHARED, _last_event_id, _invalidated_at
+    from shared_cache import SharedCache
+    SHARED = SharedCache(SHARED_CACHE_PATH)
+    _last_event_id, _invalidated_at = SHARED.last_event()
+    print(f"[CACHE] Shared cache enabled: {SHARED_CACHE_PATH} (worker pid {os.getpid()})", flush=True)
+
+def publish_cache_event(kind: str):
+    """무효화 이벤트 기록 (자기 이벤트는 이미 반영했으므로 커서를 앞으로)"""
+    global _last_event_id, _invalidated_at
+    try:
+        event_id, created_at = SHARED.publish(kind, os.getpid())
+        _last_event_id = max(_last_event_id, event_id)
+        _invalidated_at = max(_invalidated_at, created_at)
+    except sqlite3.Error as e:
+        print(f"[CACHE] Event publish failed ({kind}): {e}", flush=True)
+
+async def cache_bus_loop():
+    """다른 워커의 무효화/DB 교체 이벤트를 주기적으로 반영"""
+    import asyncio
+    global _last_event_id, _invalidated_at
+    while True:
+        await asyncio.sleep(CACHE_BUS_POLL_SEC)
+        try:
+            events = await asyncio.to_thread(SHARED.events_since, _last_event_id)
+        except sqlite3.Error as e:
+            print(f"[CACHE] Event poll failed: {e}", flush=True)
+            continue
+        if not events:
+            continue
+        _last_event_id = events[-1][0]
+        _invalidated_at = max(_invalidated_at, events[-1][3])
+        foreign = [kind for _, kind, origin, _ in events if origin != os.getpid()]
+        if foreign:
+            # 여러 이벤트가 쌓였어도 한 번만 반영 (clear가 하나라도 있으면 hard)
+            print(f"[CACHE] Applying events from other workers: {foreign}", flush=True)
+            clear_all_cache(hard="clear" in foreign, broadcast=False)
+
+# ========== 캐시 스냅샷 (재시작/콜드 스타트 시 캐시 복원) ==========
+CACHE_SNAPSHOT_DIR = os.environ.get("CACHE_SNAPSHOT_DIR", "cache_snapshot")
+CACHE_SNAPSHOT_INTERVAL = int(os.environ.get("CACHE_SNAPSHOT_INTERVAL", "60"))  # 초
+# 서버 준비 전에 동기로 복원할 무거운 네임스페이스 (나머지는 백그라운드 복원)
+CACHE_HOT_NAMESPACES = ["stats_regions", "hierarchy", "stats", "transactions"]
+
+DB_GENERATION = None
+_last_snapshot_fingerprint = None
+
+def compute_db_generation() -> str:
+    """DB 세대 식별자 (스냅샷 manifest 우선, 없으면 파일 크기+수정시각)"""
+    manifest_path = DB_PATH + ".manifest.json"
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)["generation"]
+        except Exception:
+            pass
+    if not os.path.exists(DB_PATH):
+        return "missing"
+    st = os.stat(DB_PATH)
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+def refresh_db_generation():
+    global DB_GENERATION
+    DB_GENERATION = compute_db_generation()
+    refresh_db_mode()
+    refresh_data_version()
+    return DB_GENERATION
+
+# ========== 데이터 버전 (ETag / Last-Modified 기준) ==========
+# 수집기가 새 거래를 저장할 때마다 data_meta.data_version 증가 (ingest.bump_data_version)
+# DB 교체/캐시 무효화 시 다시 읽음
+DATA_VERSION = 0
+DATA_UPDATED_AT = None  # datetime (UTC)
+
+def refresh_data_version():
+    global DATA_VERSION, DATA_UPDATED_AT
+    from datetime import datetime, timezone
+    version, updated_at = 0, None
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            version, updated_at = read_data_version(conn.cursor())
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"[DB] Data version read failed: {e}", flush=True)
+    if updated_at:
+        DATA_UPDATED_AT = datetime.strptime(updated_at, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    elif os.path.exists(DB_PATH):
+        DATA_UPDATED_AT = datetime.fromtimestamp(int(os.path.getmtime(DB_PATH)), timezone.utc)
+    else:
+        DATA_UPDATED_AT = None
+    DATA_VERSION = version
+    refresh_as_of()
+    return DATA_VERSION
+
+# ========== 데이터 기준일 (최근 30일/1년/N개월 등 상대 기간의 기준 날짜) ==========
+# 쿼리마다 date('now')를 쓰면 자정을 넘긴 캐시 값과 새로 계산한 값의 기준이 달라짐
+# → 데이터 버전 갱신 시 한국 날짜로 고정하고 모든 상대 기간 쿼리에 파라미터로 전달
+# → 자정에는 날짜 의존 네임스페이스만 stale 표시 + 인기 키 재계산 (전체 무효화 없음)
+DATE_DEPENDENT_NAMESPACES = ["stats", "stats_regions", "apartment", "history", "bargains", "leaderboards"]
+AS_OF_DATE = None         # "YYYY-MM-DD" (KST)
+AS_OF_CHANGED_AT = None   # 자정 전환 시각 (UTC datetime, Last-Modified용)
+
+def as_of_date() -> str:
+    """상대 기간 쿼리 기준일 (로더는 시작 시 한 번 읽어 한 응답 안에서 일관되게 사용)"""
+    return AS_OF_DATE or current_kst_date()
+
+def refresh_as_of():
+    global AS_OF_DATE
+    AS_OF_DATE = current_kst_date()
+    return AS_OF_DATE
+
+def cache_generation(namespace: str) -> str:
+    """공유 캐시 세대: 날짜 의존 네임스페이스는 기준일이 바뀌면 다른 세대"""
+    if namespace in DATE_DEPENDENT_NAMESPACES:
+        return f"{DB_GENERATION}@{as_of_date()}"
+    return DB_GENERATION
+
+def roll_as_of() -> bool:
+    """날짜가 바뀌었으면 기준일 전환 + 날짜 의존 캐시만 stale 처리 후 재계산 예약"""
+    global AS_OF_DATE, AS_OF_CHANGED_AT, _cache_version
+    from datetime import datetime, timezone
+    today = current_kst_date()
+    if today == AS_OF_DATE:
+        return False
+    AS_OF_DATE = today
+    AS_OF_CHANGED_AT = datetime.now(timezone.utc).replace(microsecond=0)
+    marked = 0
+    for namespace in DATE_DEPENDENT_NAMESPACES:
+        for entry in list(CACHE[namespace].values()):
+            entry.stale = True
+            marked += 1
+    _cache_version += 1
+    print(f"[CACHE] As-of date rolled to {today}: {marked} date-dependent entries marked stale", flush=True)
+    schedule_cache_rewarm(DATE_DEPENDENT_NAMESPACES)
+    return True
+
+async def as_of_rollover_loop():
+    """KST 자정마다 기준일 전환"""
+    import asyncio
+    from datetime import datetime, timezone, timedelta
+    kst = timezone(timedelta(hours=9))
+    while True:
+        now = datetime.now(kst)
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        await asyncio.sleep((midnight - now).total_seconds() + 1)
+        try:
+            roll_as_of()
+        except Exception as e:
+            print(f"[CACHE] As-of rollover failed: {e}", flush=True)
+
+def data_last_modified():
+    """Last-Modified: 데이터 변경과 기준일 전환 중 늦은 쪽"""
+    if AS_OF_CHANGED_AT is not None and (DATA_UPDATED_AT is None or AS_OF_CHANGED_AT > DATA_UPDATED_AT):
+        return AS_OF_CHANGED_AT
+    return DATA_UPDATED_AT
+
+# ========== 핫 서브셋 모드 (전체 DB 다운로드 전 부분 데이터 서빙) ==========
+DB_MODE = "full"  # "full" | "hot"
+HOT_SUBSET_INFO = {}
+
+def refresh_db_mode():
+    """snapshot_info 테이블로 핫 서브셋 여부 판별"""
+    global DB_MODE, HOT_SUBSET_INFO
+    mode, info = "full", {}
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            has_info = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'snapshot_info'"
+            ).fetchone()
+            if has_info:
+                info = dict(conn.execute("SELECT key, value FROM snapshot_info").fetchall())
+                if info.get("kind") == "hot":
+                    mode = "hot"
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"[DB] Mode detection failed: {e}", flush=True)
+    DB_MODE, HOT_SUBSET_INFO = mode, info if mode == "hot" else {}
+    return DB_MODE
+
+CACHE_SNAPSHOT_FORMAT = 2  # entries: {key: [value, created_at, stale]}
+
+def _cache_fingerprint():
+    return (_cache_version, DB_GENERATION)
+
+_snapshot_writer_lock = None  # 스냅샷 기록 담당 워커의 잠금 파일 (프로세스 종료 시 자동 해제)
+
+def acquire_snapshot_writer() -> bool:
+    """
+    다중 워커(공유 캐시 사용)면 스냅샷은 잠금 파일을 잡은 한 워커만 기록
+    - 같은 스냅샷을 워커마다 동시에 쓰지 않도록 (담당 워커가 죽으면 다음 주기에 다른 워커가 이어받음)
+    """
+    global _snapshot_writer_lock
+    if SHARED is None or _snapshot_writer_lock is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:
+        return True  # 잠금 미지원 플랫폼: 임시 파일 이름이 워커별이라 교체는 안전
+    os.makedirs(CACHE_SNAPSHOT_DIR, exist_ok=True)
+    lock_file = open(os.path.join(CACHE_SNAPSHOT_DIR, ".writer.lock"), "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _snapshot_writer_lock = lock_file
+    print(f"[CACHE] Snapshot writer: worker pid {os.getpid()}", flush=True)
+    return True
+
+def save_cache_snapshot(namespaces: dict, generation: str):
+    """네임스페이스별 JSON 파일로 저장 (워커별 tmp → rename으로 원자적 교체)"""
+    os.makedirs(CACHE_SNAPSHOT_DIR, exist_ok=True)
+    for name, entries in namespaces.items():
+        path = os.path.join(CACHE_SNAPSHOT_DIR, f"{name}.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        data = {
+            "format": CACHE_SNAPSHOT_FORMAT,
+            "generation": generation,
+            "as_of": AS_OF_DATE,
+            "entries": {k: [e.value, e.created_at, e.stale] for k, e in entries.items()},
+        }
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+def load_cache_snapshot(names: list, generation: str) -> int:
+    """세대가 일치하는 스냅샷만 CACHE에 복원, 복원된 엔트리 수 반환"""
+    restored = 0
+    for name in names:
+        path = os.path.join(CACHE_SNAPSHOT_DIR, f"{name}.json")
+        if name not in CACHE or not os.path.exists(path):
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[CACHE] Snapshot load failed ({name}): {e}")
+            continue
+        if data.get("format") != CACHE_SNAPSHOT_FORMAT or data.get("generation") != generation:
+            continue
+        # 다른 기준일에 계산된 날짜 의존 값은 stale로 복원 (응답은 하되 백그라운드 재계산)
+        rolled = name in DATE_DEPENDENT_NAMESPACES and data.get("as_of") != AS_OF_DATE
+        for key, (value, created_at, stale) in data.get("entries", {}).items():
+            CACHE[name].setdefault(key, CacheEntry(value, created_at, stale or rolled))
+            restored += 1
+    return restored
+
+async def snapshot_cache_now():
+    """현재 캐시를 디스크에 저장 (변경이 없으면 생략)"""
+    global _last_snapshot_fingerprint
+    import asyncio
+    fingerprint = _cache_fingerprint()
+    if fingerprint == _last_snapshot_fingerprint or not acquire_snapshot_writer():
+        return False
+    # dict.copy()는 GIL 하에서 원자적 → 직렬화는 스레드에서
+    namespaces = {name: cache.copy() for name, cache in CACHE.items()}
+    await asyncio.to_thread(save_cache_snapshot, namespaces, DB_GENERATION)
+    _last_snapshot_fingerprint = fingerprint
+    return True
+
+async def cache_snapshot_loop():
+    """주기적 캐시 스냅샷"""
+    import asyncio
+    while True:
+        await asyncio.sleep(CACHE_SNAPSHOT_INTERVAL)
+        try:
+            if await snapshot_cache_now():
+                print(f"[CACHE] Snapshot saved ({sum(get_cache_stats().values())} entries)", flush=True)
+        except Exception as e:
+            print(f"[CACHE] Snapshot failed: {e}", flush=True)
+
+# 요청별 SQL 문장 수 계측 (X-Query-Count / X-Query-Steps 헤더, 기본 꺼짐)
+QUERY_STATS = os.environ.get("QUERY_STATS", "0") == "1"
+
+# 익명화 요청 트레이스 (GET 요청 JSONL, replay_trace.py로 재생) - TRACE_LOG 경로 지정 시에만
+TRACE_LOG = os.environ.get("TRACE_LOG", "")
+TRACE_SAMPLE = float(os.environ.get("TRACE_SAMPLE", "1.0"))
+TRACE_EXCLUDE_PREFIXES = ("/api/stream/", "/api/admin/", "/healthz", "/readyz")
+TRACE = TraceWriter(TRACE_LOG, TRACE_SAMPLE) if TRACE_LOG else None
+
 # 요청 타이밍 미들웨어 - 모든 요청의 시작/종료 시간 기록
 class TimingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
@@ -45,20 +753,150 @@ class TimingMiddleware(BaseHTTPMiddleware):
         query = str(request.url.query)[:50] if request.url.query else ""
         print(f"[REQ START] {method} {path}?{query} time={start:.3f}", flush=True)
 
-        response = await call_next(request)
+        cache_info = {}
+        _cache_info.set(cache_info)
+        counter = QueryCounter() if QUERY_STATS else None
+        if counter is not None:
+            with counter:
+                response = await call_next(request)
+            # 이 요청이 실행한 SQL 문장 수 / VM 명령 수 (캐시 히트면 0)
+            response.headers["X-Query-Count"] = str(counter.statements)
+            response.headers["X-Query-Steps"] = str(counter.vm_steps)
+        else:
+            response = await call_next(request)
+        if cache_info:
+            # 캐시 상태/나이: HIT(fresh) | STALE(응답 후 백그라운드 갱신) | MISS
+            response.headers["X-Cache"] = cache_info["status"]
+            response.headers["Age"] = str(cache_info["age"])
+        if DB_MODE == "hot":
+            # 핫 서브셋 서빙 중: 최근 N개월 데이터만 있음을 표시
+            response.headers["X-Data-Partial"] = "true"
+            response.headers["X-Data-Since"] = HOT_SUBSET_INFO.get("cutoff", "")
 
         elapsed = time_module.time() - start
-        print(f"[REQ END] {method} {path} elapsed={elapsed:.3f}s", flush=True)
+        queries = f" queries={counter.statements} steps={counter.vm_steps}" if counter is not None else ""
+        print(f"[REQ END] {method} {path} elapsed={elapsed:.3f}s{queries}", flush=True)
+        if TRACE is not None and method == "GET" and not path.startswith(TRACE_EXCLUDE_PREFIXES):
+            route = request.scope.get("route")
+            TRACE.record(start, path, request.url.query, getattr(route, "path", path),
+                         response.status_code, elapsed, cache_info.get("status", ""))
         return response
 
+# ========== 조건부 응답 (ETag / Last-Modified → 304) ==========
+# 데이터에서만 파생되는 GET 응답: 데이터 버전 + DB 세대 + 요청 키로 강한 ETag 생성
+# 일치하면 엔드포인트를 실행하지 않고 바로 304
+CONDITIONAL_EXCLUDE = {
+    "/api/monitor", "/api/progress", "/api/cache/stats", "/api/admission/stats", "/api/batch/stats",
+}
+CONDITIONAL_EXCLUDE_PREFIXES = ("/api/stream/", "/api/admin/")
+
+def data_etag(path: str, query: str) -> str:
+    key = "&".join(sorted(query.split("&"))) if query else ""
+    raw = f"{DATA_VERSION}:{DB_GENERATION}:{AS_OF_DATE}:{path}?{key}"
+    return '"v' + str(DATA_VERSION) + "-" + hashlib.md5(raw.encode()).hexdigest()[:16] + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    If-None-Match에 이 ETag가 있는지
+    - "*"는 무시: 엔드포인트 실행 전에는 표현이 있는지(200인지 404/에러인지) 알 수 없음
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return etag in [tag.strip() for tag in if_none_match.split(",")]
+
+def not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match 우선, 없으면 If-Modified-Since (초 단위) 비교"""
+    if request.headers.get("if-none-match") is not None:
+        return etag_matches(request, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = data_last_modified()
+    if if_modified_since and last_modified is not None:
+        from email.utils import parsedate_to_datetime
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+class ConditionalMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        path = request.url.path
+        if request.method != "GET" or not path.startswith("/api/") or path in CONDITIONAL_EXCLUDE \
+                or path.startswith(CONDITIONAL_EXCLUDE_PREFIXES):
+            return await call_next(request)
+
+        from email.utils import format_datetime
+        etag = data_etag(path, request.url.query)
+        headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
+        last_modified = data_last_modified()
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+        # 같은 ETag는 이 키의 200 응답에만 붙여 보냄 → 일치하면 엔드포인트 실행 없이 304
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        response = await call_next(request)
+        cache_info = _cache_info.get() or {}
+        # STALE 응답은 이전 데이터로 계산된 값 → 현재 버전 ETag를 붙이면 갱신 후에도 304가 됨
+        if response.status_code == 200 and cache_info.get("status") != "STALE" \
+                and "etag" not in response.headers:
+            # If-Modified-Since는 실제로 ETag를 붙일 200 응답일 때만 비교 (404/에러가 304로 바뀌지 않게)
+            if not_modified(request, etag):
+                return Response(status_code=304, headers=headers)
+            response.headers.update(headers)
+        return response
+
+# ========== 프로파일링 (관리자 전용: ?profile=<secret> 요청 단위 cProfile) ==========
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", "50"))
+PROFILE_SAMPLE_MAX_SEC = 300
+_sampler = None
+
+class ProfileMiddleware(BaseHTTPMiddleware):
+    """
+    profile 파라미터가 관리 secret과 같으면 요청 전체를 cProfile로 측정해 PROFILE_DIR에 저장
+    - 응답에 X-Profile-Id / X-Profile-Summary 헤더 (보고서: /api/admin/profiles/{id})
+    - 측정 요청은 한 번에 하나씩 (3.12+는 cProfile이 프로세스에 하나만 켜짐)
+    """
+    async def dispatch(self, request: Request, call_next):
+        if request.query_params.get("profile") != ADMIN_SECRET:
+            return await call_next(request)
+        import asyncio
+        global _profile_lock
+        if _profile_lock is None:
+            _profile_lock = asyncio.Lock()
+        async with _profile_lock:
+            query = "&".join(f"{k}={v}" for k, v in request.query_params.multi_items() if k != "profile")
+            label = f"{request.method} {request.url.path}" + (f"?{query}" if query else "")
+            with RequestProfile(label) as profile:
+                response = await call_next(request)
+                # 스트리밍 본문 전송까지 wall 시간에 포함
+                body = b"".join([chunk async for chunk in response.body_iterator])
+            profile_id = await run_in_threadpool(profile.save, PROFILE_DIR, PROFILE_KEEP)
+        summary = profile.summary(profile.stats())
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+        headers["X-Profile-Id"] = profile_id
+        headers["X-Profile-Summary"] = ",".join(f"{k}={v}" for k, v in summary.items())
+        print(f"[PROFILE] {label} -> {profile_id} {summary}", flush=True)
+        return Response(body, status_code=response.status_code, headers=headers)
+
+_profile_lock = None
+
+app.add_middleware(ConditionalMiddleware)
 app.add_middleware(TimingMiddleware)
+app.add_middleware(ProfileMiddleware)
+# 클라이언트 연결 종료 감지 (진행 중 쿼리 중단용)
+app.add_middleware(DisconnectWatchMiddleware)
 
 # 서버 시작 시 DB 워밍업 (캐시 프리로드)
 @app.on_event("startup")
 async def warmup_db():
     """서버 시작 시 DB 쿼리를 미리 실행하여 SQLite 캐시 워밍업"""
+    import asyncio
     import time
     import sys
+    trace_startup("app_startup")
     start = time.time()
     print("[WARMUP] Starting database warmup...", flush=True)
 
@@ -70,10 +908,15 @@ async def warmup_db():
         # 인덱스 로드
         cursor.execute("SELECT COUNT(*) FROM apartments")
         apt_count = cursor.fetchone()[0]
+        trace_startup("db_open")
 
         cursor.execute("SELECT COUNT(*) FROM transactions")
         tx_count = cursor.fetchone()[0]
 
+        # 실시간 피드 시작 위치 (이 시점 이후 거래만 새 거래로 분배)
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM transactions")
+        STREAM.last_seq = cursor.fetchone()[0]
+
         # 자주 사용하는 쿼리 패턴 실행 (최근 거래 API)
         cursor.execute("""
             SELECT * FROM transactions
@@ -89,9 +932,10 @@ async def warmup_db():
         cursor.fetchall()
 
         # 통계 쿼리 워밍업
-        cursor.execute("SELECT COUNT(*) FROM transactions WHERE deal_date >= date('now', '-30 days')")
+        cursor.execute("SELECT COUNT(*) FROM transactions WHERE deal_date >= date(?, '-30 days')", (as_of_date(),))
         cursor.fetchone()
 
+        READY["db"] = True
         elapsed = time.time() - start
         print(f"[WARMUP] Database warmed up in {elapsed:.3f}s (apts: {apt_count}, txs: {tx_count})", flush=True)
         sys.stdout.flush()
@@ -99,6 +943,65 @@ async def warmup_db():
         print(f"[WARMUP] Error: {e}", flush=True)
     finally:
         conn.close()
+    trace_startup("warmup")
+
+    # 캐시 스냅샷 복원: 무거운 네임스페이스는 준비 완료 전에, 나머지는 백그라운드로
+    generation = refresh_db_generation()
+    if shared_cache_enabled():
+        try:
+            init_shared_cache()
+            asyncio.create_task(cache_bus_loop())
+        except Exception as e:
+            print(f"[CACHE] Shared cache unavailable, using per-worker cache: {e}", flush=True)
+    restored = load_cache_snapshot(CACHE_HOT_NAMESPACES, generation)
+    print(f"[WARMUP] Restored {restored} hot cache entries (generation: {generation})", flush=True)
+    trace_startup("cache_restore")
+
+    async def restore_rest():
+        rest = [name for name in CACHE if name not in CACHE_HOT_NAMESPACES]
+        count = await asyncio.to_thread(load_cache_snapshot, rest, generation)
+        print(f"[WARMUP] Restored {count} background cache entries", flush=True)
+
+    async def prime_cache():
+        """스냅샷에 없던 첫 화면용 캐시를 채운 뒤 준비 완료 표시"""
+        try:
+            if not CACHE["stats"]:
+                await get_market_stats()
+            if not CACHE["hierarchy"]:
+                await get_region_hierarchy()
+        except Exception as e:
+            print(f"[WARMUP] Cache priming failed: {e}", flush=True)
+        READY["cache"] = True
+        trace_startup("cache_primed")
+
+    asyncio.create_task(restore_rest())
+    asyncio.create_task(prime_cache())
+    asyncio.create_task(cache_snapshot_loop())
+    asyncio.create_task(as_of_rollover_loop())
+
+
+@app.on_event("shutdown")
+async def close_streams():
+    """열린 SSE 스트림 종료"""
+    STREAM.close()
+
+
+@app.on_event("shutdown")
+async def close_trace():
+    """남은 요청 트레이스 기록"""
+    if TRACE is not None:
+        TRACE.close()
+        print(f"[TRACE] Closed {TRACE.stats()}", flush=True)
+
+
+@app.on_event("shutdown")
+async def persist_cache_on_shutdown():
+    """종료 시 마지막 캐시 스냅샷 저장"""
+    try:
+        await snapshot_cache_now()
+        print("[CACHE] Snapshot saved on shutdown", flush=True)
+    except Exception as e:
+        print(f"[CACHE] Snapshot on shutdown failed: {e}", flush=True)
 
 # CORS 설정 (Next.js 프론트엔드 허용)
 app.add_middleware(
@@ -152,19 +1055,17 @@ def get_region_name(lawd_cd: str) -> str:
     """지역코드로 '시/도 구/군' 형태의 지역명 반환"""
     return REGION_CODE_TO_NAME.get(lawd_cd, "")
 
+def prepare_connection(conn):
+    """요청 컨텍스트의 쿼리 기한 검사 + (켜져 있으면) 쿼리 수 계측 설치"""
+    return install_counter(install_guard(conn))
+
 def get_db_connection():
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
-    return conn
-
-@app.get("/api/transactions")
-async def get_transactions(limit: int = 20):
-    """최근 실거래 데이터 목록 반환"""
-    # 캐시 확인
-    cache_key = f"limit:{limit}"
-    if cache_key in CACHE["transactions"]:
-        return CACHE["transactions"][cache_key]
+    return prepare_connection(conn)
 
+def load_transactions(limit: int):
+    """최근 실거래 목록 조회 (캐시 미스 시)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -185,28 +1086,189 @@ async def get_transactions(limit: int = 20):
             d = dict(row)
             d['region_name'] = get_region_name(d.get('lawd_cd', ''))
             result.append(d)
-        # 캐시에 저장
-        CACHE["transactions"][cache_key] = result
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         conn.close()
 
-@app.get("/api/stats")
-async def get_market_stats():
-    """수도권 시장 주요 지표 반환 (PoC용 더미 + 일부 실데이터)"""
-    # 캐시 확인
-    cache_key = "market"
-    if cache_key in CACHE["stats"]:
-        return CACHE["stats"][cache_key]
+@app.get("/api/transactions")
+async def get_transactions(limit: int = 20):
+    """최근 실거래 데이터 목록 반환"""
+    return await cached("transactions", f"limit:{limit}", load_transactions, limit)
+
+CACHE_LOADERS["transactions"] = lambda key: load_transactions(int(key.split(":")[1]))
+
+
+# ========== 신규 거래 실시간 피드 (SSE) ==========
+# 수집 완료/DB 교체 이벤트(clear_all_cache) 때 새 거래를 한 번만 조회해서 모든 연결에 분배
+# 이벤트 id = transactions.id → 재접속 시 Last-Event-ID 이후부터 DB에서 이어받기
+STREAM_HEARTBEAT_SEC = 15
+STREAM_RETRY_MS = 5000
+STREAM_REPLAY_MAX = 500     # 이보다 많이 밀렸으면 reset 이벤트 (목록 다시 조회)
+STREAM_POLL_BATCH = 1000
+STREAM_MAX_CONNECTIONS = int(os.environ.get("STREAM_MAX_CONNECTIONS", "5000"))
+
+STREAM = TransactionBroadcaster()
+_stream_poll_task = None
+
+class SubscriberStreamingResponse(StreamingResponse):
+    """본문 제너레이터가 시작되지 못한 채 끝나도(응답 시작 전 연결 끊김) 구독 슬롯 반환"""
+    def __init__(self, sub, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sub = sub
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            STREAM.unsubscribe(self.sub)
+
+def load_transactions_since(after_id: int, limit: int, regions: Optional[set] = None):
+    """id 기준 이후 거래 (오름차순)"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    params = [after_id]
+    region_condition = ""
+    if regions:
+        region_condition = f"AND a.lawd_cd IN ({','.join('?' * len(regions))})"
+        params.extend(sorted(regions))
+    params.append(limit)
+    try:
+        cursor.execute(f"""
+            SELECT t.*, a.name as apt_name, a.dong, a.lawd_cd, i.summary_text
+            FROM transactions t
+            JOIN apartments a ON t.apt_id = a.id
+            LEFT JOIN transaction_insights i ON t.id = i.transaction_id
+            WHERE t.id > ? {region_condition}
+            ORDER BY t.id
+            LIMIT ?
+        """, params)
+        result = []
+        for row in cursor.fetchall():
+            d = dict(row)
+            d['region_name'] = get_region_name(d.get('lawd_cd', ''))
+            result.append(d)
+        return result
+    finally:
+        conn.close()
+
+def load_max_transaction_id() -> int:
+    conn = get_db_connection()
+    try:
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+    finally:
+        conn.close()
 
+async def poll_stream():
+    """마지막 시퀀스 이후 새 거래를 구독자에게 분배"""
+    max_id = await run_in_threadpool(load_max_transaction_id)
+    if max_id <= STREAM.last_seq or not STREAM.subscribers:
+        # 새 거래 없음 / DB 교체로 시퀀스가 뒤로 감 / 듣는 연결 없음 → 위치만 맞춤
+        STREAM.last_seq = max_id
+        return
+    published = 0
+    while True:
+        rows = await run_in_threadpool(load_transactions_since, STREAM.last_seq, STREAM_POLL_BATCH)
+        STREAM.publish(rows)
+        published += len(rows)
+        if len(rows) < STREAM_POLL_BATCH:
+            break
+    print(f"[STREAM] Published {published} new transactions to {len(STREAM.subscribers)} streams", flush=True)
+
+def schedule_stream_poll():
+    """수집/DB 교체 직후 새 거래 분배 예약 (이미 진행 중이면 끝난 뒤 한 번 더)"""
+    import asyncio
+    global _stream_poll_task
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    previous = _stream_poll_task
+
+    async def run():
+        detach_request()
+        detach_counter()
+        if previous is not None and not previous.done():
+            await asyncio.wait([previous])
+        try:
+            await poll_stream()
+        except Exception as e:
+            print(f"[STREAM] Poll failed: {e}", flush=True)
+
+    _stream_poll_task = loop.create_task(run())
+
+@app.get("/api/stream/transactions")
+async def stream_transactions(request: Request, lawd_cd: Optional[str] = None,
+                              last_event_id: Optional[int] = None):
+    """
+    신규 거래 SSE 스트림
+    - lawd_cd: 지역 필터 (콤마 구분, 예: 11680,11650)
+    - Last-Event-ID 헤더(또는 last_event_id 파라미터) 이후 거래부터 이어받기
+    - STREAM_HEARTBEAT_SEC마다 주석 heartbeat
+    """
+    import asyncio
+    regions = {code.strip() for code in lawd_cd.split(",") if code.strip()} if lawd_cd else None
+    header_id = request.headers.get("last-event-id", "")
+    after = int(header_id) if header_id.isdigit() else last_event_id
+
+    # 상한 검사와 구독을 await 없이 함께 → 동시 접속이 몰려도 STREAM_MAX_CONNECTIONS를 넘지 않음
+    if len(STREAM.subscribers) >= STREAM_MAX_CONNECTIONS:
+        raise HTTPException(status_code=503, detail="Too many streams", headers={"Retry-After": "30"})
+    # 구독 먼저 → 재전송과 실시간 사이 빈틈 없음 (중복은 id로 제거)
+    head = STREAM.last_seq
+    sub = STREAM.subscribe(regions)
+
+    async def events():
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            sent = head
+            if after is not None and after < head:
+                rows = await run_in_threadpool(load_transactions_since, after, STREAM_REPLAY_MAX + 1, regions)
+                if len(rows) > STREAM_REPLAY_MAX:
+                    yield format_event({"reason": "too_far_behind", "last_seq": head}, "reset")
+                else:
+                    for row in rows:
+                        yield format_event(row)
+                        sent = max(sent, row["id"])
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), STREAM_HEARTBEAT_SEC)
+                except asyncio.TimeoutError:
+                    if sub.overflowed:
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None or sub.overflowed:
+                    break  # 서버 종료 / 너무 느림 → 재접속해서 이어받기
+                if event["id"] <= sent:
+                    continue
+                sent = event["id"]
+                yield format_event(event)
+        finally:
+            STREAM.unsubscribe(sub)
+
+    return SubscriberStreamingResponse(sub, events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+@app.get("/api/stream/stats")
+async def stream_stats():
+    """SSE 연결 수 / 분배 현황"""
+    return {**STREAM.stats(), "time": time_module.time()}
+
+def load_market_stats():
+    """시장 지표 조회 (캐시 미스 시)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
+    as_of = as_of_date()
+
     try:
         # 최근 30일 거래량
-        cursor.execute("SELECT COUNT(*) FROM transactions WHERE deal_date >= date('now', '-30 days')")
+        cursor.execute("SELECT COUNT(*) FROM transactions WHERE deal_date >= date(?, '-30 days')", (as_of,))
         recent_count = cursor.fetchone()[0]
 
         # 전체 등록된 아파트 수
@@ -217,11 +1279,8 @@ async def get_market_stats():
         cursor.execute("SELECT MIN(deal_date), MAX(deal_date) FROM transactions")
         date_range = cursor.fetchone()
 
-        # DB 파일 수정 시각 (데이터 갱신 시점)
-        import os
-        from datetime import datetime
-        db_mtime = os.path.getmtime(DB_PATH)
-        data_updated_at = datetime.fromtimestamp(db_mtime).isoformat()
+        # 데이터 갱신 시점 (data_meta 기준, ETag/Last-Modified와 같은 값 - UTC)
+        data_updated_at = DATA_UPDATED_AT.isoformat() if DATA_UPDATED_AT else None
 
         result = {
             "growth_rate": "12.4%", # 실시간 계산 로직은 추후 고도화
@@ -231,22 +1290,29 @@ async def get_market_stats():
             "total_apartments": apt_count,
             "status": "BULLISH",
             "data_updated_at": data_updated_at,
+            "data_version": DATA_VERSION,
+            "as_of": as_of,
+            "data_partial": DB_MODE == "hot",
             "data_range": {
                 "min_date": date_range[0] if date_range else None,
                 "max_date": date_range[1] if date_range else None
             }
         }
-        # 캐시에 저장
-        CACHE["stats"][cache_key] = result
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         conn.close()
 
-@app.get("/api/regions")
-async def get_region_distribution():
-    """지역별(시군구) 거래 분포 데이터 반환"""
+@app.get("/api/stats")
+async def get_market_stats():
+    """수도권 시장 주요 지표 반환 (PoC용 더미 + 일부 실데이터)"""
+    return await cached("stats", "market", load_market_stats)
+
+CACHE_LOADERS["stats"] = lambda key: load_market_stats()
+
+def load_region_distribution():
+    """지역별(시군구) 거래 분포 조회"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -266,6 +1332,12 @@ async def get_region_distribution():
     finally:
         conn.close()
 
+@app.get("/api/regions")
+async def get_region_distribution():
+    """지역별(시군구) 거래 분포 데이터 반환"""
+    async with admission("regions"):
+        return await run_query("regions", load_region_distribution)
+
 
 # ========== 검색 API ==========
 import time as time_module
@@ -286,100 +1358,86 @@ def find_region_codes_by_name(query: str) -> list:
 
     return matched_codes
 
-@app.get("/api/search")
-def search_apartments(q: str, limit: int = 20):
-    """아파트명 또는 지역명으로 검색 (FTS5 trigram + 지역코드)"""
+def load_search(q: str, limit: int):
+    """FTS5 + 지역/동/이름 검색 (캐시 미스 시) - 독립 조회는 병렬 실행"""
     start_time = time_module.time()
-    print(f"[API] Search started: q={q}, time={start_time}")
-
-    if not q or len(q) < 2:
-        raise HTTPException(status_code=400, detail="검색어는 2자 이상 입력해주세요")
-
-    # 캐시 확인
-    cache_key = f"{q}:{limit}"
-    if cache_key in CACHE["search"]:
-        print(f"[API] Search cache HIT: {time_module.time() - start_time:.3f}s")
-        return CACHE["search"][cache_key]
-
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    print(f"[API] DB connected: {time_module.time() - start_time:.3f}s")
 
     # 지역명(시/구)으로 매칭되는 코드 찾기
     region_codes = find_region_codes_by_name(q)
 
-    try:
+    def ids_of(sql, params):
+        def run(cursor):
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+        return run
+
+    # 1단계: 후보 ID 검색 4종 (서로 독립)
+    lookups = {
         # FTS5 trigram 검색으로 아파트 ID 찾기
-        fts_query = """
+        "fts": ids_of("""
             SELECT rowid FROM apartments_fts
             WHERE apartments_fts MATCH ?
             LIMIT ?
-        """
-        cursor.execute(fts_query, (q, limit * 2))
-        fts_ids = [row[0] for row in cursor.fetchall()]
-        print(f"[API] FTS5 search done ({len(fts_ids)} ids): {time_module.time() - start_time:.3f}s")
-
-        # 지역 코드로 추가 검색
-        region_ids = []
-        if region_codes:
-            placeholders = ",".join(["?" for _ in region_codes])
-            cursor.execute(f"SELECT id FROM apartments WHERE lawd_cd IN ({placeholders}) LIMIT ?",
-                          region_codes + [limit * 2])
-            region_ids = [row[0] for row in cursor.fetchall()]
-            print(f"[API] Region search done ({len(region_ids)} ids): {time_module.time() - start_time:.3f}s")
-
+        """, (q, limit * 2)),
         # 동(dong) 이름으로 추가 검색 (예: "반포" -> "반포동" 포함된 아파트)
-        dong_ids = []
-        cursor.execute("SELECT id FROM apartments WHERE dong LIKE ? LIMIT ?",
-                      (f"%{q}%", limit * 2))
-        dong_ids = [row[0] for row in cursor.fetchall()]
-        print(f"[API] Dong search done ({len(dong_ids)} ids): {time_module.time() - start_time:.3f}s")
-
+        "dong": ids_of("SELECT id FROM apartments WHERE dong LIKE ? LIMIT ?", (f"%{q}%", limit * 2)),
         # 아파트 이름으로 추가 검색 (FTS5 trigram이 한글 처리 못하는 경우 대비)
-        name_ids = []
-        cursor.execute("SELECT id FROM apartments WHERE name LIKE ? LIMIT ?",
-                      (f"%{q}%", limit * 2))
-        name_ids = [row[0] for row in cursor.fetchall()]
-        print(f"[API] Name search done ({len(name_ids)} ids): {time_module.time() - start_time:.3f}s")
+        "name": ids_of("SELECT id FROM apartments WHERE name LIKE ? LIMIT ?", (f"%{q}%", limit * 2)),
+    }
+    if region_codes:
+        # 지역 코드로 추가 검색
+        placeholders = ",".join(["?" for _ in region_codes])
+        lookups["region"] = ids_of(f"SELECT id FROM apartments WHERE lawd_cd IN ({placeholders}) LIMIT ?",
+                                   region_codes + [limit * 2])
+
+    try:
+        found = parallel_reads(lookups)
+        print(f"[API] Candidate searches done ({', '.join(f'{k}={len(v)}' for k, v in found.items())}): "
+              f"{time_module.time() - start_time:.3f}s")
 
         # ID 합치기 (중복 제거)
-        all_ids = list(dict.fromkeys(fts_ids + region_ids + dong_ids + name_ids))[:limit * 2]
+        all_ids = list(dict.fromkeys(
+            found["fts"] + found.get("region", []) + found["dong"] + found["name"]
+        ))[:limit * 2]
 
         if not all_ids:
-            CACHE["search"][cache_key] = []
             return []
 
-        # 상세 정보 조회 (2단계 - 먼저 기본 정보, 그 다음 통계)
+        # 2단계: 상세 정보 조회 (기본 정보 / 거래 통계 / 최근 거래 - 서로 독립)
         placeholders = ",".join(["?" for _ in all_ids])
 
-        # 1단계: 기본 아파트 정보
-        cursor.execute(f"""
-            SELECT id, name, dong, lawd_cd, build_year
-            FROM apartments WHERE id IN ({placeholders})
-        """, all_ids)
-        apt_rows = {row['id']: dict(row) for row in cursor.fetchall()}
-
-        # 2단계: 거래 통계 (한 번에 조회)
-        cursor.execute(f"""
-            SELECT apt_id, COUNT(*) as tx_count,
-                   MAX(deal_date) as latest_date
-            FROM transactions
-            WHERE apt_id IN ({placeholders})
-            GROUP BY apt_id
-        """, all_ids)
-        stats = {row['apt_id']: dict(row) for row in cursor.fetchall()}
-
-        # 3단계: 최근 거래 정보 (각 아파트별 최신 1건)
-        cursor.execute(f"""
-            SELECT apt_id, amount, area, deal_date
-            FROM transactions
-            WHERE apt_id IN ({placeholders})
-            AND (apt_id, deal_date) IN (
-                SELECT apt_id, MAX(deal_date) FROM transactions
-                WHERE apt_id IN ({placeholders}) GROUP BY apt_id
-            )
-        """, all_ids + all_ids)
-        latest = {row['apt_id']: dict(row) for row in cursor.fetchall()}
+        def apt_rows_of(cursor):
+            cursor.execute(f"""
+                SELECT id, name, dong, lawd_cd, build_year
+                FROM apartments WHERE id IN ({placeholders})
+            """, all_ids)
+            return {row['id']: dict(row) for row in cursor.fetchall()}
+
+        def stats_of(cursor):
+            cursor.execute(f"""
+                SELECT apt_id, COUNT(*) as tx_count,
+                       MAX(deal_date) as latest_date
+                FROM transactions
+                WHERE apt_id IN ({placeholders})
+                GROUP BY apt_id
+            """, all_ids)
+            return {row['apt_id']: dict(row) for row in cursor.fetchall()}
+
+        def latest_of(cursor):
+            # 각 아파트별 최신 1건
+            cursor.execute(f"""
+                SELECT apt_id, amount, area, deal_date
+                FROM transactions
+                WHERE apt_id IN ({placeholders})
+                AND (apt_id, deal_date) IN (
+                    SELECT apt_id, MAX(deal_date) FROM transactions
+                    WHERE apt_id IN ({placeholders}) GROUP BY apt_id
+                )
+            """, all_ids + all_ids)
+            return {row['apt_id']: dict(row) for row in cursor.fetchall()}
+
+        details = parallel_reads({"apt_rows": apt_rows_of, "stats": stats_of, "latest": latest_of})
+        apt_rows, stats, latest = details["apt_rows"], details["stats"], details["latest"]
         print(f"[API] Detail queries done: {time_module.time() - start_time:.3f}s")
 
         # 결과 조합
@@ -401,208 +1459,367 @@ def search_apartments(q: str, limit: int = 20):
         result.sort(key=lambda x: x.get('tx_count', 0), reverse=True)
         result = result[:limit]
 
-        # 캐시에 저장
-        CACHE["search"][cache_key] = result
-        print(f"[API] Search complete (cached): {time_module.time() - start_time:.3f}s")
+        print(f"[API] Search complete: {time_module.time() - start_time:.3f}s")
         return result
     except Exception as e:
         print(f"[API] Search error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
+
+@app.get("/api/search")
+async def search_apartments(q: str, limit: int = 20):
+    """아파트명 또는 지역명으로 검색 (FTS5 trigram + 지역코드)"""
+    if not q or len(q) < 2:
+        raise HTTPException(status_code=400, detail="검색어는 2자 이상 입력해주세요")
+
+    return await cached("search", f"{q}:{limit}", load_search, q, limit)
+
+def _load_search_key(key: str):
+    q, limit = key.rsplit(":", 1)
+    return load_search(q, int(limit))
+
+CACHE_LOADERS["search"] = _load_search_key
 
 
 # ========== 단지 목록/상세 API ==========
-@app.get("/api/apartments/ids")
-async def get_apartment_ids():
-    """sitemap 생성용 전체 아파트 ID 목록 (거래 내역이 있는 아파트만)"""
+# ========== Sitemap (거래가 있는 아파트 ID를 id 범위 샤드로) ==========
+# 샤드 n = apt_id ∈ [n * SIZE, (n + 1) * SIZE) → sitemap 파일당 URL 50,000개 제한 이내
+SITEMAP_SHARD_SIZE = int(os.environ.get("SITEMAP_SHARD_SIZE", "10000"))
+
+def apartments_with_deals_source(cursor) -> str:
+    """수집 시 유지되는 apartments_with_deals 테이블 (이전 DB면 거래 테이블에서 집계)"""
+    has_table = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'apartments_with_deals'"
+    ).fetchone()
+    if has_table:
+        return "apartments_with_deals"
+    return """(
+        SELECT apt_id, MAX(deal_date) as last_deal_date, NULL as updated_at
+        FROM transactions GROUP BY apt_id
+    )"""
+
+def sitemap_etag(*parts) -> str:
+    return '"' + hashlib.md5(":".join(str(p) for p in parts).encode()).hexdigest()[:16] + '"'
+
+def load_sitemap_index():
+    """샤드별 아파트 수 + 마지막 변경 시각"""
     conn = get_db_connection()
     cursor = conn.cursor()
-
     try:
-        cursor.execute("""
-            SELECT DISTINCT a.id
-            FROM apartments a
-            JOIN transactions t ON a.id = t.apt_id
-            ORDER BY a.id
-        """)
-        ids = [row[0] for row in cursor.fetchall()]
-        return ids
+        source = apartments_with_deals_source(cursor)
+        cursor.execute(f"""
+            SELECT apt_id / ? as shard, COUNT(*) as count,
+                   MIN(apt_id) as min_id, MAX(apt_id) as max_id,
+                   COALESCE(MAX(updated_at), MAX(last_deal_date)) as last_modified
+            FROM {source}
+            GROUP BY shard
+            ORDER BY shard
+        """, (SITEMAP_SHARD_SIZE,))
+        shards = []
+        for row in cursor.fetchall():
+            shard = dict(row)
+            shard["etag"] = sitemap_etag(shard["shard"], shard["count"], shard["max_id"], shard["last_modified"])
+            shards.append(shard)
+        last_modified = max((s["last_modified"] or "" for s in shards), default=None)
+        return {
+            "shard_size": SITEMAP_SHARD_SIZE,
+            "total": sum(s["count"] for s in shards),
+            "last_modified": last_modified,
+            "shards": shards,
+            "etag": sitemap_etag("index", *(s["etag"] for s in shards)),
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         conn.close()
 
-
-@app.get("/api/apartments/{apt_id}")
-async def get_apartment_detail(apt_id: int):
-    """단지 기본 정보 + 최근 거래 내역"""
-    # 캐시 확인
-    cache_key = str(apt_id)
-    if cache_key in CACHE["apartment"]:
-        return CACHE["apartment"][cache_key]
-
+def load_sitemap_shard(shard: int):
+    """샤드 하나의 아파트 ID 목록 (PK 범위 조회)"""
     conn = get_db_connection()
     cursor = conn.cursor()
-
     try:
-        # 단지 기본 정보
-        cursor.execute("""
-            SELECT * FROM apartments WHERE id = ?
-        """, (apt_id,))
-        apt = cursor.fetchone()
-
-        if not apt:
-            raise HTTPException(status_code=404, detail="단지를 찾을 수 없습니다")
+        source = apartments_with_deals_source(cursor)
+        start = shard * SITEMAP_SHARD_SIZE
+        cursor.execute(f"""
+            SELECT apt_id, COALESCE(updated_at, last_deal_date) as modified
+            FROM {source}
+            WHERE apt_id >= ? AND apt_id < ?
+            ORDER BY apt_id
+        """, (start, start + SITEMAP_SHARD_SIZE))
+        rows = cursor.fetchall()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        conn.close()
 
-        apt_dict = dict(apt)
-        apt_dict['region_name'] = get_region_name(apt_dict.get('lawd_cd', ''))
+    if not rows:
+        raise HTTPException(status_code=404, detail="Sitemap shard not found")
+    ids = [row[0] for row in rows]
+    last_modified = max(row[1] or "" for row in rows)
+    return {
+        "shard": shard,
+        "count": len(ids),
+        "last_modified": last_modified,
+        "ids": ids,
+        "etag": sitemap_etag(shard, len(ids), ids[-1], last_modified),
+    }
 
-        # 최근 거래 내역 (최근 20건)
-        cursor.execute("""
-            SELECT t.*, i.summary_text
-            FROM transactions t
-            LEFT JOIN transaction_insights i ON t.id = i.transaction_id
-            WHERE t.apt_id = ?
-            ORDER BY t.deal_date DESC
-            LIMIT 20
-        """, (apt_id,))
-        transactions = [dict(row) for row in cursor.fetchall()]
+def load_apartment_ids():
+    """거래 내역이 있는 아파트 ID 전체 목록"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        source = apartments_with_deals_source(cursor)
+        cursor.execute(f"SELECT apt_id FROM {source} ORDER BY apt_id")
+        return [row[0] for row in cursor.fetchall()]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        conn.close()
 
-        # 평형별 시세 요약 (최근 거래가 + 최근 3개월 평균 + 전고점 날짜 포함)
-        cursor.execute("""
-            SELECT
-                ROUND(area, 0) as area,
-                MAX(amount) as max_amount,
-                MIN(amount) as min_amount,
-                AVG(amount) as avg_amount,
-                COUNT(*) as count,
-                (SELECT amount FROM transactions t2
-                 WHERE t2.apt_id = ? AND ROUND(t2.area, 0) = ROUND(t.area, 0)
-                 ORDER BY t2.deal_date DESC LIMIT 1) as latest_amount,
-                (SELECT deal_date FROM transactions t2
-                 WHERE t2.apt_id = ? AND ROUND(t2.area, 0) = ROUND(t.area, 0)
-                 ORDER BY t2.deal_date DESC LIMIT 1) as latest_date,
-                (SELECT ROUND(AVG(amount), 0) FROM transactions t2
-                 WHERE t2.apt_id = ? AND ROUND(t2.area, 0) = ROUND(t.area, 0)
-                 AND t2.deal_date >= date('now', '-3 months')) as recent_avg,
-                (SELECT deal_date FROM transactions t2
-                 WHERE t2.apt_id = ? AND ROUND(t2.area, 0) = ROUND(t.area, 0)
-                 AND t2.amount = (SELECT MAX(amount) FROM transactions t3 WHERE t3.apt_id = ? AND ROUND(t3.area, 0) = ROUND(t.area, 0))
-                 ORDER BY t2.deal_date DESC LIMIT 1) as peak_date
-            FROM transactions t
-            WHERE apt_id = ?
-            GROUP BY ROUND(area, 0)
-            ORDER BY area
-        """, (apt_id, apt_id, apt_id, apt_id, apt_id, apt_id,))
-        area_stats = [dict(row) for row in cursor.fetchall()]
+def etag_response(request: Request, data: dict):
+    """If-None-Match가 일치하면 304, 아니면 ETag와 함께 JSON"""
+    headers = {"ETag": data["etag"], "Cache-Control": "public, max-age=3600"}
+    if request.headers.get("if-none-match") == data["etag"]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(data, headers=headers)
+
+@app.get("/api/sitemap/index")
+async def get_sitemap_index(request: Request):
+    """sitemap 샤드 목록 (샤드별 아파트 수, 마지막 변경 시각, ETag)"""
+    data = await cached("sitemap", "index", load_sitemap_index)
+    return etag_response(request, data)
+
+@app.get("/api/sitemap/shards/{shard}")
+async def get_sitemap_shard(shard: int, request: Request):
+    """sitemap 샤드 하나의 아파트 ID 목록"""
+    data = await cached("sitemap", f"shard:{shard}", load_sitemap_shard, shard)
+    return etag_response(request, data)
+
+def _load_sitemap_key(key: str):
+    if key == "index":
+        return load_sitemap_index()
+    if key == "ids":
+        return load_apartment_ids()
+    return load_sitemap_shard(int(key.split(":", 1)[1]))
+
+CACHE_LOADERS["sitemap"] = _load_sitemap_key
 
-        # 5가지 지표 계산
-        metrics = {}
+@app.get("/api/apartments/ids")
+async def get_apartment_ids():
+    """전체 아파트 ID 목록 (거래 내역이 있는 아파트만, 이전 sitemap 호환용 - /api/sitemap/* 사용 권장)"""
+    return await cached("sitemap", "ids", load_apartment_ids)
 
-        if transactions:
-            latest_tx = transactions[0]
 
-            # 1. 급매 지수: 최근 거래가 - 직전 3개월 평균
-            cursor.execute("""
-                SELECT ROUND(AVG(amount), 0) as avg_3m
-                FROM transactions
-                WHERE apt_id = ?
-                  AND area BETWEEN ? - 2 AND ? + 2
-                  AND deal_date < ?
-                  AND deal_date >= date(?, '-3 months')
-            """, (apt_id, latest_tx['area'], latest_tx['area'], latest_tx['deal_date'], latest_tx['deal_date']))
-            avg_3m_row = cursor.fetchone()
-            if avg_3m_row and avg_3m_row['avg_3m']:
-                avg_3m = avg_3m_row['avg_3m']
-                bargain_amount = latest_tx['amount'] - avg_3m
-                bargain_percent = round((bargain_amount / avg_3m) * 100, 1) if avg_3m > 0 else 0
-                metrics['bargain_amount'] = bargain_amount
-                metrics['bargain_percent'] = bargain_percent
-
-            # 2. 층별 프리미엄: 해당 층 vs 평균층 가격 차이
-            cursor.execute("""
-                SELECT ROUND(AVG(amount), 0) as avg_floor_price
-                FROM transactions
-                WHERE apt_id = ?
-                  AND area BETWEEN ? - 2 AND ? + 2
-                  AND deal_date >= date('now', '-1 year')
-            """, (apt_id, latest_tx['area'], latest_tx['area']))
-            avg_floor_row = cursor.fetchone()
-            if avg_floor_row and avg_floor_row['avg_floor_price'] and avg_floor_row['avg_floor_price'] > 0:
-                floor_premium = round((latest_tx['amount'] / avg_floor_row['avg_floor_price'] - 1) * 100, 1)
-                metrics['floor_premium'] = floor_premium
-
-            # 3. 전고점 회복률
-            same_area_stat = next((s for s in area_stats if abs(s['area'] - latest_tx['area']) <= 2), None)
-            if same_area_stat and same_area_stat['max_amount'] and same_area_stat['max_amount'] > 0:
-                recovery_rate = round((latest_tx['amount'] / same_area_stat['max_amount']) * 100, 1)
-                metrics['recovery_rate'] = recovery_rate
-                metrics['peak_date'] = same_area_stat.get('peak_date')
-
-        # 4. 동네 가성비 랭킹: 법정동 내 평당가 순위
-        dong = apt_dict.get('dong', '')
-        lawd_cd = apt_dict.get('lawd_cd', '')
-        if lawd_cd and area_stats:
-            # 최근 거래 기준 평당가 계산
-            main_area_stat = area_stats[0] if area_stats else None
-            if main_area_stat and main_area_stat['latest_amount'] and main_area_stat['area'] > 0:
-                apt_price_per_area = main_area_stat['latest_amount'] / main_area_stat['area']
+def load_apartment_details(apt_ids: list) -> dict:
+    """단지 상세 + 5가지 지표 여러 건을 쿼리 종류별 1회(apt_id IN (...))로 계산 → {apt_id: 상세}"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    ids = sorted(set(apt_ids))
+    id_marks = ",".join("?" * len(ids))
+    as_of = as_of_date()
 
-                cursor.execute("""
-                    SELECT a.id, a.name,
+    try:
+        # 단지 기본 정보
+        cursor.execute(f"SELECT * FROM apartments WHERE id IN ({id_marks})", ids)
+        apartments = {}
+        for row in cursor.fetchall():
+            apt_dict = dict(row)
+            apt_dict['region_name'] = get_region_name(apt_dict.get('lawd_cd', ''))
+            apartments[apt_dict['id']] = apt_dict
+        if not apartments:
+            return {}
+        ids = sorted(apartments)
+        id_marks = ",".join("?" * len(ids))
+
+        # 아래 세 조회는 서로 독립 → 각자 커넥션에서 병렬 실행
+
+        def recent_of(cursor):
+            # 최근 거래 내역 (단지별 최근 20건)
+            cursor.execute(f"""
+                SELECT * FROM (
+                    SELECT t.*, i.summary_text,
+                           ROW_NUMBER() OVER (PARTITION BY t.apt_id ORDER BY t.deal_date DESC) as rn
+                    FROM transactions t
+                    LEFT JOIN transaction_insights i ON t.id = i.transaction_id
+                    WHERE t.apt_id IN ({id_marks})
+                )
+                WHERE rn <= 20
+                ORDER BY apt_id, rn
+            """, ids)
+            transactions = {apt_id: [] for apt_id in ids}
+            for row in cursor.fetchall():
+                tx = dict(row)
+                del tx['rn']
+                transactions[tx['apt_id']].append(tx)
+
+            # 1~2. 급매 지수 / 층별 프리미엄: 단지별 최근 거래 기준 (단지마다 기준값이 달라 VALUES로 전달)
+            latest = {apt_id: txs[0] for apt_id, txs in transactions.items() if txs}
+            window_avgs = {}
+            if latest:
+                values = ",".join("(?, ?, ?)" for _ in latest)
+                params = []
+                for apt_id, tx in latest.items():
+                    params.extend([apt_id, tx['area'], tx['deal_date']])
+                cursor.execute(f"""
+                    WITH q(apt_id, area, deal_date) AS (VALUES {values})
+                    SELECT q.apt_id,
+                        (SELECT ROUND(AVG(amount), 0) FROM transactions t
+                         WHERE t.apt_id = q.apt_id
+                           AND t.area BETWEEN q.area - 2 AND q.area + 2
+                           AND t.deal_date < q.deal_date
+                           AND t.deal_date >= date(q.deal_date, '-3 months')) as avg_3m,
+                        (SELECT ROUND(AVG(amount), 0) FROM transactions t
+                         WHERE t.apt_id = q.apt_id
+                           AND t.area BETWEEN q.area - 2 AND q.area + 2
+                           AND t.deal_date >= date(?, '-1 year')) as avg_floor_price
+                    FROM q
+                """, params + [as_of])
+                window_avgs = {row['apt_id']: dict(row) for row in cursor.fetchall()}
+            return transactions, window_avgs
+
+        def area_stats_of(cursor):
+            # 평형별 시세 요약 (최근 거래가 + 최근 3개월 평균 + 전고점 날짜 포함)
+            cursor.execute(f"""
+                SELECT
+                    t.apt_id as apt_id,
+                    ROUND(area, 0) as area,
+                    MAX(amount) as max_amount,
+                    MIN(amount) as min_amount,
+                    AVG(amount) as avg_amount,
+                    COUNT(*) as count,
+                    (SELECT amount FROM transactions t2
+                     WHERE t2.apt_id = t.apt_id AND ROUND(t2.area, 0) = ROUND(t.area, 0)
+                     ORDER BY t2.deal_date DESC LIMIT 1) as latest_amount,
+                    (SELECT deal_date FROM transactions t2
+                     WHERE t2.apt_id = t.apt_id AND ROUND(t2.area, 0) = ROUND(t.area, 0)
+                     ORDER BY t2.deal_date DESC LIMIT 1) as latest_date,
+                    (SELECT ROUND(AVG(amount), 0) FROM transactions t2
+                     WHERE t2.apt_id = t.apt_id AND ROUND(t2.area, 0) = ROUND(t.area, 0)
+                     AND t2.deal_date >= date(?, '-3 months')) as recent_avg,
+                    (SELECT deal_date FROM transactions t2
+                     WHERE t2.apt_id = t.apt_id AND ROUND(t2.area, 0) = ROUND(t.area, 0)
+                     AND t2.amount = (SELECT MAX(amount) FROM transactions t3 WHERE t3.apt_id = t.apt_id AND ROUND(t3.area, 0) = ROUND(t.area, 0))
+                     ORDER BY t2.deal_date DESC LIMIT 1) as peak_date
+                FROM transactions t
+                WHERE t.apt_id IN ({id_marks})
+                GROUP BY t.apt_id, ROUND(area, 0)
+                ORDER BY t.apt_id, area
+            """, [as_of] + ids)
+            area_stats = {apt_id: [] for apt_id in ids}
+            for row in cursor.fetchall():
+                stat = dict(row)
+                area_stats[stat.pop('apt_id')].append(stat)
+            return area_stats
+
+        def rankings_of(cursor):
+            # 4. 동네 가성비 랭킹: 법정동 내 평당가 순위 (요청된 단지들의 지역을 한 번에)
+            rank_regions = sorted({a['lawd_cd'] for a in apartments.values() if a.get('lawd_cd')})
+            rankings = {}
+            if rank_regions:
+                cursor.execute(f"""
+                    SELECT a.id, a.name, a.lawd_cd,
                            (SELECT t.amount / t.area FROM transactions t
                             WHERE t.apt_id = a.id
                             ORDER BY t.deal_date DESC LIMIT 1) as price_per_area
                     FROM apartments a
-                    WHERE a.lawd_cd = ?
+                    WHERE a.lawd_cd IN ({",".join("?" * len(rank_regions))})
                       AND EXISTS (SELECT 1 FROM transactions t WHERE t.apt_id = a.id)
                     ORDER BY price_per_area ASC
-                """, (lawd_cd,))
-                ranking_rows = cursor.fetchall()
-                dong_total = len(ranking_rows)
-                dong_rank = next((i + 1 for i, r in enumerate(ranking_rows) if r['id'] == apt_id), None)
-                if dong_rank:
-                    metrics['dong_rank'] = dong_rank
-                    metrics['dong_total'] = dong_total
-
-        # 5. 거래 공백기: 현재 - 마지막 거래일
-        if transactions:
-            from datetime import datetime, date as date_type
-            try:
-                latest_date_str = transactions[0]['deal_date']
-                latest_date = datetime.strptime(latest_date_str, '%Y-%m-%d').date()
-                today = date_type.today()
-                days_since_last_tx = (today - latest_date).days
-                metrics['days_since_last_tx'] = days_since_last_tx
-            except:
-                pass
+                """, rank_regions)
+                for row in cursor.fetchall():
+                    rankings.setdefault(row['lawd_cd'], []).append(row['id'])
+            return rankings
+
+        parts = parallel_reads({"recent": recent_of, "area_stats": area_stats_of, "rankings": rankings_of})
+        transactions, window_avgs = parts["recent"]
+        area_stats, rankings = parts["area_stats"], parts["rankings"]
+
+        from datetime import datetime, date as date_type
+        today = date_type.fromisoformat(as_of)
+
+        results = {}
+        for apt_id in ids:
+            apt_dict = apartments[apt_id]
+            apt_transactions = transactions[apt_id]
+            apt_area_stats = area_stats[apt_id]
+
+            # 5가지 지표 계산
+            metrics = {}
+
+            if apt_transactions:
+                latest_tx = apt_transactions[0]
+                avgs = window_avgs.get(apt_id)
+
+                # 1. 급매 지수: 최근 거래가 - 직전 3개월 평균
+                if avgs and avgs['avg_3m']:
+                    avg_3m = avgs['avg_3m']
+                    bargain_amount = latest_tx['amount'] - avg_3m
+                    bargain_percent = round((bargain_amount / avg_3m) * 100, 1) if avg_3m > 0 else 0
+                    metrics['bargain_amount'] = bargain_amount
+                    metrics['bargain_percent'] = bargain_percent
+
+                # 2. 층별 프리미엄: 해당 층 vs 평균층 가격 차이
+                if avgs and avgs['avg_floor_price'] and avgs['avg_floor_price'] > 0:
+                    floor_premium = round((latest_tx['amount'] / avgs['avg_floor_price'] - 1) * 100, 1)
+                    metrics['floor_premium'] = floor_premium
+
+                # 3. 전고점 회복률
+                same_area_stat = next((s for s in apt_area_stats if abs(s['area'] - latest_tx['area']) <= 2), None)
+                if same_area_stat and same_area_stat['max_amount'] and same_area_stat['max_amount'] > 0:
+                    recovery_rate = round((latest_tx['amount'] / same_area_stat['max_amount']) * 100, 1)
+                    metrics['recovery_rate'] = recovery_rate
+                    metrics['peak_date'] = same_area_stat.get('peak_date')
+
+            # 4. 동네 가성비 랭킹
+            lawd_cd = apt_dict.get('lawd_cd', '')
+            main_area_stat = apt_area_stats[0] if apt_area_stats else None
+            if lawd_cd and main_area_stat and main_area_stat['latest_amount'] and main_area_stat['area'] > 0:
+                ranking = rankings.get(lawd_cd, [])
+                if apt_id in ranking:
+                    metrics['dong_rank'] = ranking.index(apt_id) + 1
+                    metrics['dong_total'] = len(ranking)
+
+            # 5. 거래 공백기: 기준일 - 마지막 거래일
+            if apt_transactions:
+                try:
+                    latest_date = datetime.strptime(apt_transactions[0]['deal_date'], '%Y-%m-%d').date()
+                    metrics['days_since_last_tx'] = (today - latest_date).days
+                except:
+                    pass
+
+            results[apt_id] = {
+                "apartment": apt_dict,
+                "transactions": apt_transactions,
+                "area_stats": apt_area_stats,
+                "metrics": metrics
+            }
+        return results
+    finally:
+        conn.close()
 
-        result = {
-            "apartment": apt_dict,
-            "transactions": transactions,
-            "area_stats": area_stats,
-            "metrics": metrics
-        }
-        # 캐시에 저장
-        CACHE["apartment"][cache_key] = result
-        return result
-    except HTTPException:
-        raise
+DETAIL_BATCH = BatchLoader("apartment", load_apartment_details, BATCH_WINDOW_MS, BATCH_MAX_SIZE)
+
+def load_apartment_detail(apt_id: int):
+    """단지 상세 (캐시 미스 시) - 동시에 들어온 다른 단지 조회와 묶어서 실행"""
+    try:
+        result = DETAIL_BATCH.load(apt_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
+    if result is None:
+        raise HTTPException(status_code=404, detail="단지를 찾을 수 없습니다")
+    return result
 
 
-@app.get("/api/apartments/{apt_id}/transactions")
-async def get_apartment_transactions(
-    apt_id: int,
-    limit: int = 20,
-    offset: int = 0,
-    area: Optional[float] = None
-):
-    """거래 내역 페이징 API"""
+@app.get("/api/apartments/{apt_id}")
+async def get_apartment_detail(apt_id: int):
+    """단지 기본 정보 + 최근 거래 내역"""
+    return await cached("apartment", str(apt_id), load_apartment_detail, apt_id)
+
+CACHE_LOADERS["apartment"] = lambda key: load_apartment_detail(int(key))
+
+
+def load_apartment_transactions(apt_id: int, limit: int, offset: int, area: Optional[float]):
+    """거래 내역 페이지 조회"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -647,53 +1864,181 @@ async def get_apartment_transactions(
     finally:
         conn.close()
 
+@app.get("/api/apartments/{apt_id}/transactions")
+async def get_apartment_transactions(
+    apt_id: int,
+    limit: int = 20,
+    offset: int = 0,
+    area: Optional[float] = None
+):
+    """거래 내역 페이징 API"""
+    async with admission("apartment_transactions"):
+        return await run_query("apartment_transactions", load_apartment_transactions, apt_id, limit, offset, area)
+
+
+def load_apartment_histories(keys: list) -> dict:
+    """월별 평균가 이력 여러 건 → {(apt_id, months, area): 이력}, 같은 (months, area)끼리 1회 조회"""
+    groups = {}
+    for apt_id, months, area in keys:
+        groups.setdefault((months, area), []).append(apt_id)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    as_of = as_of_date()
+    results = {}
+    try:
+        for (months, area), apt_ids in groups.items():
+            ids = sorted(set(apt_ids))
+            params = ids + [as_of, -months]
+
+            # area 필터 조건 추가
+            area_condition = ""
+            if area:
+                # ±2㎡ 범위로 필터링 (같은 평형 그룹)
+                area_condition = "AND area BETWEEN ? AND ?"
+                params.extend([area - 2, area + 2])
+
+            cursor.execute(f"""
+                SELECT
+                    apt_id,
+                    strftime('%Y-%m', deal_date) as month,
+                    ROUND(AVG(amount), 0) as avg_amount,
+                    COUNT(*) as count,
+                    ROUND(AVG(area), 1) as avg_area
+                FROM transactions
+                WHERE apt_id IN ({",".join("?" * len(ids))})
+                  AND deal_date >= date(?, ? || ' months')
+                  {area_condition}
+                GROUP BY apt_id, strftime('%Y-%m', deal_date)
+                ORDER BY apt_id, month
+            """, params)
+            for apt_id in ids:
+                results[(apt_id, months, area)] = []
+            for row in cursor.fetchall():
+                point = dict(row)
+                results[(point.pop('apt_id'), months, area)].append(point)
+        return results
+    finally:
+        conn.close()
+
+HISTORY_BATCH = BatchLoader("history", load_apartment_histories, BATCH_WINDOW_MS, BATCH_MAX_SIZE)
+
+def load_apartment_history(apt_id: int, months: int, area: Optional[float]):
+    """월별 평균가 이력 조회 (캐시 미스 시) - 동시에 들어온 다른 단지 조회와 묶어서 실행"""
+    try:
+        return HISTORY_BATCH.load((apt_id, months, area))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
 @app.get("/api/apartments/{apt_id}/history")
 async def get_apartment_history(apt_id: int, months: int = 240, area: Optional[float] = None):
     """거래 이력 (차트용) - 월별 평균가. area 파라미터로 평형 필터 가능. 기본 240개월(20년)"""
-    # 캐시 확인
-    cache_key = f"{apt_id}:{months}:{area}"
-    if cache_key in CACHE["history"]:
-        return CACHE["history"][cache_key]
+    return await cached("history", f"{apt_id}:{months}:{area}", load_apartment_history, apt_id, months, area)
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def _load_history_key(key: str):
+    apt_id, months, area = key.split(":")
+    return load_apartment_history(int(apt_id), int(months), None if area == "None" else float(area))
 
-    # area 필터 조건 추가
-    area_condition = ""
-    params = [apt_id, -months]
+CACHE_LOADERS["history"] = _load_history_key
 
-    if area:
-        # ±2㎡ 범위로 필터링 (같은 평형 그룹)
-        area_condition = "AND area BETWEEN ? AND ?"
-        params.extend([area - 2, area + 2])
 
-    query = f"""
-        SELECT
-            strftime('%Y-%m', deal_date) as month,
-            ROUND(AVG(amount), 0) as avg_amount,
-            COUNT(*) as count,
-            ROUND(AVG(area), 1) as avg_area
-        FROM transactions
-        WHERE apt_id = ?
-          AND deal_date >= date('now', ? || ' months')
-          {area_condition}
-        GROUP BY strftime('%Y-%m', deal_date)
-        ORDER BY month
+# ========== 개별 거래 산점도 (서버 다운샘플링) ==========
+DEALS_DEFAULT_POINTS = 500
+DEALS_MAX_POINTS = 5000
+
+def load_apartment_deals(apt_id: int, start: Optional[str], end: Optional[str], area: Optional[float],
+                         points: int, method: str):
     """
+    기간/평형의 개별 거래 점 → points개 이하로 다운샘플링 (downsample.py)
+    - 20년치 대단지도 응답 크기가 points에 비례 (원래 거래 수와 무관)
+    """
+    import numpy as np
+    from downsample import METHODS
 
+    conn = get_db_connection()
+    cursor = conn.cursor()
     try:
-        cursor.execute(query, params)
+        cursor.execute("SELECT 1 FROM apartments WHERE id = ?", (apt_id,))
+        if cursor.fetchone() is None:
+            raise HTTPException(status_code=404, detail="Apartment not found")
+
+        conditions = ["apt_id = ?"]
+        params = [apt_id]
+        if start:
+            conditions.append("deal_date >= ?")
+            params.append(start)
+        if end:
+            conditions.append("deal_date <= ?")
+            params.append(end)
+        if area:
+            # ±2㎡ 범위로 필터링 (같은 평형 그룹)
+            conditions.append("area BETWEEN ? AND ?")
+            params.extend([area - 2, area + 2])
+        cursor.execute(f"""
+            SELECT id, deal_date, amount, area, floor
+            FROM transactions
+            WHERE {' AND '.join(conditions)}
+            ORDER BY deal_date, id
+        """, params)
         rows = cursor.fetchall()
-        result = [dict(row) for row in rows]
-        # 캐시에 저장
-        CACHE["history"][cache_key] = result
-        return result
+        total = len(rows)
+
+        if total > points:
+            days = np.array([row["deal_date"] for row in rows], dtype="datetime64[D]").astype(np.int64)
+            amounts = np.array([row["amount"] for row in rows], dtype=np.float64)
+            rows = [rows[i] for i in METHODS[method](days, amounts, points).tolist()]
+
+        return {
+            "apt_id": apt_id,
+            "start": start,
+            "end": end,
+            "area": area,
+            "method": method,
+            "total": total,
+            "returned": len(rows),
+            "deals": [dict(row) for row in rows],
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         conn.close()
 
+@app.get("/api/apartments/{apt_id}/deals")
+async def get_apartment_deals(
+    apt_id: int,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    area: Optional[float] = None,
+    points: int = DEALS_DEFAULT_POINTS,
+    method: str = "lttb",
+):
+    """
+    개별 거래 산점도 (층/면적 포함) - start/end: YYYY-MM-DD, area: ±2㎡ 평형 그룹
+    points(최대 5000)개를 넘으면 lttb(모양 보존) 또는 minmax(구간별 최저/최고)로 다운샘플링
+    """
+    from datetime import date
+    if method not in ("lttb", "minmax"):
+        raise HTTPException(status_code=400, detail="method: lttb | minmax")
+    for value in (start, end):
+        if value:
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"날짜 형식 오류: {value} (YYYY-MM-DD)")
+    points = min(max(points, 10), DEALS_MAX_POINTS)
+    key = f"{apt_id}:{start}:{end}:{area}:{points}:{method}"
+    return await cached("deals", key, load_apartment_deals, apt_id, start, end, area, points, method)
+
+def _load_deals_key(key: str):
+    apt_id, start, end, area, points, method = key.split(":")
+    return load_apartment_deals(int(apt_id), None if start == "None" else start, None if end == "None" else end,
+                                None if area == "None" else float(area), int(points), method)
+
+CACHE_LOADERS["deals"] = _load_deals_key
+
 
 # ========== 비교 API ==========
 @app.get("/api/compare")
@@ -707,12 +2052,17 @@ async def compare_apartments(apt_ids: str):
     if len(ids) < 2:
         raise HTTPException(status_code=400, detail="비교할 단지를 2개 이상 선택해주세요")
 
+    async with admission("compare"):
+        return await run_query("compare", load_compare, ids[:2])  # 최대 2개만
+
+def load_compare(ids: List[int]):
+    """단지별 정보/최근 거래/전고점/거래 건수 조회"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
     results = []
     try:
-        for apt_id in ids[:2]:  # 최대 2개만
+        for apt_id in ids:
             # 단지 정보
             cursor.execute("SELECT * FROM apartments WHERE id = ?", (apt_id,))
             apt = cursor.fetchone()
@@ -894,30 +2244,42 @@ async def get_collection_progress():
 
 
 # ========== 지역 탐색 API ==========
-@app.get("/api/regions/hierarchy")
-async def get_region_hierarchy():
-    """지역 계층 구조 반환 (시/도 > 구/군)"""
-    # 캐시 확인
-    cache_key = "all"
-    if cache_key in CACHE["hierarchy"]:
-        return CACHE["hierarchy"][cache_key]
+def hot_summary(cursor, query: str, params=()):
+    """
+    핫 서브셋 모드면 전체 기간 요약 테이블(region_summary / apartment_summary) 조회 결과 (행 목록)
+    - 전체 DB 모드 또는 이전 형식 스냅샷(summary_as_of 없음, 요약 컬럼 부족)이면 None → 거래 테이블 집계
+    """
+    if DB_MODE != "hot" or "summary_as_of" not in HOT_SUBSET_INFO:
+        return None
+    return cursor.execute(query, params).fetchall()
 
+def load_region_hierarchy():
+    """지역별 아파트/거래 수 집계 (캐시 미스 시)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
+        # 핫 서브셋 모드: 전체 기간 요약 테이블 사용
+        summary = {}
+        if DB_MODE == "hot":
+            cursor.execute("SELECT lawd_cd, apt_count, tx_count FROM region_summary")
+            summary = {r["lawd_cd"]: r for r in cursor.fetchall()}
+
         result = {}
         for city, districts in REGION_HIERARCHY.items():
             result[city] = []
             for code, name in districts.items():
-                # 해당 지역의 아파트/거래 수 조회
-                cursor.execute("""
-                    SELECT COUNT(DISTINCT a.id) as apt_count, COUNT(t.id) as tx_count
-                    FROM apartments a
-                    LEFT JOIN transactions t ON a.id = t.apt_id
-                    WHERE a.lawd_cd = ?
-                """, (code,))
-                row = cursor.fetchone()
+                if DB_MODE == "hot":
+                    row = summary.get(code)
+                else:
+                    # 해당 지역의 아파트/거래 수 조회
+                    cursor.execute("""
+                        SELECT COUNT(DISTINCT a.id) as apt_count, COUNT(t.id) as tx_count
+                        FROM apartments a
+                        LEFT JOIN transactions t ON a.id = t.apt_id
+                        WHERE a.lawd_cd = ?
+                    """, (code,))
+                    row = cursor.fetchone()
                 result[city].append({
                     "code": code,
                     "name": name,
@@ -926,8 +2288,6 @@ async def get_region_hierarchy():
                 })
             # 거래 수 기준 정렬
             result[city].sort(key=lambda x: x["tx_count"], reverse=True)
-        # 캐시에 저장
-        CACHE["hierarchy"][cache_key] = result
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -935,9 +2295,16 @@ async def get_region_hierarchy():
         conn.close()
 
 
-@app.get("/api/regions/{lawd_cd}/apartments")
-async def get_region_apartments(lawd_cd: str, limit: int = 50, offset: int = 0, sort: str = "tx_count"):
-    """특정 지역의 아파트 목록 반환"""
+@app.get("/api/regions/hierarchy")
+async def get_region_hierarchy():
+    """지역 계층 구조 반환 (시/도 > 구/군)"""
+    return await cached("hierarchy", "all", load_region_hierarchy)
+
+CACHE_LOADERS["hierarchy"] = lambda key: load_region_hierarchy()
+
+
+def load_region_apartments(lawd_cd: str, limit: int, offset: int, sort: str):
+    """지역 내 아파트 목록 조회 (캐시 미스 시)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -971,17 +2338,37 @@ async def get_region_apartments(lawd_cd: str, limit: int = 50, offset: int = 0,
     """
 
     try:
-        cursor.execute(query, (lawd_cd, limit, offset))
-        apartments = [dict(row) for row in cursor.fetchall()]
-
-        # 총 개수
-        cursor.execute("""
-            SELECT COUNT(DISTINCT a.id) as total
-            FROM apartments a
-            JOIN transactions t ON a.id = t.apt_id
+        # 핫 서브셋 모드: 단지별 전체 기간 요약 (최근 N개월 거래만으로 집계하지 않음)
+        summary_total = hot_summary(cursor, """
+            SELECT COUNT(*) as total
+            FROM apartment_summary s
+            JOIN apartments a ON a.id = s.apt_id
             WHERE a.lawd_cd = ?
         """, (lawd_cd,))
-        total = cursor.fetchone()["total"]
+        if summary_total is not None:
+            total = summary_total[0]["total"]
+            cursor.execute(f"""
+                SELECT a.id, a.name, a.dong, a.jibun, a.build_year,
+                       s.tx_count, s.max_amount, s.latest_amount, s.latest_area, s.latest_date
+                FROM apartments a
+                JOIN apartment_summary s ON s.apt_id = a.id
+                WHERE a.lawd_cd = ?
+                ORDER BY {order_by}
+                LIMIT ? OFFSET ?
+            """, (lawd_cd, limit, offset))
+            apartments = [dict(row) for row in cursor.fetchall()]
+        else:
+            cursor.execute(query, (lawd_cd, limit, offset))
+            apartments = [dict(row) for row in cursor.fetchall()]
+
+            # 총 개수
+            cursor.execute("""
+                SELECT COUNT(DISTINCT a.id) as total
+                FROM apartments a
+                JOIN transactions t ON a.id = t.apt_id
+                WHERE a.lawd_cd = ?
+            """, (lawd_cd,))
+            total = cursor.fetchone()["total"]
 
         # 지역명 찾기
         region_name = None
@@ -1002,27 +2389,46 @@ async def get_region_apartments(lawd_cd: str, limit: int = 50, offset: int = 0,
         conn.close()
 
 
-@app.get("/api/regions/{lawd_cd}/stats")
-async def get_region_stats(lawd_cd: str):
-    """특정 지역의 통계 정보"""
+@app.get("/api/regions/{lawd_cd}/apartments")
+async def get_region_apartments(lawd_cd: str, limit: int = 50, offset: int = 0, sort: str = "tx_count"):
+    """특정 지역의 아파트 목록 반환"""
+    return await cached("region_apartments", f"{lawd_cd}:{limit}:{offset}:{sort}",
+                        load_region_apartments, lawd_cd, limit, offset, sort)
+
+def _load_region_apartments_key(key: str):
+    lawd_cd, limit, offset, sort = key.split(":")
+    return load_region_apartments(lawd_cd, int(limit), int(offset), sort)
+
+CACHE_LOADERS["region_apartments"] = _load_region_apartments_key
+
+
+def load_region_stats(lawd_cd: str):
+    """지역 통계 + 최근 거래 조회 (캐시 미스 시)"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
-        # 기본 통계
-        cursor.execute("""
-            SELECT
-                COUNT(DISTINCT a.id) as apt_count,
-                COUNT(t.id) as tx_count,
-                AVG(t.amount) as avg_amount,
-                MAX(t.amount) as max_amount,
-                MIN(t.deal_date) as min_date,
-                MAX(t.deal_date) as max_date
-            FROM apartments a
-            LEFT JOIN transactions t ON a.id = t.apt_id
-            WHERE a.lawd_cd = ?
+        # 기본 통계 (핫 서브셋 모드: 전체 기간 요약)
+        summary = hot_summary(cursor, """
+            SELECT apt_count, tx_count, avg_amount, max_amount, min_date, max_date
+            FROM region_summary WHERE lawd_cd = ?
         """, (lawd_cd,))
-        stats = dict(cursor.fetchone())
+        if summary:
+            stats = dict(summary[0])
+        else:
+            cursor.execute("""
+                SELECT
+                    COUNT(DISTINCT a.id) as apt_count,
+                    COUNT(t.id) as tx_count,
+                    AVG(t.amount) as avg_amount,
+                    MAX(t.amount) as max_amount,
+                    MIN(t.deal_date) as min_date,
+                    MAX(t.deal_date) as max_date
+                FROM apartments a
+                LEFT JOIN transactions t ON a.id = t.apt_id
+                WHERE a.lawd_cd = ?
+            """, (lawd_cd,))
+            stats = dict(cursor.fetchone())
 
         # 최근 거래 5건
         cursor.execute("""
@@ -1054,19 +2460,32 @@ async def get_region_stats(lawd_cd: str):
         conn.close()
 
 
-# ========== 지역 통계 API ==========
-@app.get("/api/stats/regions")
-async def get_region_stats_api():
-    """지역별 통계 (평균가, 거래량, 전년비)"""
-    # 캐시 확인
-    cache_key = "all"
-    if cache_key in CACHE["stats_regions"]:
-        return CACHE["stats_regions"][cache_key]
+@app.get("/api/regions/{lawd_cd}/stats")
+async def get_region_stats(lawd_cd: str):
+    """특정 지역의 통계 정보"""
+    return await cached("region_stats", lawd_cd, load_region_stats, lawd_cd)
+
+CACHE_LOADERS["region_stats"] = load_region_stats
+
 
+# ========== 지역 통계 API ==========
+def load_region_stats_all():
+    """전 지역 평균가/거래량/전년비 집계 (캐시 미스 시)"""
     conn = get_db_connection()
     cursor = conn.cursor()
+    as_of = as_of_date()
 
     try:
+        # 핫 서브셋 모드: 전체 기간 요약 (최근 1년/1~2년 전 합계는 스냅샷 생성일 기준)
+        summary = hot_summary(cursor, """
+            SELECT lawd_cd, traded_apt_count, tx_count, avg_price, recent_sum, recent_count, prev_sum, prev_count,
+                   ROUND(recent_sum * 1.0 / recent_count, 0) as recent_avg,
+                   ROUND(prev_sum * 1.0 / prev_count, 0) as prev_avg
+            FROM region_summary
+        """)
+        if summary is not None:
+            return region_stats_from_summary({r["lawd_cd"]: r for r in summary})
+
         regions_data = []
 
         for city, districts in REGION_HIERARCHY.items():
@@ -1088,8 +2507,8 @@ async def get_region_stats_api():
                     SELECT ROUND(AVG(t.amount), 0) as recent_avg
                     FROM transactions t
                     JOIN apartments a ON t.apt_id = a.id
-                    WHERE a.lawd_cd = ? AND t.deal_date >= date('now', '-1 year')
-                """, (code,))
+                    WHERE a.lawd_cd = ? AND t.deal_date >= date(?, '-1 year')
+                """, (code, as_of))
                 recent = cursor.fetchone()
 
                 # 전년도 같은 기간 평균가 (1~2년 전)
@@ -1098,9 +2517,9 @@ async def get_region_stats_api():
                     FROM transactions t
                     JOIN apartments a ON t.apt_id = a.id
                     WHERE a.lawd_cd = ?
-                      AND t.deal_date >= date('now', '-2 year')
-                      AND t.deal_date < date('now', '-1 year')
-                """, (code,))
+                      AND t.deal_date >= date(?, '-2 year')
+                      AND t.deal_date < date(?, '-1 year')
+                """, (code, as_of, as_of))
                 prev = cursor.fetchone()
 
                 # 전년비 계산
@@ -1123,24 +2542,24 @@ async def get_region_stats_api():
             SELECT ROUND(AVG(t.amount), 0) as avg
             FROM transactions t
             JOIN apartments a ON t.apt_id = a.id
-            WHERE a.lawd_cd LIKE '11%' AND t.deal_date >= date('now', '-1 year')
-        """)
+            WHERE a.lawd_cd LIKE '11%' AND t.deal_date >= date(?, '-1 year')
+        """, (as_of,))
         seoul_avg = cursor.fetchone()['avg'] or 0
 
         cursor.execute("""
             SELECT ROUND(AVG(t.amount), 0) as avg
             FROM transactions t
             JOIN apartments a ON t.apt_id = a.id
-            WHERE a.lawd_cd LIKE '41%' AND t.deal_date >= date('now', '-1 year')
-        """)
+            WHERE a.lawd_cd LIKE '41%' AND t.deal_date >= date(?, '-1 year')
+        """, (as_of,))
         gyeonggi_avg = cursor.fetchone()['avg'] or 0
 
         cursor.execute("""
             SELECT ROUND(AVG(t.amount), 0) as avg
             FROM transactions t
             JOIN apartments a ON t.apt_id = a.id
-            WHERE a.lawd_cd LIKE '28%' AND t.deal_date >= date('now', '-1 year')
-        """)
+            WHERE a.lawd_cd LIKE '28%' AND t.deal_date >= date(?, '-1 year')
+        """, (as_of,))
         incheon_avg = cursor.fetchone()['avg'] or 0
 
         # 정렬 (거래량 순)
@@ -1154,8 +2573,6 @@ async def get_region_stats_api():
                 "incheon_avg": incheon_avg
             }
         }
-        # 캐시에 저장
-        CACHE["stats_regions"][cache_key] = result
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1163,14 +2580,248 @@ async def get_region_stats_api():
         conn.close()
 
 
+def region_stats_from_summary(summary: dict):
+    """load_region_stats_all과 같은 응답을 region_summary 행으로 (핫 서브셋 모드)"""
+    regions_data = []
+    for city, districts in REGION_HIERARCHY.items():
+        for code, name in districts.items():
+            row = summary.get(code)
+            yoy_change = None
+            if row and row["recent_avg"] and row["prev_avg"] and row["prev_avg"] > 0:
+                yoy_change = round((row["recent_avg"] / row["prev_avg"] - 1) * 100, 1)
+            regions_data.append({
+                "code": code,
+                "name": name,
+                "city": city,
+                "avg_price": (row["avg_price"] if row else None) or 0,
+                "tx_count": (row["tx_count"] if row else None) or 0,
+                "apt_count": (row["traded_apt_count"] if row else None) or 0,
+                "yoy_change": yoy_change
+            })
+
+    def city_avg(prefix: str):
+        # 시도 전체 최근 1년 평균 = 지역별 합계/건수 합 (지역 평균의 평균이 아님)
+        rows = [r for code, r in summary.items() if code.startswith(prefix)]
+        count = sum(r["recent_count"] or 0 for r in rows)
+        total = sum(r["recent_sum"] or 0 for r in rows)
+        return float(int(total / count + 0.5)) if count else 0
+
+    regions_data.sort(key=lambda x: x['tx_count'], reverse=True)
+    return {
+        "regions": regions_data,
+        "summary": {
+            "seoul_avg": city_avg("11"),
+            "gyeonggi_avg": city_avg("41"),
+            "incheon_avg": city_avg("28")
+        }
+    }
+
+
+@app.get("/api/stats/regions")
+async def get_region_stats_api():
+    """지역별 통계 (평균가, 거래량, 전년비)"""
+    return await cached("stats_regions", "all", load_region_stats_all)
+
+CACHE_LOADERS["stats_regions"] = lambda key: load_region_stats_all()
+
+
+# ========== 급매 레이더 (최근 거래 전체를 직전 3개월 평균 대비 할인율로 순위) ==========
+BARGAIN_MAX_DAYS = 90
+BARGAIN_MIN_SAMPLES = 2    # 비교 거래가 이보다 적으면 평균이 불안정해서 제외
+BARGAIN_KEEP = 200         # 캐시에 보관하는 상위 건수 (limit은 여기서 자름)
+
+def load_bargains(lawd_cd: Optional[str], days: int):
+    """
+    최근 days일 거래 전체의 급매 지수 (bargain_radar.py에서 한 번에 계산)
+    - 필요한 행: 최근 거래 + 그 직전 3개월 창 (단지별 SQL 없이 조회 1회)
+    - 수집 후 무효화되면 인기 키 재적재(CACHE_WARM_NAMESPACES)로 다시 계산
+    """
+    import numpy as np
+    from bargain_radar import trailing_averages
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    as_of = as_of_date()
+    try:
+        region_condition = "AND a.lawd_cd = ?" if lawd_cd else ""
+        params = [as_of, f"-{days} days", as_of, f"-{days} days"] + ([lawd_cd] if lawd_cd else [])
+        cursor.row_factory = None  # 창 전체를 튜플로 (Row 생성 비용 없이 바로 배열로)
+        cursor.execute(f"""
+            SELECT t.id, t.apt_id, t.area, t.amount,
+                   julianday(t.deal_date), julianday(date(t.deal_date, '-3 months')),
+                   t.deal_date >= date(?, ?)
+            FROM transactions t
+            JOIN apartments a ON a.id = t.apt_id
+            WHERE t.deal_date >= date(?, ?, '-3 months') {region_condition}
+        """, params)
+        rows = cursor.fetchall()
+        window = np.array(rows, dtype=np.float64).reshape(-1, 7)
+        targets = np.flatnonzero(window[:, 6] == 1)
+
+        averages, samples = trailing_averages(window[:, 1], window[:, 2], window[:, 4], window[:, 5],
+                                              window[:, 3], targets)
+        scored = samples >= BARGAIN_MIN_SAMPLES
+        amounts = window[targets, 3]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            percents = np.round((amounts - averages) / averages * 100, 1)
+        candidates = np.flatnonzero(scored & (percents < 0))
+        top = candidates[np.argsort(percents[candidates], kind="stable")[:BARGAIN_KEEP]]
+
+        bargains = []
+        if len(top):
+            tx_ids = [int(window[targets[i], 0]) for i in top]
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(f"""
+                SELECT t.id, t.apt_id, t.amount, t.area, t.floor, t.deal_date,
+                       a.name as apt_name, a.lawd_cd, a.dong, i.summary_text
+                FROM transactions t
+                JOIN apartments a ON a.id = t.apt_id
+                LEFT JOIN transaction_insights i ON t.id = i.transaction_id
+                WHERE t.id IN ({",".join("?" * len(tx_ids))})
+            """, tx_ids)
+            details = {row["id"]: dict(row) for row in cursor.fetchall()}
+            for i, tx_id in zip(top.tolist(), tx_ids):
+                deal = details[tx_id]
+                deal["region_name"] = get_region_name(deal["lawd_cd"])
+                deal["avg_3m"] = int(averages[i])
+                deal["samples"] = int(samples[i])
+                deal["bargain_amount"] = deal["amount"] - deal["avg_3m"]
+                deal["bargain_percent"] = float(percents[i])
+                bargains.append(deal)
+
+        return {
+            "lawd_cd": lawd_cd,
+            "region_name": get_region_name(lawd_cd) if lawd_cd else "수도권 전체",
+            "days": days,
+            "as_of": as_of,
+            "recent_deals": int(len(targets)),
+            "scored_deals": int(scored.sum()),
+            "bargains": bargains,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        conn.close()
+
+@app.get("/api/bargains")
+async def get_bargains(lawd_cd: Optional[str] = None, days: int = 30, limit: int = 50):
+    """
+    급매 레이더: 최근 days일(최대 90) 거래를 같은 단지·평형의 직전 3개월 평균 대비 할인율 순으로
+    lawd_cd 없으면 수도권 전체
+    """
+    if lawd_cd and lawd_cd not in REGION_CODE_TO_NAME:
+        raise HTTPException(status_code=404, detail="Region not found")
+    days = min(max(days, 1), BARGAIN_MAX_DAYS)
+    result = await cached("bargains", f"{lawd_cd or 'all'}:{days}", load_bargains, lawd_cd, days)
+    return {**result, "bargains": result["bargains"][:min(max(limit, 1), BARGAIN_KEEP)]}
+
+def _load_bargains_key(key: str):
+    lawd_cd, days = key.split(":")
+    return load_bargains(None if lawd_cd == "all" else lawd_cd, int(days))
+
+CACHE_LOADERS["bargains"] = _load_bargains_key
+
+
+# ========== 신고가 / 하락 리더보드 (수집 시 ingest.record_price가 deal_events에 기록) ==========
+LEADERBOARD_PERIODS = {"day": 1, "week": 7, "month": 30, "quarter": 90, "year": 365}
+LEADERBOARD_KEEP = 100
+
+def load_leaderboard(kind: str, period: str, lawd_cd: Optional[str]):
+    """기간 내 신고가(직전 전고점 대비 상승폭 순) / 하락(전고점 대비 하락폭 순) 거래"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    as_of = as_of_date()
+    try:
+        has_table = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'deal_events'"
+        ).fetchone()
+        if not has_table:
+            # 이전 DB: 단지별 전체 스캔으로 대신하지 않고 backfill 안내
+            raise HTTPException(status_code=503, detail="Leaderboard not built (python ingest.py backfill)")
+
+        region_condition = "AND a.lawd_cd = ?" if lawd_cd else ""
+        params = [kind, as_of, f"-{LEADERBOARD_PERIODS[period]} days"] + ([lawd_cd] if lawd_cd else [])
+        cursor.execute(f"""
+            SELECT e.transaction_id as id, e.apt_id, a.name as apt_name, a.lawd_cd, a.dong,
+                   t.area, t.floor, e.deal_date, e.amount,
+                   e.reference_amount as previous_peak, e.change_pct
+            FROM deal_events e
+            JOIN apartments a ON a.id = e.apt_id
+            JOIN transactions t ON t.id = e.transaction_id
+            WHERE e.kind = ? AND e.deal_date >= date(?, ?) {region_condition}
+            ORDER BY e.change_pct DESC, e.deal_date DESC
+            LIMIT {LEADERBOARD_KEEP}
+        """, params)
+        deals = []
+        for row in cursor.fetchall():
+            deal = dict(row)
+            deal["region_name"] = get_region_name(deal["lawd_cd"])
+            deals.append(deal)
+        return {"kind": kind, "period": period, "lawd_cd": lawd_cd, "as_of": as_of, "deals": deals}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        conn.close()
+
+async def leaderboard(kind: str, period: str, lawd_cd: Optional[str], limit: int):
+    if period not in LEADERBOARD_PERIODS:
+        raise HTTPException(status_code=400, detail=f"period: {' | '.join(LEADERBOARD_PERIODS)}")
+    if lawd_cd and lawd_cd not in REGION_CODE_TO_NAME:
+        raise HTTPException(status_code=404, detail="Region not found")
+    result = await cached("leaderboards", f"{kind}:{period}:{lawd_cd or 'all'}", load_leaderboard, kind, period, lawd_cd)
+    return {**result, "deals": result["deals"][:min(max(limit, 1), LEADERBOARD_KEEP)]}
+
+@app.get("/api/leaderboards/new-highs")
+async def get_new_highs(period: str = "week", lawd_cd: Optional[str] = None, limit: int = 30):
+    """신고가 리더보드 - period: day | week | month | quarter | year (거래일 기준)"""
+    return await leaderboard("new_high", period, lawd_cd, limit)
+
+@app.get("/api/leaderboards/drops")
+async def get_drops(period: str = "week", lawd_cd: Optional[str] = None, limit: int = 30):
+    """전고점 대비 하락폭 리더보드 (10% 이상 하락 거래)"""
+    return await leaderboard("drop", period, lawd_cd, limit)
+
+def _load_leaderboard_key(key: str):
+    kind, period, lawd_cd = key.split(":")
+    return load_leaderboard(kind, period, None if lawd_cd == "all" else lawd_cd)
+
+CACHE_LOADERS["leaderboards"] = _load_leaderboard_key
+
+
+# ========== 헬스 체크 ==========
+@app.get("/healthz")
+async def healthz():
+    """Liveness: 프로세스가 요청을 받을 수 있는지만 확인 (DB 조회 없음)"""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: DB 로드 + 첫 화면 캐시 준비 완료 여부, 시작 단계별 소요 시간 포함"""
+    ready = all(READY.values())
+    body = {
+        "status": "ready" if ready else "starting",
+        "checks": READY,
+        "db_mode": DB_MODE,
+        "generation": DB_GENERATION,
+        "data_version": DATA_VERSION,
+        "as_of": AS_OF_DATE,
+        "startup": STARTUP_TRACE,
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
 # ========== 캐시 관리 API ==========
 @app.post("/api/cache/clear")
-async def clear_cache(secret: str = ""):
-    """수집 완료 시 캐시 무효화 (간단한 보안)"""
-    if secret != "수집완료":
-        raise HTTPException(status_code=403, detail="Invalid secret")
-    clear_all_cache()
-    return {"status": "cleared", "time": time_module.time()}
+async def clear_cache(secret: str = "", hard: bool = False):
+    """수집 완료 시 캐시 무효화 (간단한 보안). 기본은 stale 표시, hard=true면 삭제"""
+    check_admin(secret)
+    clear_all_cache(hard=hard)
+    return {"status": "cleared" if hard else "stale", "time": time_module.time()}
 
 
 @app.get("/api/cache/stats")
@@ -1178,26 +2829,121 @@ async def cache_stats():
     """캐시 통계 반환 (디버깅용)"""
     return {
         "stats": get_cache_stats(),
+        "stale": get_stale_stats(),
+        "refreshing": len(_refreshing),
+        "shared": {
+            "enabled": SHARED is not None,
+            "entries": await run_in_threadpool(SHARED.count) if SHARED is not None else 0,
+            "last_event_id": _last_event_id,
+            "worker_pid": os.getpid(),
+        },
+        "popular": {ns: POPULARITY.top(ns, 10) for ns in CACHE_WARM_NAMESPACES},
         "time": time_module.time()
     }
 
 
+@app.get("/api/admission/stats")
+async def admission_stats():
+    """라우트별 입장 제어 현황 (동시 실행/대기/차단 수) + 쿼리 중단 수"""
+    gates = {name: gate.stats() for name, gate in ADMISSION.items()}
+    return {
+        "gates": gates,
+        "shed_total": sum(g["shed_queue_full"] + g["shed_timeout"] for g in gates.values()),
+        "query_aborts": QUERY_ABORTS,
+        "time": time_module.time()
+    }
+
+
+@app.get("/api/batch/stats")
+async def batch_stats():
+    """상세/이력 묶음 조회 현황 (묶음 크기, 대기 시간) + 요청 내 병렬 조회 현황"""
+    return {
+        "loaders": {loader.name: loader.stats() for loader in (DETAIL_BATCH, HISTORY_BATCH)},
+        "fanout": {**FANOUT.stats(), "per_request_limit": QUERY_PARALLELISM},
+        "time": time_module.time()
+    }
+
+
+# ========== 프로파일링 API (관리자 전용) ==========
+def profile_path(profile_id: str, ext: str) -> str:
+    if not re.fullmatch(r"(req|sample)-\d+", profile_id):
+        raise HTTPException(status_code=400, detail="잘못된 프로파일 id")
+    path = os.path.join(PROFILE_DIR, profile_id + ext)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다")
+    return path
+
+@app.get("/api/admin/profiles")
+async def list_profiles(secret: str = ""):
+    """저장된 요청 프로파일 / 샘플링 결과 목록 (최신순)"""
+    check_admin(secret)
+    if not os.path.isdir(PROFILE_DIR):
+        return {"profiles": [], "sampler": _sampler.status() if _sampler else None}
+    found = profile_files(PROFILE_DIR)
+    profiles = [{"id": profile_id, "files": sorted(exts)}
+                for profile_id, (_, exts) in sorted(found.items(), key=lambda x: x[1][0], reverse=True)]
+    return {"profiles": profiles, "sampler": _sampler.status() if _sampler else None}
+
+@app.get("/api/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, secret: str = "", sort: str = "cumulative", limit: int = 40):
+    """
+    요청 프로파일 보고서 (text) - sort: cumulative | tottime | calls
+    샘플링 결과(sample-*)는 collapsed stack 원본 (flamegraph 입력)
+    """
+    import pstats
+    from profiling import format_report
+    check_admin(secret)
+    if profile_id.startswith("sample-"):
+        with open(profile_path(profile_id, ".folded"), "r", encoding="utf-8") as f:
+            return Response(f.read(), media_type="text/plain; charset=utf-8")
+    if sort not in ("cumulative", "tottime", "calls"):
+        raise HTTPException(status_code=400, detail="sort: cumulative | tottime | calls")
+    path = profile_path(profile_id, ".prof")
+    with open(profile_path(profile_id, ".txt"), "r", encoding="utf-8") as f:
+        header = f.read().split("\n\n", 1)[0].split("\n")
+    stats = pstats.Stats(path)
+    summary = dict(item.split("=", 1) for item in header[1].split(" ")) if len(header) > 1 else {}
+    return Response(format_report(header[0], summary, stats, sort, limit), media_type="text/plain; charset=utf-8")
+
+@app.post("/api/admin/profile/sample")
+async def start_sampling(secret: str = "", seconds: float = 30, interval_ms: float = 10):
+    """N초 동안 전체 스레드 스택 샘플링 시작 (한 번에 하나) → 완료 후 /api/admin/profiles/{id}"""
+    global _sampler
+    check_admin(secret)
+    if _sampler is not None and _sampler.is_alive():
+        raise HTTPException(status_code=409, detail="이미 샘플링 중입니다")
+    seconds = min(max(seconds, 1), PROFILE_SAMPLE_MAX_SEC)
+    _sampler = SamplingProfiler(PROFILE_DIR, seconds, max(interval_ms, 1) / 1000)
+    _sampler.start()
+    print(f"[PROFILE] Sampling {seconds}s every {interval_ms}ms -> {_sampler.profile_id}", flush=True)
+    return _sampler.status()
+
+@app.post("/api/admin/profile/sample/stop")
+async def stop_sampling(secret: str = ""):
+    """진행 중인 샘플링을 조기 종료 (그때까지의 결과 저장)"""
+    check_admin(secret)
+    if _sampler is None or not _sampler.is_alive():
+        raise HTTPException(status_code=404, detail="진행 중인 샘플링이 없습니다")
+    _sampler.stop_event.set()
+    return _sampler.status()
+
+
 @app.post("/api/db/reload")
 async def reload_database(secret: str = ""):
     """R2에서 최신 DB 다운로드 및 교체 (수집 완료 후 호출)"""
-    if secret != "수집완료":
-        raise HTTPException(status_code=403, detail="Invalid secret")
+    check_admin(secret)
 
     try:
-        from r2_utils import download_db
+        from r2_utils import download_db, MANIFEST_SUFFIX
 
         db_path = os.environ.get("DB_PATH", "real_estate.db")
         temp_path = db_path + ".new"
         backup_path = db_path + ".backup"
 
-        # 새 DB 다운로드
+        # 새 DB 다운로드 (이벤트 루프를 막지 않도록 스레드에서 - 핫 서브셋 서빙 유지)
+        import asyncio
         print(f"[DB] Downloading new database from R2...")
-        success = download_db(temp_path)
+        success = await asyncio.to_thread(download_db, temp_path)
 
         if not success:
             raise HTTPException(status_code=500, detail="Failed to download DB from R2")
@@ -1210,17 +2956,24 @@ async def reload_database(secret: str = ""):
 
         # 기존 DB 백업 및 교체
         if os.path.exists(db_path):
-            shutil.copy2(db_path, backup_path)
+            await asyncio.to_thread(shutil.copy2, db_path, backup_path)
         shutil.move(temp_path, db_path)
+        # 스냅샷 manifest도 함께 교체 (없으면 이전 manifest 제거)
+        if os.path.exists(temp_path + MANIFEST_SUFFIX):
+            shutil.move(temp_path + MANIFEST_SUFFIX, db_path + MANIFEST_SUFFIX)
+        elif os.path.exists(db_path + MANIFEST_SUFFIX):
+            os.remove(db_path + MANIFEST_SUFFIX)
 
-        # 캐시 클리어
-        clear_all_cache()
+        # 캐시 비우기 (다른 워커에도 전파) - 이전 DB(핫 서브셋일 수 있음)로 계산한 값을
+        # stale로라도 다시 응답하면 교체 후에는 부분 데이터 표시 없이 나가므로 hard
+        clear_all_cache(hard=True, event="reload")
 
         new_size_mb = new_size / (1024 * 1024)
         print(f"[DB] Database reloaded successfully: {new_size_mb:.1f} MB")
 
         return {
             "status": "reloaded",
+            "mode": DB_MODE,
             "size_mb": round(new_size_mb, 1),
             "time": time_module.time()
         }
@@ -1232,6 +2985,9 @@ async def reload_database(secret: str = ""):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+trace_startup("app_construction")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,47 @@
+"""
+급매 레이더 점수 계산 (NumPy, 최근 거래 창 전체를 한 번에)
+- 단지 상세의 급매 지수와 같은 정의: 거래가 vs 같은 단지·같은 평형 그룹(±2㎡)의 직전 3개월 평균
+  (거래일 미포함, 3개월 전 날짜는 SQLite date(deal_date, '-3 months')로 미리 계산해서 전달)
+- 단지별 SQL 대신: (단지, 거래일) 정렬 + searchsorted로 각 대상 거래의 직전 3개월 구간을 찾고,
+  구간 안의 (대상, 비교 거래) 쌍을 펼쳐 면적 조건을 마스크한 뒤 bincount로 합계/개수
+"""
+
+import numpy as np
+
+
+def trailing_averages(apt, area, day, window_start, amount, targets):
+    """
+    대상 거래(targets: 인덱스)마다 직전 3개월 같은 평형 그룹 평균가 → (평균(반올림), 비교 거래 수)
+    day/window_start는 같은 단위의 숫자 날짜 (예: julianday)
+    """
+    apt = np.asarray(apt, dtype=np.int64)
+    area = np.asarray(area, dtype=np.float64)
+    day = np.asarray(day, dtype=np.float64)
+    window_start = np.asarray(window_start, dtype=np.float64)
+    amount = np.asarray(amount, dtype=np.float64)
+    targets = np.asarray(targets, dtype=np.int64)
+    if len(targets) == 0:
+        return np.zeros(0), np.zeros(0, dtype=np.int64)
+
+    # (단지, 날짜) 복합 키로 정렬 → 단지별 날짜 구간을 이분 탐색
+    base = min(day.min(), window_start.min())
+    scale = float(np.ceil(max(day.max(), window_start.max()) - base) + 2)
+    order = np.lexsort((day, apt))
+    key = apt[order] * scale + (day[order] - base)
+    lo = np.searchsorted(key, apt[targets] * scale + (window_start[targets] - base), side="left")
+    hi = np.searchsorted(key, apt[targets] * scale + (day[targets] - base), side="left")  # 당일 제외
+
+    # (대상, 비교 거래) 쌍 펼치기
+    counts = hi - lo
+    owner = np.repeat(np.arange(len(targets)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    candidates = order[np.repeat(lo, counts) + offsets]
+
+    target_area = area[targets][owner]
+    same_group = (area[candidates] >= target_area - 2) & (area[candidates] <= target_area + 2)
+    owner = owner[same_group]
+    sums = np.bincount(owner, weights=amount[candidates[same_group]], minlength=len(targets))
+    samples = np.bincount(owner, minlength=len(targets))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        averages = np.floor(sums / samples + 0.5)  # SQLite ROUND(x, 0)과 같게 (양수)
+    return averages, samples
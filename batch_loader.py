@@ -0,0 +1,136 @@
+"""
+요청 묶음 처리 (DataLoader 방식)
+- 짧은 시간(window) 안에 들어온 단건 조회를 모아 한 번의 IN (...) 쿼리로 실행하고 결과를 나눠줌
+- 로더는 스레드풀/내보내기 스레드에서 호출되므로 스레드 기반:
+  첫 호출(leader)이 window만큼 기다렸다가 모인 키로 batch 함수를 실행, 나머지는 결과 대기
+- leader 요청이 중단(연결 종료/기한 초과)되어 묶음 쿼리가 실패하면
+  나머지는 자기 요청 컨텍스트에서 단건으로 다시 실행 (다른 요청 때문에 실패하지 않도록)
+- 기다리는 동안에도 자기 요청의 QueryGuard(남은 기한/연결 종료)를 검사해 먼저 포기할 수 있음
+"""
+
+import time
+import threading
+
+from query_guard import current_guard
+
+WAIT_POLL_SEC = 0.05  # 대기 중 자기 요청의 연결 종료/기한 검사 주기
+
+
+class BatchWaitAborted(Exception):
+    """묶음 결과를 기다리던 요청이 자기 기한 초과/연결 종료로 포기"""
+
+
+class _Batch:
+    __slots__ = ("keys", "full", "done", "results", "error", "created_at")
+
+    def __init__(self):
+        self.keys = {}  # key -> 등록 시각 (중복 키는 한 번만 조회)
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+        self.created_at = time.monotonic()
+
+
+class BatchLoader:
+    """
+    batch_fn(keys: list) -> {key: value} (결과에 없는 키는 None)
+    load(key)는 블로킹 호출 (이벤트 루프가 아닌 스레드에서 사용)
+    """
+
+    def __init__(self, name: str, batch_fn, window_ms: float = 2.0, max_batch: int = 64):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending = None
+
+        # 지표
+        self.batches = 0
+        self.keys_loaded = 0
+        self.max_batch_seen = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.fallbacks = 0
+        self.errors = 0
+        self.abandoned = 0
+
+    def load(self, key):
+        with self._lock:
+            batch = self._pending
+            leader = batch is None
+            if leader:
+                batch = self._pending = _Batch()
+            batch.keys.setdefault(key, time.monotonic())
+            if len(batch.keys) >= self.max_batch:
+                self._pending = None  # 다음 호출은 새 묶음으로
+                batch.full.set()
+
+        if leader:
+            self._dispatch(batch)
+        else:
+            self._wait(batch)
+
+        if batch.error is not None:
+            if leader:
+                raise batch.error
+            # 묶음 실패 → 이 요청 컨텍스트(자기 QueryGuard)로 단건 재실행
+            with self._lock:
+                self.fallbacks += 1
+            return self.batch_fn([key]).get(key)
+        return batch.results.get(key)
+
+    def _wait(self, batch: _Batch):
+        """
+        (follower) 묶음 결과 대기 - 묶음은 leader 요청 컨텍스트에서 실행되므로
+        자기 QueryGuard의 남은 기한 / 연결 종료는 여기서 직접 검사 (guard.aborted 설정 → run_query가 504/499)
+        """
+        guard = current_guard()
+        if guard is None:
+            batch.done.wait()
+            return
+        while not batch.done.wait(min(WAIT_POLL_SEC, max(guard.deadline - time.monotonic(), 0))):
+            if guard.check():
+                with self._lock:
+                    self.abandoned += 1
+                raise BatchWaitAborted(f"{self.name} batch wait aborted ({guard.aborted})")
+
+    def _dispatch(self, batch: _Batch):
+        batch.full.wait(self.window)
+        with self._lock:
+            if self._pending is batch:
+                self._pending = None
+            keys = list(batch.keys)
+
+            now = time.monotonic()
+            waits = [now - t for t in batch.keys.values()]
+            self.batches += 1
+            self.keys_loaded += len(keys)
+            self.max_batch_seen = max(self.max_batch_seen, len(keys))
+            self.wait_total += sum(waits)
+            self.wait_max = max(self.wait_max, max(waits))
+
+        try:
+            batch.results = self.batch_fn(keys)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            batch.error = e
+        finally:
+            batch.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "keys": self.keys_loaded,
+                "avg_batch_size": round(self.keys_loaded / self.batches, 2) if self.batches else 0,
+                "max_batch_size": self.max_batch_seen,
+                "avg_wait_ms": round(self.wait_total / self.keys_loaded * 1000, 2) if self.keys_loaded else 0,
+                "max_wait_ms": round(self.wait_max * 1000, 2),
+                "fallbacks": self.fallbacks,
+                "errors": self.errors,
+                "abandoned": self.abandoned,
+                "window_ms": self.window * 1000,
+            }
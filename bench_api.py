@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+API 벤치마크 (합성 DB 규모별 p50/p95/p99 + 처리량 + RSS, 커밋 간 회귀 비교)
+- synthetic_db로 결정적 합성 DB 생성 (규모/시드/기준일별로 bench_data/에 보관 → 재사용)
+- uvicorn 프로세스를 띄워 check_query_budget.ENDPOINTS 전체를 측정
+  cold: 캐시 hard clear 직후 동시 클라이언트 C개가 같은 요청 (합치기 포함 첫 계산 지연)
+  warm: 한 번 채운 뒤 동시 클라이언트 C개가 반복 요청 (캐시 응답 지연 + 처리량)
+- 서버 RSS(워커 포함)를 측정 중 주기적으로 샘플링 → 최대값
+- 결과는 JSON (bench_results/<커밋>-<규모>.json), --compare로 두 결과 비교 → 회귀 시 exit 1
+
+Usage:
+  python bench_api.py [--scale 100k|5M|20M] [--concurrency 8] [--requests 200] [--cold-rounds 3]
+                      [--workers 1] [--only search,stats] [--out result.json]
+  python bench_api.py --compare base.json new.json [--threshold 0.2] [--min-ms 2]
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import subprocess
+import http.client
+import urllib.parse
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "bench_data")
+RESULTS_DIR = os.path.join(BASE_DIR, "bench_results")
+SCALES = {"100k": 100_000, "5M": 5_000_000, "20M": 20_000_000}
+ADMIN_SECRET = os.environ.get("ADMIN_SECRET") or "수집완료"
+RSS_SAMPLE_SEC = 0.2
+READY_TIMEOUT_SEC = 120
+
+
+def parse_scale(value: str) -> int:
+    if value in SCALES:
+        return SCALES[value]
+    suffix = value[-1].lower()
+    if suffix in ("k", "m"):
+        return int(float(value[:-1]) * (1000 if suffix == "k" else 1_000_000))
+    return int(value)
+
+
+def scale_label(transactions: int) -> str:
+    for label, count in SCALES.items():
+        if count == transactions:
+            return label
+    return str(transactions)
+
+
+def synthetic_db(transactions: int, seed: int) -> str:
+    """규모/시드/기준일이 같으면 이전에 만든 DB 재사용 (20M은 생성에 수 분 걸림)"""
+    import synthetic_db as synth
+
+    as_of = date.today()
+    path = os.path.join(DATA_DIR, f"synth-{transactions}-{seed}-{as_of.isoformat()}.db")
+    if os.path.exists(path):
+        print(f"[BENCH] Reusing {path}")
+        return path
+    os.makedirs(DATA_DIR, exist_ok=True)
+    for name in os.listdir(DATA_DIR):  # 같은 규모의 지난 기준일 DB는 정리
+        if name.startswith(f"synth-{transactions}-{seed}-"):
+            os.remove(os.path.join(DATA_DIR, name))
+    tmp = path + ".tmp"
+    synth.build(tmp, transactions, seed, as_of)
+    os.replace(tmp, path)
+    return path
+
+
+# ========== 서버 프로세스 ==========
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path: str, workers: int):
+    """작업 폴더(real_estate.db → 합성 DB)에서 uvicorn 실행 → (proc, port, 시작~ready 초)"""
+    workdir = os.path.join(DATA_DIR, "run")
+    os.makedirs(workdir, exist_ok=True)
+    for name in os.listdir(workdir):  # 이전 실행의 캐시 스냅샷/공유 캐시가 cold 측정에 섞이지 않도록
+        path = os.path.join(workdir, name)
+        if os.path.isfile(path) or os.path.islink(path):
+            os.remove(path)
+        else:
+            import shutil
+            shutil.rmtree(path)
+    os.symlink(db_path, os.path.join(workdir, "real_estate.db"))
+
+    port = free_port()
+    env = dict(os.environ)
+    env["PYTHONPATH"] = BASE_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    env["CACHE_WARM_TOP_N"] = "0"  # 무효화 후 인기 키 재적재가 cold 측정을 가리지 않도록
+    cmd = [sys.executable, "-m", "uvicorn", "api_server:app", "--host", "127.0.0.1", "--port", str(port),
+           "--log-level", "warning"]
+    if workers > 1:
+        cmd += ["--workers", str(workers)]
+    start = time.perf_counter()
+    log = open(os.path.join(workdir, "server.log"), "wb")
+    proc = subprocess.Popen(cmd, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = start + READY_TIMEOUT_SEC
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            status, _ = request(port, "GET", "/readyz")
+            if status == 200:
+                return proc, port, time.perf_counter() - start
+        except OSError:
+            pass
+        time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError(f"server not ready after {READY_TIMEOUT_SEC}s")
+
+
+def request(port: int, method: str, url: str, conn: http.client.HTTPConnection = None):
+    """요청 하나 → (상태 코드, 초). conn을 주면 keep-alive 재사용"""
+    own = conn is None
+    conn = conn or http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    path, _, query = url.partition("?")
+    target = urllib.parse.quote(path) + ("?" + urllib.parse.quote(query, safe="=&,") if query else "")
+    start = time.perf_counter()
+    try:
+        conn.request(method, target)
+        resp = conn.getresponse()
+        resp.read()
+        return resp.status, time.perf_counter() - start
+    finally:
+        if own:
+            conn.close()
+
+
+def process_rss_kb(pid: int) -> int:
+    """서버 + 자식(워커) 프로세스 RSS 합 (KB, ps 기반 → Linux/macOS)"""
+    out = subprocess.run(["ps", "-A", "-o", "pid=,ppid=,rss="], capture_output=True, text=True).stdout
+    total = 0
+    for line in out.splitlines():
+        fields = line.split()
+        if len(fields) == 3 and (int(fields[0]) == pid or int(fields[1]) == pid):
+            total += int(fields[2])
+    return total
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, pid: int):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.peak_kb = 0
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.peak_kb = max(self.peak_kb, process_rss_kb(self.pid))
+            self.stop_event.wait(RSS_SAMPLE_SEC)
+
+
+# ========== 측정 ==========
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(latencies: list, statuses: list, elapsed: float) -> dict:
+    ms = [t * 1000 for t in latencies]
+    return {
+        "requests": len(ms),
+        "errors": sum(1 for s in statuses if s >= 500),
+        "statuses": sorted(set(statuses)),
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "max_ms": round(max(ms), 2) if ms else 0.0,
+        "throughput_rps": round(len(ms) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def clear_cache(port: int):
+    status, _ = request(port, "POST", f"/api/cache/clear?secret={ADMIN_SECRET}&hard=true")
+    if status != 200:
+        raise RuntimeError(f"cache clear failed: {status}")
+
+
+def run_cold(port: int, url: str, concurrency: int, rounds: int, pool: ThreadPoolExecutor) -> dict:
+    """라운드마다 hard clear 후 동시 클라이언트가 같은 요청을 한꺼번에"""
+    latencies, statuses = [], []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        clear_cache(port)
+        barrier = threading.Barrier(concurrency)
+
+        def client(_):
+            barrier.wait()
+            return request(port, "GET", url)
+
+        for status, elapsed in pool.map(client, range(concurrency)):
+            statuses.append(status)
+            latencies.append(elapsed)
+    return summarize(latencies, statuses, time.perf_counter() - start)
+
+
+def run_warm(port: int, url: str, concurrency: int, total: int, pool: ThreadPoolExecutor) -> dict:
+    """한 번 채운 뒤 클라이언트(keep-alive 커넥션)마다 total/concurrency회 반복"""
+    request(port, "GET", url)
+    per_client = max(1, total // concurrency)
+
+    def client(_):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        results = []
+        try:
+            for _ in range(per_client):
+                results.append(request(port, "GET", url, conn))
+        finally:
+            conn.close()
+        return results
+
+    start = time.perf_counter()
+    results = [r for batch in pool.map(client, range(concurrency)) for r in batch]
+    elapsed = time.perf_counter() - start
+    return summarize([r[1] for r in results], [r[0] for r in results], elapsed)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_bench(args) -> dict:
+    from check_query_budget import endpoint_urls
+
+    transactions = parse_scale(args.scale)
+    db_path = synthetic_db(transactions, args.seed)
+    urls = endpoint_urls(db_path)
+    if args.only:
+        urls = {name: url for name, url in urls.items() if name in args.only.split(",")}
+
+    proc, port, ready_sec = start_server(db_path, args.workers)
+    print(f"[BENCH] Server ready in {ready_sec:.2f}s (port {port}, workers {args.workers})")
+    rss = RssSampler(proc.pid)
+    rss.start()
+    idle_rss_kb = process_rss_kb(proc.pid)
+    endpoints = {}
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            print(f"{'endpoint':<24}{'phase':<6}{'p50':>9}{'p95':>9}{'p99':>9}{'rps':>9}{'err':>5}")
+            for name, url in urls.items():
+                cold = run_cold(port, url, args.concurrency, args.cold_rounds, pool)
+                warm = run_warm(port, url, args.concurrency, args.requests, pool)
+                endpoints[name] = {"url": url, "cold": cold, "warm": warm}
+                for phase, r in (("cold", cold), ("warm", warm)):
+                    print(f"{name:<24}{phase:<6}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+                          f"{r['throughput_rps']:>9.1f}{r['errors']:>5}")
+    finally:
+        rss.stop_event.set()
+        rss.join()
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    return {
+        "commit": git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "scale": scale_label(transactions),
+        "transactions": transactions,
+        "seed": args.seed,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "cold_rounds": args.cold_rounds,
+        "workers": args.workers,
+        "cpus": os.cpu_count(),
+        "python": sys.version.split()[0],
+        "ready_sec": round(ready_sec, 3),
+        "rss_idle_mb": round(idle_rss_kb / 1024, 1),
+        "rss_peak_mb": round(rss.peak_kb / 1024, 1),
+        "endpoints": endpoints,
+    }
+
+
+# ========== 비교 ==========
+def compare(base: dict, new: dict, threshold: float, min_ms: float) -> list:
+    """지연(p50/p99)이 threshold 비율 + min_ms 이상 늘거나 처리량/RSS가 threshold 이상 나빠지면 회귀"""
+    for key in ("transactions", "concurrency", "workers"):
+        if base.get(key) != new.get(key):
+            print(f"[BENCH] Warning: {key} differs ({base.get(key)} vs {new.get(key)})")
+
+    regressions = []
+    print(f"{'endpoint':<24}{'phase':<6}{'metric':<16}{'base':>10}{'new':>10}{'change':>9}")
+    for name, b in base["endpoints"].items():
+        n = new["endpoints"].get(name)
+        if n is None:
+            continue
+        for phase in ("cold", "warm"):
+            for metric in ("p50_ms", "p99_ms", "throughput_rps"):
+                old_value, new_value = b[phase][metric], n[phase][metric]
+                change = (new_value - old_value) / old_value if old_value else 0.0
+                if metric == "throughput_rps":
+                    worse = change < -threshold
+                else:
+                    worse = change > threshold and new_value - old_value >= min_ms
+                mark = "  REGRESSION" if worse else ""
+                print(f"{name:<24}{phase:<6}{metric:<16}{old_value:>10.2f}{new_value:>10.2f}{change:>+9.1%}{mark}")
+                if worse:
+                    regressions.append(f"{name} {phase} {metric}: {old_value} -> {new_value} ({change:+.1%})")
+            if n[phase]["errors"] > b[phase]["errors"]:
+                regressions.append(f"{name} {phase} errors: {b[phase]['errors']} -> {n[phase]['errors']}")
+
+    for metric in ("rss_peak_mb", "ready_sec"):
+        old_value, new_value = base[metric], new[metric]
+        change = (new_value - old_value) / old_value if old_value else 0.0
+        print(f"{'(server)':<24}{'':<6}{metric:<16}{old_value:>10.2f}{new_value:>10.2f}{change:>+9.1%}")
+        if change > threshold:
+            regressions.append(f"{metric}: {old_value} -> {new_value} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API benchmark on a synthetic DB")
+    parser.add_argument("--scale", default=os.environ.get("BENCH_SCALE", "100k"),
+                        help="거래 수: 100k | 5M | 20M | 숫자 (기본 100k)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 클라이언트 수")
+    parser.add_argument("--requests", type=int, default=200, help="엔드포인트별 warm 요청 수")
+    parser.add_argument("--cold-rounds", type=int, default=3, help="엔드포인트별 cold 라운드 수")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 워커 수")
+    parser.add_argument("--only", default="", help="측정할 엔드포인트 이름 (쉼표 구분)")
+    parser.add_argument("--out", default="", help="결과 JSON 경로 (기본 bench_results/<커밋>-<규모>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="두 결과 JSON 비교")
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀 판정 비율 (기본 20%%)")
+    parser.add_argument("--min-ms", type=float, default=2.0, help="지연 회귀로 볼 최소 증가량 (ms)")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], "r", encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.compare[1], "r", encoding="utf-8") as f:
+            new = json.load(f)
+        print(f"[BENCH] {base['commit']} ({base['scale']}) vs {new['commit']} ({new['scale']})")
+        regressions = compare(base, new, args.threshold, args.min_ms)
+        if regressions:
+            print(f"[BENCH] {len(regressions)} regression(s):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("[BENCH] No regressions")
+        return
+
+    sys.path.insert(0, BASE_DIR)
+    result = run_bench(args)
+    out = args.out or os.path.join(RESULTS_DIR, f"{result['commit']}-{result['scale']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print(f"[BENCH] ready {result['ready_sec']}s, RSS idle {result['rss_idle_mb']}MB / peak {result['rss_peak_mb']}MB")
+    print(f"[BENCH] Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
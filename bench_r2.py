@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+R2 전송 처리량 벤치마크
+- R2_ENDPOINT가 없으면 로컬 S3 대역(moto 서버)을 띄워서 측정 (pip install "moto[server]")
+- MinIO 등 실제 S3 호환 서버에 대해 측정하려면 R2_* 환경변수 설정 후 실행
+- 단일 스트림(download_file/upload_file) vs 병렬 멀티파트 비교 + 이어받기/체크섬 검증
+
+Usage: python bench_r2.py [size_mb] [part_size_mb,...] [concurrency,...]
+Example: python bench_r2.py 256 8,16,32 4,8,16
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+
+def start_local_s3():
+    """moto 서버 모드로 로컬 S3 엔드포인트 실행"""
+    from moto.server import ThreadedMotoServer
+
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    os.environ["R2_ENDPOINT"] = f"http://{host}:{port}"
+    os.environ["R2_ACCESS_KEY_ID"] = "testing"
+    os.environ["R2_SECRET_ACCESS_KEY"] = "testing"
+    os.environ.setdefault("R2_BUCKET_NAME", "bench-bucket")
+    return server
+
+
+def make_file(path, size_mb):
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(1024 * 1024))
+
+
+def report(label, size_mb, elapsed):
+    print(f"  {label:<40} {elapsed:7.2f}s  {size_mb / elapsed:8.1f} MB/s")
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 128
+    part_sizes = [int(x) for x in (sys.argv[2] if len(sys.argv) > 2 else "8,16,32").split(",")]
+    concurrencies = [int(x) for x in (sys.argv[3] if len(sys.argv) > 3 else "4,8,16").split(",")]
+
+    server = None
+    if not os.environ.get("R2_ENDPOINT"):
+        server = start_local_s3()
+        print(f"[BENCH] Local S3 stand-in: {os.environ['R2_ENDPOINT']}")
+
+    import r2_utils  # 환경변수 설정 후 import
+
+    client = r2_utils.get_r2_client()
+    try:
+        client.create_bucket(Bucket=r2_utils.R2_BUCKET_NAME)
+    except Exception:
+        pass
+
+    workdir = tempfile.mkdtemp(prefix="bench_r2_")
+    src = os.path.join(workdir, "src.bin")
+    dst = os.path.join(workdir, "dst.bin")
+    make_file(src, size_mb)
+    src_sha = r2_utils.file_sha256(src)
+    print(f"[BENCH] {size_mb} MB test file, sha256={src_sha[:12]}")
+
+    print("\n[단일 스트림 (기존 방식)]")
+    start = time.time()
+    client.upload_file(src, r2_utils.R2_BUCKET_NAME, "bench/single.bin")
+    report("upload_file", size_mb, time.time() - start)
+    start = time.time()
+    client.download_file(r2_utils.R2_BUCKET_NAME, "bench/single.bin", dst)
+    report("download_file", size_mb, time.time() - start)
+
+    print("\n[병렬 멀티파트]")
+    for part_mb in part_sizes:
+        for conc in concurrencies:
+            key = f"bench/p{part_mb}_c{conc}.bin"
+            start = time.time()
+            r2_utils.upload_object(src, key, part_size_mb=part_mb, concurrency=conc)
+            report(f"upload   part={part_mb}MB conc={conc}", size_mb, time.time() - start)
+
+            if os.path.exists(dst):
+                os.remove(dst)
+            start = time.time()
+            info = r2_utils.download_object(key, dst, part_size_mb=part_mb, concurrency=conc)
+            report(f"download part={part_mb}MB conc={conc}", size_mb, time.time() - start)
+            assert info["sha256"] == src_sha, "checksum metadata mismatch"
+
+    # 이어받기 검증: 절반만 받은 상태를 만든 뒤 재개
+    print("\n[이어받기]")
+    key = f"bench/p{part_sizes[0]}_c{concurrencies[0]}.bin"
+    part_size = part_sizes[0] * 1024 * 1024
+    total_parts = (size_mb * 1024 * 1024 + part_size - 1) // part_size
+    if os.path.exists(dst):
+        os.remove(dst)
+    head = client.head_object(Bucket=r2_utils.R2_BUCKET_NAME, Key=key)
+    with open(dst + ".part", "wb") as f:
+        f.truncate(head["ContentLength"])
+    half = list(range(total_parts // 2))
+    with open(src, "rb") as s, open(dst + ".part", "r+b") as d:
+        for idx in half:
+            s.seek(idx * part_size)
+            d.seek(idx * part_size)
+            d.write(s.read(part_size))
+    r2_utils._save_resume_state(dst + ".part.json", {
+        "key": key, "etag": head["ETag"], "size": head["ContentLength"],
+        "part_size": part_size, "done": half
+    })
+    start = time.time()
+    info = r2_utils.download_object(key, dst, part_size_mb=part_sizes[0], concurrency=concurrencies[0])
+    report(f"resume ({info['parts']}/{total_parts} parts fetched)", size_mb, time.time() - start)
+    assert r2_utils.file_sha256(dst) == src_sha, "resumed file checksum mismatch"
+    print("  checksum OK")
+
+    for name in os.listdir(workdir):
+        os.remove(os.path.join(workdir, name))
+    os.rmdir(workdir)
+    if server:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
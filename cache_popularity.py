@@ -0,0 +1,104 @@
+"""
+캐시 키 인기도 추적
+- 네임스페이스별 감쇠 Count-Min Sketch (고정 메모리, 키 수와 무관)
+- 상위 후보 키 집합 유지 → 무효화 후 상위 N개 재적재(cache warmer)에 사용
+"""
+
+import time
+import threading
+
+SKETCH_WIDTH = 2048
+SKETCH_DEPTH = 4
+HALF_LIFE_SEC = 3600  # 1시간마다 카운트 절반으로 감쇠
+CANDIDATE_FACTOR = 4  # top_n의 몇 배까지 후보를 유지할지
+
+
+class DecayingCountMinSketch:
+    """감쇠 Count-Min Sketch: half_life마다 전체 카운트를 절반으로"""
+
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH,
+                 half_life: float = HALF_LIFE_SEC):
+        self.width = width
+        self.depth = depth
+        self.half_life = half_life
+        self.rows = [[0.0] * width for _ in range(depth)]
+        self.last_decay = time.monotonic()
+
+    def _maybe_decay(self):
+        elapsed = time.monotonic() - self.last_decay
+        if elapsed < self.half_life:
+            return
+        factor = 0.5 ** (elapsed / self.half_life)
+        for row in self.rows:
+            for i in range(self.width):
+                if row[i]:
+                    row[i] *= factor
+        self.last_decay = time.monotonic()
+
+    def _indexes(self, key: str):
+        return [hash((seed, key)) % self.width for seed in range(self.depth)]
+
+    def add(self, key: str, count: float = 1.0) -> float:
+        """카운트 증가 후 추정치 반환"""
+        self._maybe_decay()
+        estimate = None
+        for row, idx in zip(self.rows, self._indexes(key)):
+            row[idx] += count
+            estimate = row[idx] if estimate is None else min(estimate, row[idx])
+        return estimate
+
+    def estimate(self, key: str) -> float:
+        return min(row[idx] for row, idx in zip(self.rows, self._indexes(key)))
+
+
+class PopularityTracker:
+    """네임스페이스별 접근 빈도 추적 + 상위 키 조회"""
+
+    def __init__(self, top_n: int = 50):
+        self.top_n = top_n
+        self.capacity = top_n * CANDIDATE_FACTOR
+        self.sketches = {}
+        self.candidates = {}   # namespace -> {key: estimate}
+        self.thresholds = {}   # namespace -> 후보 최소 추정치 (교체 기준)
+        self.lock = threading.Lock()
+
+    def record(self, namespace: str, key: str):
+        if self.capacity <= 0:
+            return  # 재적재 비활성 (CACHE_WARM_TOP_N=0)
+        with self.lock:
+            sketch = self.sketches.get(namespace)
+            if sketch is None:
+                sketch = self.sketches[namespace] = DecayingCountMinSketch()
+                self.candidates[namespace] = {}
+                self.thresholds[namespace] = 0.0
+            estimate = sketch.add(key)
+
+            candidates = self.candidates[namespace]
+            if key in candidates or len(candidates) < self.capacity:
+                candidates[key] = estimate
+                return
+            if estimate <= self.thresholds[namespace]:
+                return
+
+            # 가장 덜 인기 있는 후보와 교체 (후보 수가 작아서 선형 탐색)
+            for k in candidates:
+                candidates[k] = sketch.estimate(k)
+            coldest = min(candidates, key=candidates.get)
+            if candidates[coldest] < estimate:
+                del candidates[coldest]
+                candidates[key] = estimate
+            self.thresholds[namespace] = min(candidates.values())
+
+    def top(self, namespace: str, n: int = None) -> list:
+        """추정 빈도 내림차순 상위 n개 키"""
+        n = n or self.top_n
+        with self.lock:
+            sketch = self.sketches.get(namespace)
+            if sketch is None:
+                return []
+            ranked = sorted(self.candidates[namespace], key=sketch.estimate, reverse=True)
+        return ranked[:n]
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {ns: len(c) for ns, c in self.candidates.items()}
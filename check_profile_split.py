@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+요청 프로파일 시간 분해 검사 (?profile=)
+- 합성 DB에서 큰 응답(/api/transactions?limit=2000)을 프로파일링
+- 응답 직렬화(jsonable_encoder + JSON render, 이벤트 루프)가 encode_ms / json_ms에 잡히는지 확인
+  (핸들러 스레드만 측정하면 직렬화가 빠져 json_ms가 항상 0이 됨)
+- 직렬화 비율이 MIN_ENCODE_SHARE 미만이면 exit 1 (CI용)
+
+Usage: python check_profile_split.py
+  PROFILE_CHECK_TX: 합성 DB 거래 수 (기본 20000)
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+from urllib.parse import quote
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SYNTH_TRANSACTIONS = int(os.environ.get("PROFILE_CHECK_TX", "20000"))
+LARGE_URL = "/api/transactions?limit=2000"
+MIN_ENCODE_SHARE = 0.2  # wall 중 직렬화 구간 최소 비율 (2000건 응답은 직렬화가 대부분)
+
+
+def parse_summary(header: str) -> dict:
+    summary = {}
+    for item in header.split(","):
+        key, _, value = item.partition("=")
+        summary[key] = float(value)
+    return summary
+
+
+def main():
+    sys.path.insert(0, BASE_DIR)
+    workdir = tempfile.mkdtemp(prefix="profile_check_")
+    db_path = os.path.join(workdir, "profile.db")
+    os.chdir(workdir)  # 프로파일/캐시 스냅샷 파일은 임시 폴더에
+
+    import synthetic_db
+    synthetic_db.build(db_path, SYNTH_TRANSACTIONS)
+
+    import api_server as api
+    from check_query_budget import call
+    api.DB_PATH = db_path
+    api.refresh_db_generation()
+
+    headers = {}
+    status = asyncio.run(call(api.app, f"{LARGE_URL}&profile={quote(api.ADMIN_SECRET)}", headers))
+    if status != 200 or "x-profile-summary" not in headers:
+        print(f"[PROFILE] FAIL: {LARGE_URL} -> {status}, no profile summary")
+        sys.exit(1)
+
+    summary = parse_summary(headers["x-profile-summary"])
+    share = summary["encode_ms"] / summary["wall_ms"] if summary["wall_ms"] else 0
+    print(f"[PROFILE] {LARGE_URL}: " + " ".join(f"{k}={v:g}" for k, v in summary.items()))
+    print(f"[PROFILE] encode share {share:.0%} (min {MIN_ENCODE_SHARE:.0%})")
+
+    failed = []
+    if summary["json_ms"] <= 0:
+        failed.append("json_ms is 0 (serialization not profiled)")
+    if share < MIN_ENCODE_SHARE:
+        failed.append(f"encode share {share:.0%} < {MIN_ENCODE_SHARE:.0%}")
+    if failed:
+        print(f"[PROFILE] FAIL: {'; '.join(failed)}")
+        sys.exit(1)
+    print("[PROFILE] OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+엔드포인트별 SQL 예산 검사 (N+1 / 전체 스캔 증가 탐지)
+- 합성 DB(synthetic_db)로 각 엔드포인트를 캐시 없이(cold) 한 번씩 호출
+- 요청 하나가 실행한 SQL 문장 수 / VM 명령 수 / 인덱스 없는 전체 테이블 스캔 단계 수 측정
+- query_budget.json(기준값)보다 문장 수나 전체 스캔 수가 늘면 exit 1 (CI/배포 전 검사용)
+
+Usage:
+  python check_query_budget.py            # 기준값과 비교
+  python check_query_budget.py --update   # 현재 값을 기준값으로 저장 (의도한 변경일 때)
+  QUERY_BUDGET_TX: 합성 DB 거래 수 (기본 20000)
+"""
+
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import sqlite3
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGET_FILE = os.path.join(BASE_DIR, "query_budget.json")
+SYNTH_TRANSACTIONS = int(os.environ.get("QUERY_BUDGET_TX", "20000"))
+
+# (이름, 경로) - {apt}/{apt2}/{region}은 합성 DB에서 채움
+ENDPOINTS = [
+    ("transactions", "/api/transactions?limit=20"),
+    ("stats", "/api/stats"),
+    ("regions", "/api/regions"),
+    ("search", "/api/search?q=래미안"),
+    ("search_region", "/api/search?q=강남"),
+    ("apartment_ids", "/api/apartments/ids"),
+    ("apartment", "/api/apartments/{apt}"),
+    ("apartment_transactions", "/api/apartments/{apt}/transactions"),
+    ("history", "/api/apartments/{apt}/history"),
+    ("history_area", "/api/apartments/{apt}/history?area=84.9"),
+    ("deals", "/api/apartments/{apt}/deals?points=200"),
+    ("compare", "/api/compare?apt_ids={apt},{apt2}"),
+    ("hierarchy", "/api/regions/hierarchy"),
+    ("region_apartments", "/api/regions/{region}/apartments"),
+    ("region_stats", "/api/regions/{region}/stats"),
+    ("stats_regions", "/api/stats/regions"),
+    ("bargains", "/api/bargains?days=30"),
+    ("bargains_region", "/api/bargains?lawd_cd={region}&days=90"),
+    ("new_highs", "/api/leaderboards/new-highs?period=month"),
+    ("drops", "/api/leaderboards/drops?period=year"),
+    ("sitemap_index", "/api/sitemap/index"),
+    ("sitemap_shard", "/api/sitemap/shards/0"),
+]
+
+
+def endpoint_urls(db_path: str) -> dict:
+    """ENDPOINTS의 {apt}/{apt2}/{region}을 DB의 거래 많은 단지로 채움 → {이름: URL}"""
+    conn = sqlite3.connect(db_path)
+    top = conn.execute(
+        "SELECT apt_id FROM apartments_with_deals ORDER BY tx_count DESC LIMIT 2"
+    ).fetchall()
+    region = conn.execute("SELECT lawd_cd FROM apartments WHERE id = ?", (top[0][0],)).fetchone()[0]
+    conn.close()
+    return {name: url.format(apt=top[0][0], apt2=top[1][0], region=region) for name, url in ENDPOINTS}
+
+
+async def call(app, url: str, headers: dict = None) -> int:
+    """
+    ASGI 앱을 현재 컨텍스트에서 직접 호출 (계측 contextvar가 그대로 전달됨) → 상태 코드
+    headers: 주면 응답 헤더를 채움 (소문자 이름)
+    """
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query.encode(), "headers": [(b"host", b"budget")],
+        "client": ("127.0.0.1", 0), "server": ("budget", 80),
+    }
+    status = 0
+    request_sent = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            if headers is not None:
+                headers.update((k.decode().lower(), v.decode()) for k, v in message.get("headers", []))
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            finished.set()
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(api, urls: dict) -> dict:
+    from query_stats import QueryCounter, table_scans
+
+    plan_conn = sqlite3.connect(api.DB_PATH)
+    results = {}
+    for name, url in urls.items():
+        for cache in api.CACHE.values():
+            cache.clear()
+        with QueryCounter(keep_sql=True) as counter:
+            status = await call(api.app, url)
+        scans = table_scans(plan_conn, counter.sql)
+        results[name] = {
+            "url": url,
+            "status": status,
+            "statements": counter.statements,
+            "vm_steps": counter.vm_steps,
+            "scans": scans["scans"],
+            "index_scans": scans["index_scans"],
+            "scan_details": scans["scan_details"],
+        }
+    plan_conn.close()
+    return results
+
+
+def main():
+    update = "--update" in sys.argv
+    sys.path.insert(0, BASE_DIR)
+    workdir = tempfile.mkdtemp(prefix="query_budget_")
+    db_path = os.path.join(workdir, "budget.db")
+    os.chdir(workdir)  # 캐시 스냅샷 등 부수 파일은 임시 폴더에
+
+    import synthetic_db
+    synthetic_db.build(db_path, SYNTH_TRANSACTIONS)
+
+    import api_server as api
+    api.DB_PATH = db_path
+    api.refresh_db_generation()
+
+    urls = endpoint_urls(db_path)
+    results = asyncio.run(measure(api, urls))
+
+    baseline = {}
+    if os.path.exists(BUDGET_FILE):
+        with open(BUDGET_FILE, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    failed = False
+    print(f"{'endpoint':<24}{'status':>7}{'sql':>6}{'budget':>8}{'scans':>7}{'budget':>8}{'idx_scans':>11}{'vm_steps':>12}")
+    for name, r in results.items():
+        b = baseline.get(name, {})
+        over = []
+        if r["status"] >= 500:
+            over.append(f"status {r['status']}")
+        if b and r["statements"] > b["statements"]:
+            over.append(f"statements {b['statements']} -> {r['statements']}")
+        if b and r["scans"] > b["scans"]:
+            over.append(f"table scans {b['scans']} -> {r['scans']}")
+        print(f"{name:<24}{r['status']:>7}{r['statements']:>6}{b.get('statements', '-'):>8}"
+              f"{r['scans']:>7}{b.get('scans', '-'):>8}{r['index_scans']:>11}{r['vm_steps']:>12}")
+        if over and not update:
+            failed = True
+            print(f"  [BUDGET] FAIL {name}: {', '.join(over)}")
+            for detail in r["scan_details"]:
+                print(f"    {detail}")
+
+    if update:
+        with open(BUDGET_FILE, "w", encoding="utf-8") as f:
+            json.dump({name: {"statements": r["statements"], "scans": r["scans"]} for name, r in results.items()},
+                      f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"[BUDGET] Baseline written to {BUDGET_FILE}")
+        return
+
+    missing = [name for name in results if name not in baseline]
+    if missing:
+        print(f"[BUDGET] No baseline for: {', '.join(missing)} (run with --update)")
+    if failed:
+        sys.exit(1)
+    print("[BUDGET] OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+콜드 스타트 시간 예산 검사
+- api_server import 시간 (무거운 모듈 lazy import 확인 포함)
+- uvicorn 프로세스 시작 → /readyz 200 까지의 시간
+- 예산 초과 시 exit 1 (CI/배포 전 검사용)
+
+Usage: python check_startup_budget.py
+  STARTUP_BUDGET_SEC  : 프로세스 시작 → ready 예산 (기본 5초)
+  IMPORT_BUDGET_SEC   : import 예산 (기본 1.5초)
+  DB_PATH 위치의 DB로 실행 (없으면 빈 DB로 실행됨)
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import subprocess
+import urllib.request
+import urllib.error
+
+STARTUP_BUDGET_SEC = float(os.environ.get("STARTUP_BUDGET_SEC", "5"))
+IMPORT_BUDGET_SEC = float(os.environ.get("IMPORT_BUDGET_SEC", "1.5"))
+# 시작 경로에서 import되면 안 되는 무거운 모듈
+FORBIDDEN_MODULES = ["boto3", "botocore", "zstandard", "numpy"]
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def check_import():
+    """별도 프로세스에서 import 시간 + 금지 모듈 로드 여부 측정"""
+    code = (
+        "import time, sys, json\n"
+        "t = time.perf_counter()\n"
+        "import api_server\n"
+        "elapsed = time.perf_counter() - t\n"
+        f"loaded = [m for m in {FORBIDDEN_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'loaded': loaded}))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BASE_DIR,
+        capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    return json.loads(out)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def check_ready():
+    """uvicorn 실행 후 /readyz가 200을 줄 때까지의 시간"""
+    port = free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_server:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = start + STARTUP_BUDGET_SEC * 3
+    body = None
+    try:
+        while time.perf_counter() < deadline:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz", timeout=1) as resp:
+                    body = json.loads(resp.read())
+                    break
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return elapsed, body
+
+
+def main():
+    failed = False
+
+    result = check_import()
+    print(f"[BUDGET] import api_server: {result['elapsed']:.3f}s (budget {IMPORT_BUDGET_SEC}s)")
+    if result["elapsed"] > IMPORT_BUDGET_SEC:
+        print("[BUDGET] FAIL: import budget exceeded")
+        failed = True
+    if result["loaded"]:
+        print(f"[BUDGET] FAIL: heavy modules imported at startup: {result['loaded']}")
+        failed = True
+
+    elapsed, body = check_ready()
+    if body is None:
+        print(f"[BUDGET] FAIL: server not ready after {elapsed:.3f}s")
+        sys.exit(1)
+
+    print(f"[BUDGET] process start -> ready: {elapsed:.3f}s (budget {STARTUP_BUDGET_SEC}s)")
+    for phase in body.get("startup", []):
+        print(f"  {phase['phase']:<20} {phase['ms']:>8.1f}ms  (t+{phase['at_ms']}ms)")
+    if elapsed > STARTUP_BUDGET_SEC:
+        print("[BUDGET] FAIL: startup budget exceeded")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("[BUDGET] OK")
+
+
+if __name__ == "__main__":
+    main()
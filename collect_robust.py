@@ -19,7 +19,8 @@ import os
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
-from insight_engine import generate_deal_hash, analyze_transaction
+from insight_engine import generate_deal_hash, analyze_transaction, peak_metrics, peak_tracker
+from ingest import ensure_ingest_tables, record_deal, record_price, prune_deal_events, bump_data_version
 
 # 설정 (환경변수에서 로드)
 DB_PATH = os.environ.get("DB_PATH", "real_estate.db")
@@ -27,6 +28,7 @@ PROGRESS_FILE = "progress.json"
 LOG_FILE = "collect_robust.log"
 API_KEY = os.environ.get("MOLIT_API_KEY")  # 필수 - 환경변수로만 설정
 API_URL = os.environ.get("API_URL", "http://127.0.0.1:8000")  # 캐시 무효화용
+ADMIN_SECRET = os.environ.get("ADMIN_SECRET") or "수집완료"  # API 서버와 같은 값
 BASE_URL = "https://apis.data.go.kr/1613000/RTMSDataSvcAptTradeDev/getRTMSDataSvcAptTradeDev"
 
 if not API_KEY:
@@ -90,7 +92,7 @@ def notify_cache_clear():
     try:
         response = requests.post(
             f"{API_URL}/api/cache/clear",
-            params={"secret": "수집완료"},
+            params={"secret": ADMIN_SECRET},
             timeout=5
         )
         if response.status_code == 200:
@@ -202,6 +204,8 @@ def save_to_db(lawd_cd, items):
     with db_lock:
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
+        ensure_ingest_tables(cursor)
+        peaks = peak_tracker(DB_PATH)  # 실행당 한 번 시드
         saved_count = 0
 
         for item in items:
@@ -229,15 +233,24 @@ def save_to_db(lawd_cd, items):
 
                 if cursor.rowcount > 0:
                     trans_id = cursor.lastrowid
-                    summary = analyze_transaction(item)
+                    # 같은 단지·평형의 전고점 대비 (반영 전 상태, 메모리에서 O(1))
+                    amount = int(item['amount'])
+                    peak = peaks.observe(cursor, apt_id, item['area'], amount, deal_date)
+                    peak_drop_pct, is_new_high = peak_metrics(amount, deal_date, peak)
+                    summary = analyze_transaction(item, peak)
                     cursor.execute("""
-                        INSERT OR REPLACE INTO transaction_insights (transaction_id, summary_text)
-                        VALUES (?, ?)
-                    """, (trans_id, summary))
+                        INSERT OR REPLACE INTO transaction_insights (transaction_id, peak_drop_pct, is_new_high, summary_text)
+                        VALUES (?, ?, ?, ?)
+                    """, (trans_id, peak_drop_pct, is_new_high, summary))
+                    record_deal(cursor, apt_id, deal_date)
+                    record_price(cursor, trans_id, apt_id, item['area'], amount, deal_date, state=peak)
                     saved_count += 1
             except Exception as e:
                 continue
 
+        if saved_count > 0:
+            prune_deal_events(cursor)
+            bump_data_version(cursor)
         conn.commit()
         conn.close()
         return saved_count
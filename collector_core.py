@@ -4,7 +4,8 @@ import time
 import json
 import sqlite3
 from datetime import datetime
-from insight_engine import generate_deal_hash, analyze_transaction
+from insight_engine import generate_deal_hash, analyze_transaction, peak_metrics, peak_tracker
+from ingest import ensure_ingest_tables, record_deal, record_price, prune_deal_events, bump_data_version
 
 class MolitCollector:
     def __init__(self, service_key=None, db_path="real_estate.db"):
@@ -72,6 +73,8 @@ class MolitCollector:
         """수집된 데이터를 DB에 저장"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
+        ensure_ingest_tables(cursor)
+        peaks = peak_tracker(self.db_path)  # 실행당 한 번 시드
         saved_count = 0
         
         for item in items:
@@ -99,18 +102,26 @@ class MolitCollector:
                 
                 if cursor.rowcount > 0:
                     trans_id = cursor.lastrowid
-                    # 3. 인사이트 생성 및 저장
-                    summary = analyze_transaction(item)
+                    # 3. 인사이트 생성 및 저장 (같은 단지·평형의 전고점 기준)
+                    amount = int(item['amount'])
+                    peak = peaks.observe(cursor, apt_id, item['area'], amount, deal_date)
+                    peak_drop_pct, is_new_high = peak_metrics(amount, deal_date, peak)
+                    summary = analyze_transaction(item, peak)
                     cursor.execute("""
-                        INSERT OR REPLACE INTO transaction_insights (transaction_id, summary_text)
-                        VALUES (?, ?)
-                    """, (trans_id, summary))
+                        INSERT OR REPLACE INTO transaction_insights (transaction_id, peak_drop_pct, is_new_high, summary_text)
+                        VALUES (?, ?, ?, ?)
+                    """, (trans_id, peak_drop_pct, is_new_high, summary))
+                    record_deal(cursor, apt_id, deal_date)
+                    record_price(cursor, trans_id, apt_id, item['area'], amount, deal_date, state=peak)
                     saved_count += 1
             
             except Exception as e:
                 print(f"DB Error for {item['apt_name']}: {e}")
                 continue
                 
+        if saved_count > 0:
+            prune_deal_events(cursor)
+            bump_data_version(cursor)
         conn.commit()
         conn.close()
         return saved_count
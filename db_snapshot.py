@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+배포용 DB 스냅샷 생성
+- SQLite backup API로 트랜잭션 일관성 있는 복사본 생성 (수집기가 쓰는 중에도 안전)
+- WAL 모드 원본도 -wal 파일 없이 단일 파일로 복사됨
+- zstd 멀티스레드 압축
+- manifest.json 기록 (크기, 테이블별 행 수, 스키마/데이터 버전, 체크섬)
+- 콜드 스타트용 핫 서브셋 DB (최근 N개월 거래 + 전체 아파트 + 지역/단지 요약)
+
+Usage: python db_snapshot.py [db_path] [snapshot_dir]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+from datetime import datetime, timezone
+import zstandard
+from ingest import read_data_version, current_kst_date
+
+
+DB_PATH = os.environ.get("DB_PATH", "real_estate.db")
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "snapshot")
+ZSTD_LEVEL = int(os.environ.get("SNAPSHOT_ZSTD_LEVEL", "10"))
+ZSTD_THREADS = int(os.environ.get("SNAPSHOT_ZSTD_THREADS", "-1"))  # -1: 전체 코어
+
+HOT_SUBSET_MONTHS = int(os.environ.get("HOT_SUBSET_MONTHS", "6"))
+INGEST_STATE_TABLES = ["apartments_with_deals", "data_meta", "price_peaks", "deal_events"]
+
+SNAPSHOT_DB_NAME = "real_estate.db"
+SNAPSHOT_ZST_NAME = "real_estate.db.zst"
+HOT_DB_NAME = "real_estate_hot.db"
+HOT_ZST_NAME = "real_estate_hot.db.zst"
+MANIFEST_NAME = "manifest.json"
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def create_consistent_copy(src_path: str, dst_path: str):
+    """
+    backup API로 일관성 있는 복사본 생성
+    - pages=-1: 읽기 트랜잭션 하나로 전체 페이지 복사 → 한 시점의 스냅샷
+    - 쓰기 중인 수집기는 WAL/롤백 저널로 계속 진행 가능
+    """
+    if os.path.exists(dst_path):
+        os.remove(dst_path)
+
+    src = sqlite3.connect(f"file:{src_path}?mode=ro", uri=True)
+    dst = sqlite3.connect(dst_path)
+    try:
+        src.backup(dst, pages=-1)
+        # 배포본은 단일 파일로 (WAL 사이드카 없이)
+        dst.execute("PRAGMA journal_mode=DELETE")
+        result = dst.execute("PRAGMA quick_check").fetchone()[0]
+        if result != "ok":
+            raise RuntimeError(f"Snapshot integrity check failed: {result}")
+    finally:
+        dst.close()
+        src.close()
+
+
+def collect_db_stats(db_path: str) -> dict:
+    """테이블별 행 수 + 스키마 버전/해시 + 데이터 버전"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        cursor = conn.cursor()
+        schema_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+
+        cursor.execute("""
+            SELECT type, name, sql FROM sqlite_master
+            WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+            ORDER BY type, name
+        """)
+        schema_rows = cursor.fetchall()
+        schema_hash = hashlib.sha256(
+            "\n".join(f"{t}|{n}|{s}" for t, n, s in schema_rows).encode()
+        ).hexdigest()[:16]
+
+        # FTS 섀도 테이블 제외, 실제 테이블만
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name NOT LIKE '%_fts_%'
+            ORDER BY name
+        """)
+        row_counts = {}
+        for (name,) in cursor.fetchall():
+            row_counts[name] = cursor.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+
+        data_version, data_updated_at = read_data_version(cursor)
+
+        return {
+            "data_version": data_version,
+            "data_updated_at": data_updated_at,
+            "schema_version": schema_version,
+            "schema_hash": schema_hash,
+            "row_counts": row_counts,
+        }
+    finally:
+        conn.close()
+
+
+def compress_file(src_path: str, dst_path: str, level: int = None, threads: int = None):
+    """zstd 멀티스레드 압축"""
+    cctx = zstandard.ZstdCompressor(
+        level=level if level is not None else ZSTD_LEVEL,
+        threads=threads if threads is not None else ZSTD_THREADS,
+        write_checksum=True,
+        write_content_size=True,
+    )
+    with open(src_path, "rb") as fin, open(dst_path, "wb") as fout:
+        cctx.copy_stream(fin, fout, size=os.path.getsize(src_path))
+
+
+def create_hot_subset(src_path: str, dst_path: str, generation: str,
+                      months: int = None) -> dict:
+    """
+    핫 서브셋 DB 생성 (전체 DB 다운로드 전 임시 서빙용)
+    - 스키마는 원본과 동일, 거래는 최근 N개월만
+    - 아파트 전체 + 수집 상태 테이블 전체 + FTS 재구축
+    - region_summary / apartment_summary: 전체 기간 기준 요약 (지역 계층/통계/아파트 목록용)
+    - snapshot_info: kind=hot 표시 (서버가 부분 데이터 모드로 동작)
+    """
+    months = months or HOT_SUBSET_MONTHS
+    if os.path.exists(dst_path):
+        os.remove(dst_path)
+
+    conn = sqlite3.connect(dst_path)
+    try:
+        conn.execute("ATTACH DATABASE ? AS src", (src_path,))
+        cursor = conn.cursor()
+
+        # 스키마 복제 (FTS 섀도 테이블은 가상 테이블 생성 시 자동 생성)
+        cursor.execute("""
+            SELECT type, name, sql FROM src.sqlite_master
+            WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' AND name NOT LIKE '%_fts_%'
+            ORDER BY CASE type WHEN 'table' THEN 0 ELSE 1 END
+        """)
+        objects = cursor.fetchall()
+        for obj_type, name, sql in objects:
+            cursor.execute(sql)
+
+        cutoff = cursor.execute(
+            "SELECT date(MAX(deal_date), ?) FROM src.transactions", (f"-{months} months",)
+        ).fetchone()[0] or "0000-00-00"
+
+        cursor.execute("INSERT INTO main.apartments SELECT * FROM src.apartments")
+        # 수집 시 유지되는 상태 테이블은 전체 복사 (sitemap, 전고점/리더보드 등)
+        for table in INGEST_STATE_TABLES:
+            if any(name == table for _, name, _ in objects):
+                cursor.execute(f"INSERT INTO main.{table} SELECT * FROM src.{table}")
+        cursor.execute("INSERT INTO main.transactions SELECT * FROM src.transactions WHERE deal_date >= ?", (cutoff,))
+        if any(name == "deal_events" for _, name, _ in objects):
+            # 리더보드(최대 1년)가 컷오프 이전 이벤트의 거래 행도 조인할 수 있게
+            cursor.execute("""
+                INSERT OR IGNORE INTO main.transactions
+                SELECT t.* FROM src.transactions t
+                JOIN src.deal_events e ON e.transaction_id = t.id
+                WHERE t.deal_date < ?
+            """, (cutoff,))
+        cursor.execute("""
+            INSERT INTO main.transaction_insights
+            SELECT i.* FROM src.transaction_insights i
+            JOIN main.transactions t ON t.id = i.transaction_id
+        """)
+        if any(name == "apartments_fts" for _, name, _ in objects):
+            cursor.execute("INSERT INTO apartments_fts(apartments_fts) VALUES('rebuild')")
+
+        # 전체 기간 요약 (핫 모드에서 지역 계층/지역 통계/지역 아파트 목록이 사용)
+        # 최근 1년 / 1~2년 전 합계는 생성 시점 한국 날짜 기준 (전년비, 시도별 평균가용)
+        summary_as_of = current_kst_date()
+        cursor.execute("""
+            CREATE TABLE region_summary AS
+            SELECT a.lawd_cd,
+                   COUNT(DISTINCT a.id) as apt_count,
+                   COUNT(DISTINCT t.apt_id) as traded_apt_count,
+                   COUNT(t.id) as tx_count,
+                   ROUND(AVG(t.amount), 0) as avg_price,
+                   AVG(t.amount) as avg_amount,
+                   MAX(t.amount) as max_amount,
+                   MIN(t.deal_date) as min_date,
+                   MAX(t.deal_date) as max_date,
+                   SUM(CASE WHEN t.deal_date >= date(:as_of, '-1 year') THEN t.amount END) as recent_sum,
+                   COUNT(CASE WHEN t.deal_date >= date(:as_of, '-1 year') THEN 1 END) as recent_count,
+                   SUM(CASE WHEN t.deal_date >= date(:as_of, '-2 year') AND t.deal_date < date(:as_of, '-1 year')
+                            THEN t.amount END) as prev_sum,
+                   COUNT(CASE WHEN t.deal_date >= date(:as_of, '-2 year') AND t.deal_date < date(:as_of, '-1 year')
+                              THEN 1 END) as prev_count
+            FROM src.apartments a
+            LEFT JOIN src.transactions t ON a.id = t.apt_id
+            GROUP BY a.lawd_cd
+        """, {"as_of": summary_as_of})
+        cursor.execute("""
+            CREATE TABLE apartment_summary AS
+            SELECT apt_id, tx_count, max_amount, min_date, latest_date, latest_amount, latest_area
+            FROM (
+                SELECT apt_id,
+                       COUNT(*) OVER w as tx_count,
+                       MAX(amount) OVER w as max_amount,
+                       MIN(deal_date) OVER w as min_date,
+                       deal_date as latest_date, amount as latest_amount, area as latest_area,
+                       ROW_NUMBER() OVER (PARTITION BY apt_id ORDER BY deal_date DESC) as rn
+                FROM src.transactions
+                WHERE apt_id IS NOT NULL
+                WINDOW w AS (PARTITION BY apt_id)
+            )
+            WHERE rn = 1
+        """)
+        cursor.execute("CREATE UNIQUE INDEX idx_apartment_summary_apt ON apartment_summary(apt_id)")
+
+        cursor.execute("CREATE TABLE snapshot_info (key TEXT PRIMARY KEY, value TEXT)")
+        cursor.executemany("INSERT INTO snapshot_info VALUES (?, ?)", [
+            ("kind", "hot"),
+            ("generation", generation),
+            ("months", str(months)),
+            ("cutoff", cutoff),
+            ("summary_as_of", summary_as_of),
+        ])
+        conn.commit()
+        conn.execute("DETACH DATABASE src")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    return {"months": months, "cutoff": cutoff}
+
+
+def create_snapshot(db_path: str = None, out_dir: str = None) -> dict:
+    """스냅샷 + 압축본 + manifest 생성 후 manifest 반환"""
+    db_path = db_path or DB_PATH
+    out_dir = out_dir or SNAPSHOT_DIR
+    os.makedirs(out_dir, exist_ok=True)
+
+    snap_path = os.path.join(out_dir, SNAPSHOT_DB_NAME)
+    zst_path = os.path.join(out_dir, SNAPSHOT_ZST_NAME)
+
+    start = time.time()
+    print(f"[SNAPSHOT] Backing up {db_path} -> {snap_path}")
+    create_consistent_copy(db_path, snap_path)
+    backup_elapsed = time.time() - start
+
+    stats = collect_db_stats(snap_path)
+    db_size = os.path.getsize(snap_path)
+    db_sha = sha256_file(snap_path)
+
+    start = time.time()
+    print(f"[SNAPSHOT] Compressing (zstd level={ZSTD_LEVEL}, threads={ZSTD_THREADS})...")
+    compress_file(snap_path, zst_path)
+    compress_elapsed = time.time() - start
+
+    zst_size = os.path.getsize(zst_path)
+    created_at = datetime.now(timezone.utc)
+    manifest = {
+        "generation": f"{created_at.strftime('%Y%m%dT%H%M%SZ')}-{db_sha[:8]}",
+        "created_at": created_at.isoformat(),
+        "data_version": stats["data_version"],
+        "data_updated_at": stats["data_updated_at"],
+        "schema_version": stats["schema_version"],
+        "schema_hash": stats["schema_hash"],
+        "row_counts": stats["row_counts"],
+        "db": {
+            "file": SNAPSHOT_DB_NAME,
+            "size": db_size,
+            "sha256": db_sha,
+        },
+        "compressed": {
+            "file": SNAPSHOT_ZST_NAME,
+            "codec": "zstd",
+            "level": ZSTD_LEVEL,
+            "size": zst_size,
+            "sha256": sha256_file(zst_path),
+        },
+    }
+
+    # 핫 서브셋
+    start = time.time()
+    hot_path = os.path.join(out_dir, HOT_DB_NAME)
+    hot_zst_path = os.path.join(out_dir, HOT_ZST_NAME)
+    hot_info = create_hot_subset(snap_path, hot_path, manifest["generation"])
+    compress_file(hot_path, hot_zst_path)
+    manifest["hot"] = {
+        "file": HOT_ZST_NAME,
+        "months": hot_info["months"],
+        "cutoff": hot_info["cutoff"],
+        "db_size": os.path.getsize(hot_path),
+        "db_sha256": sha256_file(hot_path),
+        "size": os.path.getsize(hot_zst_path),
+        "sha256": sha256_file(hot_zst_path),
+    }
+    hot_elapsed = time.time() - start
+
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    ratio = db_size / zst_size if zst_size else 0
+    print(f"[SNAPSHOT] Done: {manifest['generation']}")
+    print(f"[SNAPSHOT]   backup {backup_elapsed:.1f}s, compress {compress_elapsed:.1f}s")
+    print(f"[SNAPSHOT]   {db_size / 1024 / 1024:.1f} MB -> {zst_size / 1024 / 1024:.1f} MB (x{ratio:.1f})")
+    print(f"[SNAPSHOT]   rows: {stats['row_counts']}")
+    print(f"[SNAPSHOT]   hot subset (>= {manifest['hot']['cutoff']}): "
+          f"{manifest['hot']['size'] / 1024 / 1024:.1f} MB compressed, {hot_elapsed:.1f}s")
+    return manifest
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else None
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    try:
+        create_snapshot(db_path, out_dir)
+    except Exception as e:
+        print(f"[SNAPSHOT] Failed: {e}")
+        sys.exit(1)
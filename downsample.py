@@ -0,0 +1,64 @@
+"""
+시계열 점 다운샘플링 (산점도/차트용, NumPy)
+- 입력: x(시간순 정렬), y 배열 / 출력: 남길 점의 인덱스 (원래 행의 층/면적 등을 그대로 쓰기 위해)
+- lttb: Largest-Triangle-Three-Buckets - 인접 버킷과 만드는 삼각형 넓이가 가장 큰 점 선택 (모양 보존)
+- minmax: 시간 구간별 최저/최고가 점 (급매/신고가 같은 극값 보존)
+- 처음/마지막 점은 항상 포함, 결과는 threshold개 이하
+"""
+
+import numpy as np
+
+
+def lttb(x, y, threshold: int):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1])
+
+    # 첫/끝 점을 뺀 나머지를 threshold-2개 버킷으로 (인덱스 기준 균등 분할)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # 다음 버킷 평균점 (마지막 버킷은 끝 점)
+    cx = np.cumsum(np.concatenate(([0.0], x)))
+    cy = np.cumsum(np.concatenate(([0.0], y)))
+    counts = np.diff(edges)
+    avg_x = np.append((cx[edges[1:]] - cx[edges[:-1]]) / counts, x[-1])[1:]
+    avg_y = np.append((cy[edges[1:]] - cy[edges[:-1]]) / counts, y[-1])[1:]
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    # 선택은 이전 버킷 선택점에 의존하므로 버킷 단위로 진행, 버킷 안의 넓이 계산은 벡터화
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x[i]) * (by - y[a]) - (x[a] - bx) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(x, y, threshold: int):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 4:
+        return np.array([0, n - 1])
+    buckets = (threshold - 2) // 2
+    # 시간 구간 균등 분할 → 구간마다 (가격, 순서) 정렬의 처음/끝 = 최저/최고
+    span = x[-1] - x[0] or 1.0
+    bucket = np.minimum(((x - x[0]) / span * buckets).astype(np.int64), buckets - 1)
+    order = np.lexsort((np.arange(n), y, bucket))
+    sorted_bucket = bucket[order]
+    starts = np.flatnonzero(np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    picked = np.concatenate(([0, n - 1], order[starts], order[ends]))
+    return np.unique(picked)  # 버킷 수가 (threshold-2)//2라 threshold개를 넘지 않음
+
+
+METHODS = {"lttb": lttb, "minmax": minmax}
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+정적 JSON 내보내기 (수집 후 실행 → R2/엣지에서 서빙, API는 폴백)
+- API와 같은 로더로 렌더링: 단지 상세/히스토리, 지역별 목록/통계, 전체 통계
+- API 경로와 같은 구조: /api/apartments/123 → static/api/apartments/123.json
+- gzip 사전 압축 (Content-Encoding: gzip으로 업로드)
+- 파일별 sha256(압축 전 내용)을 manifest에 기록 → 이전 manifest와 비교해 바뀐 파일만 업로드,
+  사라진 파일은 삭제
+
+Usage:
+  python export_static.py build [db_path] [out_dir]   # 로컬에 렌더링 + manifest.json
+  python export_static.py publish [out_dir]           # R2에 변경분만 업로드
+"""
+
+import os
+import sys
+import json
+import gzip
+import time
+import hashlib
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+EXPORT_DIR = os.environ.get("STATIC_EXPORT_DIR", "static_export")
+EXPORT_WORKERS = int(os.environ.get("STATIC_EXPORT_WORKERS", "4"))
+STATIC_PREFIX = "static"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_KEY = f"{STATIC_PREFIX}/{MANIFEST_NAME}"
+# 파일명에 해시가 없으므로 짧게 캐시 (엣지에서 재검증)
+OBJECT_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=86400"
+
+
+def render(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def local_file(out_dir: str, path: str) -> str:
+    return os.path.join(out_dir, path.lstrip("/") + ".json.gz")
+
+
+def object_key(path: str) -> str:
+    return f"{STATIC_PREFIX}{path}.json"
+
+
+def export_targets(api) -> list:
+    """(API 경로, 로더, 인자) 목록"""
+    targets = [
+        ("/api/stats", api.load_market_stats, ()),
+        ("/api/stats/regions", api.load_region_stats_all, ()),
+        ("/api/regions/hierarchy", api.load_region_hierarchy, ()),
+        ("/api/transactions", api.load_transactions, (20,)),
+    ]
+    for lawd_cd in api.REGION_CODE_TO_NAME:
+        targets.append((f"/api/regions/{lawd_cd}/stats", api.load_region_stats, (lawd_cd,)))
+        targets.append((f"/api/regions/{lawd_cd}/apartments", api.load_region_apartments,
+                        (lawd_cd, 50, 0, "tx_count")))
+    for apt_id in api.load_apartment_ids():
+        targets.append((f"/api/apartments/{apt_id}", api.load_apartment_detail, (apt_id,)))
+        targets.append((f"/api/apartments/{apt_id}/history", api.load_apartment_history,
+                        (apt_id, 240, None)))
+    return targets
+
+
+def build(db_path: str = None, out_dir: str = None) -> dict:
+    """전체 렌더링 → out_dir에 .json.gz + manifest.json"""
+    db_path = db_path or os.environ.get("DB_PATH", "real_estate.db")
+    out_dir = out_dir or EXPORT_DIR
+
+    import api_server as api
+    from fastapi import HTTPException
+
+    api.DB_PATH = db_path
+    api.refresh_db_generation()
+
+    start = time.time()
+    targets = export_targets(api)
+    print(f"[EXPORT] Rendering {len(targets)} files from {db_path} (data version {api.DATA_VERSION})")
+
+    def render_one(target):
+        path, loader, args = target
+        try:
+            body = render(loader(*args))
+        except HTTPException as e:
+            if e.status_code == 404:
+                return path, None
+            raise
+        dst = local_file(out_dir, path)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        with open(dst, "wb") as f:
+            f.write(gzip.compress(body, compresslevel=9, mtime=0))
+        return path, {
+            "sha256": hashlib.sha256(body).hexdigest(),
+            "size": len(body),
+            "gz_size": os.path.getsize(dst),
+        }
+
+    files = {}
+    with ThreadPoolExecutor(max_workers=EXPORT_WORKERS) as pool:
+        for path, entry in pool.map(render_one, targets):
+            if entry is not None:
+                files[path] = entry
+
+    manifest = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "generation": api.DB_GENERATION,
+        "data_version": api.DATA_VERSION,
+        "as_of": api.AS_OF_DATE,
+        "prefix": STATIC_PREFIX,
+        "files": files,
+    }
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    raw = sum(e["size"] for e in files.values())
+    packed = sum(e["gz_size"] for e in files.values())
+    print(f"[EXPORT] {len(files)} files in {time.time() - start:.1f}s "
+          f"({raw / 1024 / 1024:.1f} MB -> {packed / 1024 / 1024:.1f} MB gzip)")
+    return manifest
+
+
+def publish(out_dir: str = None) -> bool:
+    """이전 manifest와 비교해 바뀐 파일만 업로드, 없어진 파일 삭제, 마지막에 manifest 교체"""
+    from r2_utils import get_r2_client, R2_BUCKET_NAME, CONCURRENCY, _get_json, _put_json
+
+    out_dir = out_dir or EXPORT_DIR
+    with open(os.path.join(out_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    previous = (_get_json(MANIFEST_KEY) or {}).get("files", {})
+    files = manifest["files"]
+    changed = [p for p, e in files.items() if previous.get(p, {}).get("sha256") != e["sha256"]]
+    removed = [p for p in previous if p not in files]
+    print(f"[EXPORT] {len(changed)} changed, {len(removed)} removed, "
+          f"{len(files) - len(changed)} unchanged (of {len(files)})")
+
+    client = get_r2_client()
+    start = time.time()
+
+    def upload(path):
+        with open(local_file(out_dir, path), "rb") as f:
+            client.put_object(
+                Bucket=R2_BUCKET_NAME, Key=object_key(path), Body=f.read(),
+                ContentType="application/json; charset=utf-8",
+                ContentEncoding="gzip",
+                CacheControl=OBJECT_CACHE_CONTROL,
+                Metadata={"sha256": files[path]["sha256"]},
+            )
+
+    try:
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+            list(pool.map(upload, changed))
+
+        # 새 manifest를 올리기 전에 삭제하면 안 됨 (이전 manifest 기준 재시도 가능하도록 마지막에)
+        _put_json(MANIFEST_KEY, manifest)
+
+        for i in range(0, len(removed), 1000):
+            client.delete_objects(Bucket=R2_BUCKET_NAME, Delete={
+                "Objects": [{"Key": object_key(p)} for p in removed[i:i + 1000]]
+            })
+    except Exception as e:
+        print(f"[EXPORT] Publish failed: {e}")
+        return False
+
+    uploaded = sum(files[p]["gz_size"] for p in changed)
+    print(f"[EXPORT] Uploaded {uploaded / 1024 / 1024:.1f} MB in {time.time() - start:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python export_static.py <build [db_path] [out_dir]|publish [out_dir]>")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "build":
+        try:
+            build(sys.argv[2] if len(sys.argv) > 2 else None,
+                  sys.argv[3] if len(sys.argv) > 3 else None)
+        except Exception as e:
+            print(f"[EXPORT] Build failed: {e}")
+            sys.exit(1)
+
+    elif command == "publish":
+        success = publish(sys.argv[2] if len(sys.argv) > 2 else None)
+        sys.exit(0 if success else 1)
+
+    else:
+        print(f"Unknown command: {command}")
+        sys.exit(1)
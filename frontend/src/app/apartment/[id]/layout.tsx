@@ -1,6 +1,6 @@
 import { Metadata } from 'next';
+import { fetchStaticFirst } from '@/lib/staticData';
 
-const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 const SITE_URL = process.env.NEXT_PUBLIC_SITE_URL || 'https://sudogwon.com';
 
 interface Transaction {
@@ -41,7 +41,7 @@ export async function generateMetadata({ params }: Props): Promise<Metadata> {
   const id = resolvedParams.id;
 
   try {
-    const res = await fetch(`${API_BASE}/api/apartments/${id}`, {
+    const res = await fetchStaticFirst(`/api/apartments/${id}`, {
       next: { revalidate: 3600 } // 1시간 캐시
     });
 
@@ -35,6 +35,20 @@ export default function Home() {
     fetchData();
   }, []);
 
+  // 신규 거래 실시간 수신 (SSE) - 끊기면 브라우저가 Last-Event-ID로 자동 재접속
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return;
+    const source = new EventSource(`${API_BASE}/api/stream/transactions`);
+    source.addEventListener('transaction', (e) => {
+      const tx: Transaction = JSON.parse((e as MessageEvent).data);
+      setRecentTransactions(prev => [tx, ...prev.filter(t => t.id !== tx.id)].slice(0, 6));
+    });
+    source.addEventListener('reset', () => {
+      fetchData();
+    });
+    return () => source.close();
+  }, []);
+
   const fetchData = async () => {
     try {
       const [txRes, statsRes] = await Promise.all([
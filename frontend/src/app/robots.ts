@@ -1,14 +1,18 @@
 import { MetadataRoute } from 'next';
+import { generateSitemaps } from './sitemap';
 
-export default function robots(): MetadataRoute.Robots {
+export default async function robots(): Promise<MetadataRoute.Robots> {
   const siteUrl = process.env.NEXT_PUBLIC_SITE_URL || 'https://sudogwon.com';
 
+  // generateSitemaps 사용 시 /sitemap.xml 인덱스가 없으므로 샤드별 sitemap을 모두 나열
+  const sitemaps = await generateSitemaps();
+
   return {
     rules: {
       userAgent: '*',
       allow: '/',
       disallow: ['/perf-test', '/monitor', '/api/'],
     },
-    sitemap: `${siteUrl}/sitemap.xml`,
+    sitemap: sitemaps.map(({ id }) => `${siteUrl}/sitemap/${id}.xml`),
   };
 }
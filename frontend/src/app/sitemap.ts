@@ -3,58 +3,107 @@ import { MetadataRoute } from 'next';
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 const SITE_URL = process.env.NEXT_PUBLIC_SITE_URL || 'https://sudogwon.com';
 
-export default async function sitemap(): Promise<MetadataRoute.Sitemap> {
-  // 정적 페이지
-  const staticPages: MetadataRoute.Sitemap = [
-    {
-      url: SITE_URL,
-      lastModified: new Date(),
-      changeFrequency: 'daily',
-      priority: 1,
-    },
-    {
-      url: `${SITE_URL}/browse`,
-      lastModified: new Date(),
-      changeFrequency: 'weekly',
-      priority: 0.8,
-    },
-    {
-      url: `${SITE_URL}/search`,
-      lastModified: new Date(),
-      changeFrequency: 'weekly',
-      priority: 0.7,
-    },
-    {
-      url: `${SITE_URL}/stats`,
-      lastModified: new Date(),
-      changeFrequency: 'daily',
-      priority: 0.6,
-    },
-  ];
-
-  // 동적 페이지 (아파트 상세) - API에서 ID 목록 조회
+type SitemapShard = {
+  shard: number;
+  count: number;
+  last_modified: string | null;
+};
+
+type SitemapIndex = {
+  shard_size: number;
+  total: number;
+  last_modified: string | null;
+  shards: SitemapShard[];
+};
+
+type SitemapShardIds = {
+  shard: number;
+  last_modified: string | null;
+  ids: number[];
+};
+
+// DB 시각(UTC, "YYYY-MM-DD HH:MM:SS" 또는 "YYYY-MM-DD") → Date
+function toDate(value: string | null): Date {
+  if (!value) return new Date();
+  const date = new Date(value.includes(' ') ? value.replace(' ', 'T') + 'Z' : value);
+  return isNaN(date.getTime()) ? new Date() : date;
+}
+
+// sitemap/0.xml: 정적 페이지, sitemap/{n + 1}.xml: 아파트 ID 샤드 n
+export async function generateSitemaps() {
   try {
-    const res = await fetch(`${API_BASE}/api/apartments/ids`, {
-      next: { revalidate: 86400 } // 24시간 캐시
+    const res = await fetch(`${API_BASE}/api/sitemap/index`, {
+      next: { revalidate: 86400 } // 24시간 캐시 (ETag로 재검증)
+    });
+    if (!res.ok) {
+      console.error('Failed to fetch sitemap index');
+      return [{ id: 0 }];
+    }
+    const index: SitemapIndex = await res.json();
+    return [{ id: 0 }, ...index.shards.map(s => ({ id: s.shard + 1 }))];
+  } catch (error) {
+    console.error('Error fetching sitemap index:', error);
+    return [{ id: 0 }];
+  }
+}
+
+export default async function sitemap(props: {
+  id: Promise<string>;
+}): Promise<MetadataRoute.Sitemap> {
+  const id = Number(await props.id);
+
+  if (id === 0) {
+    // 정적 페이지
+    return [
+      {
+        url: SITE_URL,
+        lastModified: new Date(),
+        changeFrequency: 'daily',
+        priority: 1,
+      },
+      {
+        url: `${SITE_URL}/browse`,
+        lastModified: new Date(),
+        changeFrequency: 'weekly',
+        priority: 0.8,
+      },
+      {
+        url: `${SITE_URL}/search`,
+        lastModified: new Date(),
+        changeFrequency: 'weekly',
+        priority: 0.7,
+      },
+      {
+        url: `${SITE_URL}/stats`,
+        lastModified: new Date(),
+        changeFrequency: 'daily',
+        priority: 0.6,
+      },
+    ];
+  }
+
+  // 동적 페이지 (아파트 상세) - 샤드 하나의 ID 목록만 조회
+  try {
+    const res = await fetch(`${API_BASE}/api/sitemap/shards/${id - 1}`, {
+      next: { revalidate: 86400 }
     });
 
     if (!res.ok) {
-      console.error('Failed to fetch apartment IDs for sitemap');
-      return staticPages;
+      console.error(`Failed to fetch sitemap shard ${id - 1}`);
+      return [];
     }
 
-    const ids: number[] = await res.json();
+    const shard: SitemapShardIds = await res.json();
+    const lastModified = toDate(shard.last_modified);
 
-    const apartmentPages: MetadataRoute.Sitemap = ids.map(id => ({
-      url: `${SITE_URL}/apartment/${id}`,
-      lastModified: new Date(),
+    return shard.ids.map(aptId => ({
+      url: `${SITE_URL}/apartment/${aptId}`,
+      lastModified,
       changeFrequency: 'weekly' as const,
       priority: 0.5,
     }));
-
-    return [...staticPages, ...apartmentPages];
   } catch (error) {
     console.error('Error generating sitemap:', error);
-    return staticPages;
+    return [];
   }
 }
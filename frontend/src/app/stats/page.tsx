@@ -3,8 +3,7 @@
 import { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 import { ArrowLeft, TrendingUp, TrendingDown, ArrowUpDown, MapPin } from 'lucide-react';
-
-const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+import { fetchStaticFirst } from '@/lib/staticData';
 
 interface RegionStat {
   code: string;
@@ -44,7 +43,7 @@ export default function StatsPage() {
 
   const fetchStats = async () => {
     try {
-      const res = await fetch(`${API_BASE}/api/stats/regions`);
+      const res = await fetchStaticFirst('/api/stats/regions');
       if (res.ok) {
         setData(await res.json());
       }
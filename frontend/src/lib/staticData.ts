@@ -0,0 +1,19 @@
+const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+// export_static.py로 R2에 올린 정적 JSON (예: https://static.sudogwon.com/static)
+const STATIC_BASE = process.env.NEXT_PUBLIC_STATIC_URL || '';
+
+/**
+ * 정적 JSON(엣지) 우선 조회, 없거나 실패하면 API로 폴백
+ * path는 쿼리 없는 API 경로 (예: /api/apartments/123)
+ */
+export async function fetchStaticFirst(path: string, init?: RequestInit): Promise<Response> {
+  if (STATIC_BASE) {
+    try {
+      const res = await fetch(`${STATIC_BASE}${path}.json`, init);
+      if (res.ok) return res;
+    } catch {
+      // 엣지 실패 시 API 폴백
+    }
+  }
+  return fetch(`${API_BASE}${path}`, init);
+}
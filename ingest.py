@@ -0,0 +1,268 @@
+"""
+수집(ingest) 공통 처리 - 모든 save_to_db에서 사용
+- apartments_with_deals: 거래가 있는 아파트 집합 (sitemap 샤드용, 저장 시점에 갱신)
+  → API가 전체 거래 테이블을 DISTINCT JOIN 하지 않아도 됨
+- data_meta: 데이터 버전 (새 거래가 저장될 때마다 1씩 증가) + 마지막 변경 시각
+  → API의 ETag / Last-Modified 기준
+- price_peaks: (단지, 평형 버킷)별 전고점 / 마지막 거래가 (거래 저장 시 PK 조회 1회로 갱신)
+- deal_events: 최근 신고가 / 전고점 대비 큰 하락 거래 (리더보드용 작은 테이블, 오래된 건 정리)
+  → 신고가/하락 판정에 단지별 전체 거래 스캔이 필요 없음
+
+Usage: python ingest.py backfill [db_path]   # 기존 DB에 테이블 (재)생성
+"""
+
+import sys
+import sqlite3
+from datetime import datetime, timezone, timedelta
+
+DB_PATH = "real_estate.db"
+DROP_EVENT_MIN_PCT = 10   # 전고점 대비 이 이상 하락한 거래만 하락 리더보드에 기록
+EVENT_KEEP_DAYS = 400     # 리더보드 최대 기간(1년) + 신고 지연 여유
+
+
+def current_kst_date() -> str:
+    """한국 날짜 (API의 데이터 기준일과 같은 기준, SQLite date('now')는 UTC)"""
+    return datetime.now(timezone(timedelta(hours=9))).date().isoformat()
+
+
+def area_bucket(area) -> int:
+    """평형 버킷: 전용면적 반올림 (API의 ROUND(area, 0)과 같은 규칙)"""
+    return int(float(area) + 0.5)
+
+
+def ensure_ingest_tables(cursor) -> bool:
+    """수집 상태 테이블 생성 (처음 생성될 때는 기존 거래로 채움), 새로 만들었으면 True"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS data_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+    ensure_price_tables(cursor)
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'apartments_with_deals'"
+    ).fetchone()
+    if exists:
+        return False
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS apartments_with_deals (
+            apt_id INTEGER PRIMARY KEY,
+            tx_count INTEGER NOT NULL DEFAULT 0,
+            first_deal_date TEXT,
+            last_deal_date TEXT,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    rebuild_apartments_with_deals(cursor)
+    return True
+
+
+def ensure_price_tables(cursor) -> bool:
+    """전고점 상태 / 리더보드 테이블 생성 (처음 생성될 때는 기존 거래로 채움), 새로 만들었으면 True"""
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'price_peaks'"
+    ).fetchone()
+    if exists:
+        return False
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS price_peaks (
+            apt_id INTEGER NOT NULL,
+            area_bucket INTEGER NOT NULL,
+            peak_amount INTEGER NOT NULL,
+            peak_date TEXT NOT NULL,
+            last_amount INTEGER NOT NULL,
+            last_date TEXT NOT NULL,
+            deal_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (apt_id, area_bucket)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS deal_events (
+            transaction_id INTEGER PRIMARY KEY,
+            apt_id INTEGER NOT NULL,
+            area_bucket INTEGER NOT NULL,
+            deal_date TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            kind TEXT NOT NULL,              -- new_high | drop
+            reference_amount INTEGER NOT NULL, -- 직전 전고점
+            change_pct REAL NOT NULL,        -- 전고점 대비 상승/하락폭 (%)
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_deal_events_kind_date ON deal_events(kind, deal_date)")
+    rebuild_price_peaks(cursor)
+    return True
+
+
+def rebuild_apartments_with_deals(cursor):
+    """거래 테이블 전체에서 다시 계산"""
+    cursor.execute("DELETE FROM apartments_with_deals")
+    cursor.execute("""
+        INSERT INTO apartments_with_deals (apt_id, tx_count, first_deal_date, last_deal_date)
+        SELECT apt_id, COUNT(*), MIN(deal_date), MAX(deal_date)
+        FROM transactions
+        WHERE apt_id IS NOT NULL
+        GROUP BY apt_id
+    """)
+
+
+def rebuild_price_peaks(cursor, as_of: str = None):
+    """
+    거래 테이블 전체에서 다시 계산 (backfill용, 한 번)
+    - 리더보드: 같은 (단지, 평형) 안에서 (거래일, id) 순으로 이전 거래들의 최고가와 비교
+    - as_of: 보관 기간 기준일 (기본: 한국 날짜)
+    """
+    cursor.execute("DELETE FROM price_peaks")
+    cursor.execute("""
+        INSERT INTO price_peaks (apt_id, area_bucket, peak_amount, peak_date, last_amount, last_date, deal_count)
+        WITH ranked AS (
+            SELECT apt_id, CAST(area + 0.5 AS INTEGER) as bucket, amount, deal_date,
+                   ROW_NUMBER() OVER w_peak as peak_rank,
+                   ROW_NUMBER() OVER w_last as last_rank,
+                   COUNT(*) OVER (PARTITION BY apt_id, CAST(area + 0.5 AS INTEGER)) as n
+            FROM transactions
+            WHERE apt_id IS NOT NULL
+            WINDOW w_peak AS (PARTITION BY apt_id, CAST(area + 0.5 AS INTEGER) ORDER BY amount DESC, deal_date DESC),
+                   w_last AS (PARTITION BY apt_id, CAST(area + 0.5 AS INTEGER) ORDER BY deal_date DESC, id DESC)
+        )
+        SELECT apt_id, bucket,
+               MAX(CASE WHEN peak_rank = 1 THEN amount END), MAX(CASE WHEN peak_rank = 1 THEN deal_date END),
+               MAX(CASE WHEN last_rank = 1 THEN amount END), MAX(CASE WHEN last_rank = 1 THEN deal_date END),
+               MAX(n)
+        FROM ranked
+        WHERE peak_rank = 1 OR last_rank = 1
+        GROUP BY apt_id, bucket
+    """)
+    cursor.execute("DELETE FROM deal_events")
+    cursor.execute("""
+        INSERT INTO deal_events (transaction_id, apt_id, area_bucket, deal_date, amount, kind, reference_amount, change_pct)
+        SELECT id, apt_id, bucket, deal_date, amount,
+               CASE WHEN amount > prev_peak THEN 'new_high' ELSE 'drop' END,
+               prev_peak, ROUND(ABS(amount - prev_peak) * 100.0 / prev_peak, 1)
+        FROM (
+            SELECT id, apt_id, CAST(area + 0.5 AS INTEGER) as bucket, amount, deal_date,
+                   MAX(amount) OVER (
+                       PARTITION BY apt_id, CAST(area + 0.5 AS INTEGER) ORDER BY deal_date, id
+                       ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                   ) as prev_peak
+            FROM transactions
+            WHERE apt_id IS NOT NULL
+        )
+        WHERE deal_date >= date(?, ?) AND prev_peak > 0
+          AND (amount > prev_peak OR (prev_peak - amount) * 100.0 / prev_peak >= ?)
+    """, (as_of or current_kst_date(), f"-{EVENT_KEEP_DAYS} days", DROP_EVENT_MIN_PCT))
+
+
+def classify_deal(state, amount: int, deal_date: str):
+    """
+    (단지, 평형) 상태(peak_amount, peak_date) 기준으로 새 거래 판정 → (kind, 직전 전고점, 변화율%)
+    - 전고점보다 이전 날짜의 거래(과거 데이터 수집)는 판정하지 않음 (그 시점의 전고점을 모름)
+    - 첫 거래는 비교 대상이 없어서 판정 없음
+    """
+    if state is None:
+        return None, None, None
+    peak_amount, peak_date = state
+    if deal_date < peak_date or peak_amount <= 0:
+        return None, peak_amount, None
+    change_pct = round(abs(amount - peak_amount) * 100.0 / peak_amount, 1)
+    if amount > peak_amount:
+        return "new_high", peak_amount, change_pct
+    return ("drop" if change_pct >= DROP_EVENT_MIN_PCT else None), peak_amount, change_pct
+
+
+_LOOKUP = object()
+
+
+def record_price(cursor, transaction_id: int, apt_id: int, area, amount: int, deal_date: str, state=_LOOKUP):
+    """
+    (단지, 평형) 전고점 상태 갱신 + 신고가/큰 하락이면 리더보드에 기록 → (kind, 직전 전고점, 변화율%)
+    state: 이미 알고 있는 반영 전 상태 (insight_engine.PeakTracker) → PK 조회 생략
+    """
+    bucket = area_bucket(area)
+    if state is _LOOKUP:
+        state = cursor.execute(
+            "SELECT peak_amount, peak_date FROM price_peaks WHERE apt_id = ? AND area_bucket = ?", (apt_id, bucket)
+        ).fetchone()
+    kind, reference, change_pct = classify_deal(state, amount, deal_date)
+    cursor.execute("""
+        INSERT INTO price_peaks (apt_id, area_bucket, peak_amount, peak_date, last_amount, last_date, deal_count)
+        VALUES (?, ?, ?, ?, ?, ?, 1)
+        ON CONFLICT(apt_id, area_bucket) DO UPDATE SET
+            peak_date = CASE
+                WHEN excluded.peak_amount > peak_amount
+                  OR (excluded.peak_amount = peak_amount AND excluded.peak_date > peak_date)
+                THEN excluded.peak_date ELSE peak_date END,
+            peak_amount = MAX(peak_amount, excluded.peak_amount),
+            last_amount = CASE WHEN excluded.last_date >= last_date THEN excluded.last_amount ELSE last_amount END,
+            last_date = MAX(last_date, excluded.last_date),
+            deal_count = deal_count + 1
+    """, (apt_id, bucket, amount, deal_date, amount, deal_date))
+    if kind is not None:
+        cursor.execute("""
+            INSERT OR REPLACE INTO deal_events
+                (transaction_id, apt_id, area_bucket, deal_date, amount, kind, reference_amount, change_pct)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (transaction_id, apt_id, bucket, deal_date, amount, kind, reference, change_pct))
+    return kind, reference, change_pct
+
+
+def prune_deal_events(cursor, as_of: str = None):
+    """리더보드 기간이 지난 기록 정리 (save_to_db 끝에서 호출, as_of 기본: 한국 날짜)"""
+    cursor.execute("DELETE FROM deal_events WHERE deal_date < date(?, ?)",
+                   (as_of or current_kst_date(), f"-{EVENT_KEEP_DAYS} days"))
+
+
+def record_deal(cursor, apt_id: int, deal_date: str):
+    """새 거래 저장 직후 호출 (같은 트랜잭션)"""
+    cursor.execute("""
+        INSERT INTO apartments_with_deals (apt_id, tx_count, first_deal_date, last_deal_date)
+        VALUES (?, 1, ?, ?)
+        ON CONFLICT(apt_id) DO UPDATE SET
+            tx_count = tx_count + 1,
+            first_deal_date = MIN(first_deal_date, excluded.first_deal_date),
+            last_deal_date = MAX(last_deal_date, excluded.last_deal_date),
+            updated_at = CURRENT_TIMESTAMP
+    """, (apt_id, deal_date, deal_date))
+
+
+def bump_data_version(cursor):
+    """새 거래를 저장한 save_to_db 끝에서 호출 (commit 전)"""
+    cursor.execute("""
+        INSERT INTO data_meta (key, value) VALUES ('data_version', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+    """)
+    cursor.execute("""
+        INSERT INTO data_meta (key, value) VALUES ('data_updated_at', CURRENT_TIMESTAMP)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+    """)
+
+
+def read_data_version(cursor):
+    """(data_version, data_updated_at) - 기록이 없으면 (0, None)"""
+    try:
+        meta = dict(cursor.execute("SELECT key, value FROM data_meta").fetchall())
+    except sqlite3.OperationalError:
+        return 0, None
+    return int(meta.get("data_version") or 0), meta.get("data_updated_at")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "backfill":
+        print("Usage: python ingest.py backfill [db_path]")
+        sys.exit(1)
+
+    db_path = sys.argv[2] if len(sys.argv) > 2 else DB_PATH
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    price_created = ensure_price_tables(cursor)
+    if not ensure_ingest_tables(cursor):
+        rebuild_apartments_with_deals(cursor)
+    if not price_created:
+        rebuild_price_peaks(cursor)
+    conn.commit()
+    count = cursor.execute("SELECT COUNT(*) FROM apartments_with_deals").fetchone()[0]
+    peaks = cursor.execute("SELECT COUNT(*) FROM price_peaks").fetchone()[0]
+    events = cursor.execute("SELECT COUNT(*) FROM deal_events").fetchone()[0]
+    conn.close()
+    print(f"[INGEST] apartments_with_deals: {count} apartments")
+    print(f"[INGEST] price_peaks: {peaks} (apt, area) buckets, deal_events: {events}")
@@ -1,48 +1,129 @@
 import hashlib
+import threading
+from collections import OrderedDict
+
+from ingest import area_bucket, classify_deal
+
+PEAK_STATE_MAX = 200000  # 메모리에 유지하는 (단지, 평형) 상태 수 (최근 거래 순, 넘치면 오래 안 쓴 것부터 제거)
 
 def generate_deal_hash(apt_name, floor, area, deal_date, amount):
     """중복 방지를 위한 고유 해시 생성"""
     raw_str = f"{apt_name}|{floor}|{area}|{deal_date}|{amount}"
     return hashlib.md5(raw_str.encode()).hexdigest()
 
-def analyze_transaction(deal, history=None):
+
+class PeakTracker:
+    """
+    (단지, 평형 버킷)별 전고점 상태 (peak_amount, peak_date) - 거래마다 O(1) 판정
+    - 수집 실행당 한 번 price_peaks(ingest가 유지)에서 최근 거래 순 상위 max_entries개로 시드
+    - 메모리에 없는 키는 price_peaks PK 조회 1회 (상태의 원본은 DB라 크기 제한이 결과를 바꾸지 않음)
+    """
+
+    def __init__(self, max_entries: int = PEAK_STATE_MAX):
+        self.max_entries = max_entries
+        self.states = OrderedDict()
+        self.seeded = False
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def seed(self, cursor):
+        rows = cursor.execute("""
+            SELECT apt_id, area_bucket, peak_amount, peak_date FROM price_peaks
+            ORDER BY last_date DESC LIMIT ?
+        """, (self.max_entries,)).fetchall()
+        for apt_id, bucket, peak_amount, peak_date in reversed(rows):  # 최근 것이 LRU 끝에 오도록
+            self.states[(apt_id, bucket)] = (peak_amount, peak_date)
+        self.seeded = True
+        print(f"[INSIGHT] Peak state seeded: {len(rows)} (apt, area) buckets", flush=True)
+
+    def observe(self, cursor, apt_id, area, amount, deal_date):
+        """새 거래 반영 → 반영 전 상태 (peak_amount, peak_date), 첫 거래면 None"""
+        key = (apt_id, area_bucket(area))
+        with self.lock:
+            if not self.seeded:
+                self.seed(cursor)
+            if key in self.states:
+                self.states.move_to_end(key)
+                state = self.states[key]
+            else:
+                self.misses += 1
+                state = cursor.execute(
+                    "SELECT peak_amount, peak_date FROM price_peaks WHERE apt_id = ? AND area_bucket = ?", key
+                ).fetchone()
+                state = tuple(state) if state else None
+
+            # ingest.record_price의 price_peaks 갱신 규칙과 같게
+            if state is None or amount > state[0]:
+                self.states[key] = (amount, deal_date)
+            elif amount == state[0] and deal_date > state[1]:
+                self.states[key] = (amount, deal_date)
+            else:
+                self.states[key] = state
+            if len(self.states) > self.max_entries:
+                self.states.popitem(last=False)
+            return state
+
+
+_trackers = {}
+
+def peak_tracker(db_path):
+    """DB별 PeakTracker (수집 프로세스에서 한 번 만들어 계속 사용)"""
+    tracker = _trackers.get(db_path)
+    if tracker is None:
+        tracker = _trackers[db_path] = PeakTracker()
+    return tracker
+
+
+def peak_metrics(amount, deal_date, state):
+    """
+    (전고점 대비 하락폭 %, 신고가 여부) - transaction_insights의 peak_drop_pct / is_new_high
+    비교할 전고점이 없거나(첫 거래) 전고점보다 이전 날짜의 거래면 (None, None)
+    """
+    kind, peak_amount, change_pct = classify_deal(state, amount, deal_date)
+    if change_pct is None:
+        return None, None
+    if kind == "new_high":
+        return 0, True
+    return round(change_pct), False
+
+
+def analyze_transaction(deal, peak=None):
     """
     실거래 한 건에 대한 룰 기반 분석 로직
     - deal: 현재 거래 정보 (dict)
-    - history: 해당 단지의 과거 거래 기록 (list, optional)
+    - peak: 이 거래 반영 전 해당 단지·평형의 전고점 상태 (PeakTracker.observe 결과, optional)
     """
     insights = []
-    
+
     amount = int(deal['amount'].replace(',', ''))
-    area = float(deal['area'])
-    
-    # 1. 전고점 대비 하락폭 (임시 데이터 활용)
-    peak_amount = 150000  # 예: 해당 평형 전고점 15억
-    if amount < peak_amount:
-        drop_pct = round((peak_amount - amount) / peak_amount * 100)
-        insights.append(f"📉 전고점 대비 -{drop_pct}% 수준")
-    
-    # 2. 신고가 여부
-    if amount >= peak_amount:
-        insights.append("🔥 신고가 경신!")
+    deal_date = deal.get('deal_date') or f"{deal['deal_year']}-{int(deal['deal_month']):02d}-{int(deal['deal_day']):02d}"
+
+    # 1~2. 전고점 대비 하락폭 / 신고가 여부 (같은 단지·평형의 실제 전고점)
+    peak_drop_pct, is_new_high = peak_metrics(amount, deal_date, peak)
+    if is_new_high:
+        rise_pct = round((amount - peak[0]) / peak[0] * 100)
+        insights.append(f"🔥 신고가 경신! (+{rise_pct}%)")
+    elif peak_drop_pct:
+        insights.append(f"📉 전고점 대비 -{peak_drop_pct}% 수준")
 
     # 3. 전세가율 (데이터가 있을 경우)
     if 'jeonse_amount' in deal:
         jeonse = int(deal['jeonse_amount'].replace(',', ''))
         gap_ratio = round(jeonse / amount * 100)
         insights.append(f"💰 전세가율 {gap_ratio}% (갭 {amount - jeonse:,}원)")
-        
+
     return " | ".join(insights) if insights else "평이한 거래"
 
-# 테스트용 가짜 데이터
-sample_deal = {
-    'apt_name': '잠실 엘스',
-    'floor': 15,
-    'area': 84.88,
-    'deal_date': '2026-01-14',
-    'amount': '125,000',
-    'jeonse_amount': '95,000'
-}
-
-print(f"[{sample_deal['apt_name']}] 분석 결과:")
-print(f"거래 요약: {analyze_transaction(sample_deal)}")
+if __name__ == "__main__":
+    # 테스트용 가짜 데이터 (해당 평형 전고점 15억)
+    sample_deal = {
+        'apt_name': '잠실 엘스',
+        'floor': 15,
+        'area': 84.88,
+        'deal_date': '2026-01-14',
+        'amount': '125,000',
+        'jeonse_amount': '95,000'
+    }
+
+    print(f"[{sample_deal['apt_name']}] 분석 결과:")
+    print(f"거래 요약: {analyze_transaction(sample_deal, (150000, '2021-10-02'))}")
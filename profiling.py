@@ -0,0 +1,261 @@
+"""
+API 프로파일링 (관리자 전용)
+- RequestProfile: 요청 하나의 핸들러 실행(스레드풀/병렬 조회 스레드의 SQL/행 변환)을 cProfile로 측정해 합침
+  + 응답 직렬화 구간(엔드포인트 반환 → jsonable_encoder → JSON render, 이벤트 루프에서 await 없이 실행)
+  이벤트 루프의 나머지는 측정하지 않음 (동시에 처리 중인 다른 요청까지 섞이므로) → other_ms로 표시
+  요약: SQL(sqlite3 호출) / JSON 직렬화 / 나머지 Python 시간 + 전체 응답 시간(wall)
+- ProfiledRoute: 직렬화 구간 경계를 표시하는 FastAPI 라우트 클래스 (app.router.route_class)
+- SamplingProfiler: N초 동안 모든 스레드의 스택을 주기적으로 샘플링 → collapsed stack 파일
+  (flamegraph.pl, speedscope 등에서 바로 열 수 있는 "frame;frame;frame count" 형식)
+"""
+
+import io
+import os
+import re
+import sys
+import time
+import pstats
+import inspect
+import cProfile
+import functools
+import threading
+import contextvars
+from collections import Counter
+
+from fastapi.routing import APIRoute
+from starlette.responses import Response
+
+_request_profile = contextvars.ContextVar("request_profile", default=None)
+PROFILE_FILE = re.compile(r"((?:req|sample)-(\d+))\.(prof|txt|folded)")
+
+
+class RequestProfile:
+    def __init__(self, label: str):
+        self.label = label
+        self.threads = []  # 작업 스레드 호출별 Profile
+        self.unprofiled = 0  # 다른 프로파일러가 이미 켜져 있어 측정 없이 실행한 호출 수
+        self.handler = 0.0  # 작업 스레드 실행 시간 합
+        self.encode = 0.0  # 응답 직렬화 구간 시간
+        self._encode = None  # 진행 중인 직렬화 구간 (시작 시각, Profile | None)
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.wall = 0.0
+
+    def __enter__(self):
+        self.token = _request_profile.set(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self._start
+        _request_profile.reset(self.token)
+        return False
+
+    def call(self, func, *args):
+        """
+        (작업 스레드) func 실행을 별도 Profile로 측정
+        - Python 3.12+는 cProfile이 프로세스 전체에 하나만 켜질 수 있음 (sys.monitoring)
+          → 병렬 조회의 다른 스레드나 외부 프로파일러가 이미 켜 두었으면 측정 없이 실행
+        """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            profile = None
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+            with self._lock:
+                self.handler += elapsed
+                if profile is not None:
+                    self.threads.append(profile)
+                else:
+                    self.unprofiled += 1
+
+    def begin_encode(self):
+        """(이벤트 루프) 엔드포인트가 값을 반환한 직후 - 응답 객체 생성까지 await가 없어 이 요청만 측정됨"""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            profile = None
+        self._encode = (time.perf_counter(), profile)
+
+    def end_encode(self):
+        """(이벤트 루프) 응답 객체 생성(render) 직후"""
+        if self._encode is None:
+            return
+        start, profile = self._encode
+        self._encode = None
+        if profile is not None:
+            profile.disable()
+        with self._lock:
+            self.encode += time.perf_counter() - start
+            if profile is not None:
+                self.threads.append(profile)
+            else:
+                self.unprofiled += 1
+
+    def stats(self) -> pstats.Stats:
+        stats = pstats.Stats()
+        for profile in self.threads:
+            stats.add(profile)
+        return stats
+
+    def summary(self, stats: pstats.Stats) -> dict:
+        """함수별 자체 시간(tottime)을 SQL / JSON / 기타로 분류"""
+        sql = json_time = total = 0.0
+        for (filename, _, name), (_, _, tottime, _, _) in stats.stats.items():
+            total += tottime
+            if "sqlite3" in name:
+                sql += tottime
+            elif "json" in filename or "encoders.py" in filename or "json" in name:
+                json_time += tottime
+        return {
+            "wall_ms": round(self.wall * 1000, 1),
+            "handler_ms": round(self.handler * 1000, 1),
+            "encode_ms": round(self.encode * 1000, 1),
+            # 라우팅/미들웨어/전송/스레드풀 대기 등 측정하지 않은 이벤트 루프 시간 (병렬 핸들러는 겹쳐서 0으로 내림)
+            "other_ms": round(max(self.wall - self.handler - self.encode, 0) * 1000, 1),
+            "profiled_ms": round(total * 1000, 1),
+            "sql_ms": round(sql * 1000, 1),
+            "json_ms": round(json_time * 1000, 1),
+            "python_ms": round((total - sql - json_time) * 1000, 1),
+            "threads": len(self.threads),
+            "unprofiled": self.unprofiled,
+        }
+
+    def save(self, directory: str, keep: int = 50) -> str:
+        """.prof(pstats/snakeviz용) + .txt(요약 + 상위 함수) 저장 → 프로파일 id"""
+        os.makedirs(directory, exist_ok=True)
+        profile_id = f"req-{int(self.started_at * 1000)}"
+        stats = self.stats()
+        stats.dump_stats(os.path.join(directory, profile_id + ".prof"))
+        with open(os.path.join(directory, profile_id + ".txt"), "w", encoding="utf-8") as f:
+            f.write(format_report(self.label, self.summary(stats), stats))
+        prune(directory, keep)
+        return profile_id
+
+
+def format_report(label: str, summary: dict, stats: pstats.Stats, sort: str = "cumulative", limit: int = 40) -> str:
+    out = io.StringIO()
+    out.write(f"{label}\n")
+    out.write(" ".join(f"{k}={v}" for k, v in summary.items()) + "\n\n")
+    stats.stream = out
+    stats.sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def _timed_endpoint(endpoint):
+    """async 엔드포인트 반환 시점에 직렬화 구간 시작 (응답 객체를 직접 반환하면 이미 직렬화된 것이라 제외)"""
+    if not inspect.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @functools.wraps(endpoint)  # FastAPI는 inspect.unwrap으로 원래 시그니처/의존성을 읽음
+    async def wrapper(*args, **kwargs):
+        result = await endpoint(*args, **kwargs)
+        profile = _request_profile.get()
+        if profile is not None and not isinstance(result, Response):
+            profile.begin_encode()
+        return result
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """요청 프로파일링 중이면 엔드포인트 반환 → 응답 객체 생성(jsonable_encoder + render) 구간을 측정"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            try:
+                return await handler(request)
+            finally:
+                profile = _request_profile.get()
+                if profile is not None:
+                    profile.end_encode()
+        return timed_handler
+
+
+def profile_call(func, *args):
+    """요청이 프로파일링 중이면 작업 스레드에서도 측정 (run_in_threadpool / 병렬 조회에서 사용)"""
+    profile = _request_profile.get()
+    if profile is None:
+        return func(*args)
+    return profile.call(func, *args)
+
+
+def profile_files(directory: str) -> dict:
+    """저장된 프로파일 {id: (시작 시각 ms, [확장자])} - 이름 규칙(req-/sample-<ms>.ext)에 맞지 않는 파일은 무시"""
+    found = {}
+    for name in os.listdir(directory):
+        match = PROFILE_FILE.fullmatch(name)
+        if match:
+            profile_id, started_ms, ext = match.groups()
+            found.setdefault(profile_id, (int(started_ms), []))[1].append(ext)
+    return found
+
+
+def prune(directory: str, keep: int):
+    """오래된 프로파일 파일 정리 (최신 keep개 유지)"""
+    found = profile_files(directory)
+    ids = sorted(found, key=lambda profile_id: found[profile_id][0])
+    for old in ids[:-keep] if len(ids) > keep else []:
+        for ext in (".prof", ".txt", ".folded"):
+            path = os.path.join(directory, old + ext)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class SamplingProfiler(threading.Thread):
+    """interval마다 전체 스레드 스택 샘플링 (측정 대상 코드에 훅 없음 → 낮은 오버헤드)"""
+
+    def __init__(self, directory: str, seconds: float, interval: float = 0.01):
+        super().__init__(name="sampling-profiler", daemon=True)
+        self.directory = directory
+        self.seconds = seconds
+        self.interval = interval
+        self.profile_id = f"sample-{int(time.time() * 1000)}"
+        self.path = os.path.join(directory, self.profile_id + ".folded")
+        self.samples = 0
+        self.stacks = Counter()
+        self.stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        deadline = time.monotonic() + self.seconds
+        while time.monotonic() < deadline and not self.stop_event.is_set():
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def status(self) -> dict:
+        return {
+            "id": self.profile_id,
+            "running": self.is_alive(),
+            "samples": self.samples,
+            "seconds": self.seconds,
+            "interval_ms": self.interval * 1000,
+        }
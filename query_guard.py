@@ -0,0 +1,103 @@
+"""
+쿼리 시간 예산 + 클라이언트 연결 종료 시 취소
+- DisconnectWatchMiddleware: ASGI receive를 대신 읽어 http.disconnect를 즉시 감지
+- QueryGuard: 라우트별 기한 + 연결 종료 여부를 SQLite progress handler에서 검사
+  → 조건 충족 시 실행 중인 쿼리가 "interrupted"로 중단되어 스레드가 바로 반환됨
+- 요청 컨텍스트(contextvar)는 스레드풀로도 전달되므로 get_db_connection에서 설치 가능
+"""
+
+import time
+import asyncio
+import threading
+import contextvars
+
+# 쿼리 N개 VM 명령마다 progress handler 호출 (작을수록 빨리 멈추지만 오버헤드 증가)
+PROGRESS_OPS = 10000
+
+_request_watch = contextvars.ContextVar("request_watch", default=None)
+_query_guard = contextvars.ContextVar("query_guard", default=None)
+
+
+class RequestWatch:
+    """요청별 연결 종료 플래그 (스레드에서도 읽을 수 있도록 threading.Event)"""
+
+    def __init__(self):
+        self.disconnected = threading.Event()
+
+
+class DisconnectWatchMiddleware:
+    """receive를 백그라운드로 읽어 클라이언트 연결 종료를 바로 표시하는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        watch = RequestWatch()
+        token = _request_watch.set(watch)
+        messages = asyncio.Queue()
+
+        async def pump():
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    watch.disconnected.set()
+                    return
+
+        pump_task = asyncio.create_task(pump())
+        try:
+            await self.app(scope, messages.get, send)
+        finally:
+            pump_task.cancel()
+            _request_watch.reset(token)
+
+
+class QueryGuard:
+    """기한(초) + 요청 연결 상태로 쿼리 중단 여부 판단"""
+
+    def __init__(self, name: str, budget: float):
+        self.name = name
+        self.budget = budget
+        self.deadline = time.monotonic() + budget
+        self.watch = _request_watch.get()
+        self.aborted = None  # None | "timeout" | "disconnect"
+
+    def check(self) -> int:
+        """progress handler: 0이 아니면 SQLite가 쿼리를 중단"""
+        if self.watch is not None and self.watch.disconnected.is_set():
+            self.aborted = "disconnect"
+            return 1
+        if time.monotonic() > self.deadline:
+            self.aborted = "timeout"
+            return 1
+        return 0
+
+    def __enter__(self):
+        self.token = _query_guard.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _query_guard.reset(self.token)
+        return False
+
+
+def install_guard(conn):
+    """현재 컨텍스트에 QueryGuard가 있으면 커넥션에 progress handler 설치"""
+    guard = _query_guard.get()
+    if guard is not None:
+        conn.set_progress_handler(guard.check, PROGRESS_OPS)
+    return conn
+
+
+def current_guard():
+    """현재 컨텍스트의 QueryGuard (없으면 None)"""
+    return _query_guard.get()
+
+
+def detach_request():
+    """백그라운드 작업이 원래 요청의 연결 종료에 영향받지 않도록 분리"""
+    _request_watch.set(None)
@@ -0,0 +1,93 @@
+"""
+요청 내 독립 쿼리 병렬 실행
+- ReadPool: 읽기 전용 커넥션 풀 (DB 경로/세대가 바뀌면 이전 커넥션은 반환 시 폐기)
+- parallel_reads({이름: fn(cursor)}): 서로 의존하지 않는 조회를 각자 커넥션/스레드에서 동시에 실행
+  → 캐시 미스 지연이 쿼리 합이 아니라 가장 긴 쿼리 하나에 가까워짐
+- 요청 컨텍스트(QueryGuard/연결 종료 감시)를 작업 스레드로 복사 → 기한 초과/이탈 시 모든 쿼리 중단
+- 요청당 동시 실행 수 제한(limit) + 전체 작업 스레드 수 제한(워커 풀 크기)
+"""
+
+import sqlite3
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from query_guard import install_guard
+
+
+class ReadPool:
+    def __init__(self, max_idle: int = 16):
+        self.max_idle = max_idle
+        self._idle = []  # [(key, conn)]
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+
+    def acquire(self, path: str, generation: str):
+        key = (path, generation)
+        with self._lock:
+            while self._idle:
+                idle_key, conn = self._idle.pop()
+                if idle_key == key:
+                    self.reused += 1
+                    return conn
+                conn.close()  # DB 교체 전 커넥션
+            self.opened += 1
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def release(self, conn, path: str, generation: str):
+        conn.set_progress_handler(None, 0)
+        conn.set_trace_callback(None)
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(((path, generation), conn))
+                return
+        conn.close()
+
+    def stats(self) -> dict:
+        return {"idle": len(self._idle), "opened": self.opened, "reused": self.reused}
+
+
+class QueryFanout:
+    """parallel_reads 실행기 (스레드 수 = 전체 동시 쿼리 상한)"""
+
+    def __init__(self, pool: ReadPool, workers: int = 8, prepare=install_guard, runner=None):
+        self.pool = pool
+        self.prepare = prepare  # 커넥션에 요청 컨텍스트(기한 검사 등) 설치
+        self.runner = runner    # 작업 실행 래퍼 (예: 프로파일링), runner(fn, *args)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query")
+        self.plans = 0
+        self.tasks = 0
+
+    def parallel_reads(self, path: str, generation: str, tasks: dict, limit: int = 4) -> dict:
+        """{이름: fn(cursor)} → {이름: 결과}, 하나라도 실패하면 나머지 완료 후 첫 예외 전달"""
+        self.plans += 1
+        self.tasks += len(tasks)
+
+        def run(fn):
+            conn = self.pool.acquire(path, generation)
+            try:
+                self.prepare(conn)
+                return fn(conn.cursor())
+            finally:
+                self.pool.release(conn, path, generation)
+
+        if limit <= 1 or len(tasks) <= 1:
+            return {name: run(fn) for name, fn in tasks.items()}
+        call = run if self.runner is None else (lambda fn: self.runner(run, fn))
+
+        slots = threading.Semaphore(limit)
+        futures = {}
+        for name, fn in tasks.items():
+            slots.acquire()
+            # 작업마다 컨텍스트 복사본 (같은 Context는 여러 스레드에서 동시에 진입 불가)
+            future = self.executor.submit(contextvars.copy_context().run, call, fn)
+            future.add_done_callback(lambda _: slots.release())
+            futures[name] = future
+        wait(futures.values())
+        return {name: future.result() for name, future in futures.items()}
+
+    def stats(self) -> dict:
+        return {"plans": self.plans, "tasks": self.tasks, **self.pool.stats()}
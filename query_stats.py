@@ -0,0 +1,108 @@
+"""
+요청별 SQL 계측 (N+1 탐지용)
+- sqlite3 trace callback으로 실행된 문장 수 + 문장 목록 기록
+- progress handler로 VM 명령 수 집계 (읽은 행 수에 비례하는 작업량 지표)
+  → QueryGuard와 같은 handler 자리를 쓰므로 기한 검사도 함께 호출
+- 계측은 컨텍스트(contextvar) 단위: 요청 미들웨어 / 검사 스크립트가 QueryCounter를 설정한 경우에만 설치
+- table_scans(): EXPLAIN QUERY PLAN으로 인덱스 없는 전체 테이블 스캔 단계 수 계산
+"""
+
+import re
+import threading
+import contextvars
+
+from query_guard import PROGRESS_OPS, current_guard
+
+STEP_OPS = 1000  # 계측 중에는 기한 검사보다 촘촘하게 (단위: VM 명령)
+
+_query_counter = contextvars.ContextVar("query_counter", default=None)
+
+
+class QueryCounter:
+    def __init__(self, keep_sql: bool = False):
+        self.statements = 0
+        self.vm_steps = 0
+        self.keep_sql = keep_sql
+        self.sql = []
+        self._lock = threading.Lock()  # 병렬 조회(query_plan)에서 여러 스레드가 함께 기록
+
+    def trace(self, statement: str):
+        with self._lock:
+            self.statements += 1
+            if self.keep_sql:
+                self.sql.append(statement)
+
+    def step(self):
+        with self._lock:
+            self.vm_steps += STEP_OPS
+
+    def __enter__(self):
+        self.token = _query_counter.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _query_counter.reset(self.token)
+        return False
+
+
+def install_counter(conn):
+    """현재 컨텍스트에 QueryCounter가 있으면 trace/progress handler 설치 (install_guard 뒤에 호출)"""
+    counter = _query_counter.get()
+    if counter is None:
+        return conn
+    guard = current_guard()
+    ticks = max(1, PROGRESS_OPS // STEP_OPS)
+    calls = 0
+
+    def progress():
+        nonlocal calls
+        counter.step()
+        calls += 1
+        if guard is not None and calls % ticks == 0:
+            return guard.check()
+        return 0
+
+    conn.set_trace_callback(counter.trace)
+    conn.set_progress_handler(progress, STEP_OPS)
+    return conn
+
+
+def detach_counter():
+    """백그라운드 작업이 원래 요청의 계측에 섞이지 않도록 분리"""
+    _query_counter.set(None)
+
+
+_SCAN = re.compile(r"^SCAN (\S+)")
+_NAMED_SUBQUERY = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\S+)")
+
+
+def table_scans(conn, statements: list) -> dict:
+    """
+    문장 목록의 실행 계획에서 스캔 단계 수 집계 (같은 문장은 한 번만 분석)
+    - scans: 인덱스 없이 테이블 전체를 읽는 단계
+    - index_scans: 인덱스 전체를 읽는 단계 (SEARCH가 아닌 SCAN ... USING INDEX)
+    """
+    result = {"scans": 0, "index_scans": 0, "scan_details": []}
+    plans = {}
+    for sql in statements:
+        if sql not in plans:
+            try:
+                plans[sql] = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+            except Exception:
+                plans[sql] = []
+        details = plans[sql]
+        subqueries = {m.group(1) for m in map(_NAMED_SUBQUERY.match, details) if m}
+        for detail in details:
+            match = _SCAN.match(detail)
+            if not match or "VIRTUAL TABLE" in detail or "CONSTANT ROW" in detail:
+                continue
+            target = match.group(1)
+            # 서브쿼리/CTE 결과, 시스템 테이블, FTS 내부 테이블(main.xxx_config 등)은 제외
+            if target in subqueries or target.startswith(("(subquery", "sqlite_")) or "." in target:
+                continue
+            if "INDEX" in detail:
+                result["index_scans"] += 1
+            else:
+                result["scans"] += 1
+                result["scan_details"].append(f"{detail} :: {sql[:120]}")
+    return result
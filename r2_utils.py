@@ -3,13 +3,22 @@
 Cloudflare R2 유틸리티
 - S3 호환 API 사용 (boto3)
 - DB 파일 업로드/다운로드
+- 병렬 멀티파트 업로드 / 병렬 Range GET 다운로드
+- 부분 다운로드 이어받기 (.part + .part.json)
+- SHA-256 체크섬을 오브젝트 메타데이터에 저장하여 종단 검증
+- 압축 스냅샷(db_snapshot.py) 게시 + 스트리밍 압축 해제 다운로드 (실패 시 압축본 이어받기로 대체)
 """
 
 import os
-import boto3
-from botocore.config import Config
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+# boto3/botocore는 import 비용이 커서(수백 ms) 실제 R2 접근 시점에 로드
+# → api_server 콜드 스타트에 영향 없음
+
 
 # R2 설정 (환경변수에서 로드)
 R2_ENDPOINT = os.environ.get("R2_ENDPOINT")
@@ -21,43 +30,506 @@ R2_BUCKET_NAME = os.environ.get("R2_BUCKET_NAME", "real-estate-db")
 DB_FILENAME = "real_estate.db"
 LOCAL_DB_PATH = os.environ.get("DB_PATH", "real_estate.db")
 
+# 전송 설정 (파트 크기 / 동시 전송 수)
+PART_SIZE_MB = int(os.environ.get("R2_PART_SIZE_MB", "16"))
+CONCURRENCY = int(os.environ.get("R2_CONCURRENCY", "8"))
+CHECKSUM_META_KEY = "sha256"
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+# 스냅샷 설정 (snapshots/{generation}/... + latest.json 포인터)
+SNAPSHOT_PREFIX = "snapshots"
+SNAPSHOT_POINTER_KEY = f"{SNAPSHOT_PREFIX}/latest.json"
+MANIFEST_SUFFIX = ".manifest.json"  # 로컬 DB 옆에 manifest 보관
+STREAM_PART_SIZE_MB = int(os.environ.get("R2_STREAM_PART_SIZE_MB", "4"))
+
+# 클라이언트 재사용 (boto3 클라이언트는 thread-safe)
+_client = None
+_client_lock = threading.Lock()
+
 
 def get_r2_client():
-    """R2 클라이언트 생성"""
-    if not all([R2_ENDPOINT, R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY]):
-        raise ValueError(
-            "R2 환경변수가 설정되지 않았습니다.\n"
-            "필수: R2_ENDPOINT, R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY"
+    """R2 클라이언트 반환 (프로세스당 1회 생성 후 재사용)"""
+    global _client
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is not None:
+            return _client
+
+        if not all([R2_ENDPOINT, R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY]):
+            raise ValueError(
+                "R2 환경변수가 설정되지 않았습니다.\n"
+                "필수: R2_ENDPOINT, R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY"
+            )
+
+        import boto3
+        from botocore.config import Config
+
+        _client = boto3.client(
+            "s3",
+            endpoint_url=R2_ENDPOINT,
+            aws_access_key_id=R2_ACCESS_KEY_ID,
+            aws_secret_access_key=R2_SECRET_ACCESS_KEY,
+            config=Config(
+                signature_version="s3v4",
+                retries={"max_attempts": 3, "mode": "standard"},
+                max_pool_connections=max(10, CONCURRENCY * 2)
+            )
+        )
+        return _client
+
+
+def file_sha256(path: str) -> str:
+    """파일 SHA-256 계산 (청크 단위 스트리밍)"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _split_ranges(size: int, part_size: int) -> list:
+    """[(part_index, start, end_inclusive), ...]"""
+    ranges = []
+    for idx, start in enumerate(range(0, size, part_size)):
+        ranges.append((idx, start, min(start + part_size, size) - 1))
+    return ranges
+
+
+def _load_resume_state(state_path: str) -> dict:
+    if not os.path.exists(state_path):
+        return {}
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _save_resume_state(state_path: str, state: dict):
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def download_object(key: str, local_path: str, part_size_mb: int = None,
+                    concurrency: int = None) -> dict:
+    """
+    오브젝트를 병렬 Range GET으로 다운로드
+    - local_path + ".part"에 위치 지정 쓰기, 완료 파트는 ".part.json"에 기록
+    - ETag가 같으면 다음 호출 시 남은 파트만 이어받음
+    - 메타데이터의 sha256과 비교 후 원자적으로 교체
+    """
+    part_size = (part_size_mb or PART_SIZE_MB) * 1024 * 1024
+    concurrency = concurrency or CONCURRENCY
+    client = get_r2_client()
+
+    head = client.head_object(Bucket=R2_BUCKET_NAME, Key=key)
+    size = head["ContentLength"]
+    etag = head["ETag"]
+    expected_sha = head.get("Metadata", {}).get(CHECKSUM_META_KEY)
+
+    part_path = local_path + ".part"
+    state_path = local_path + ".part.json"
+
+    state = _load_resume_state(state_path)
+    resumable = (
+        state.get("etag") == etag
+        and state.get("size") == size
+        and state.get("part_size") == part_size
+        and os.path.exists(part_path)
+        and os.path.getsize(part_path) == size
+    )
+    if resumable:
+        done = set(state.get("done", []))
+        print(f"[R2] Resuming {key}: {len(done)} parts already downloaded")
+    else:
+        done = set()
+        state = {"key": key, "etag": etag, "size": size, "part_size": part_size, "done": []}
+        with open(part_path, "wb") as f:
+            f.truncate(size)
+        _save_resume_state(state_path, state)
+
+    pending = [r for r in _split_ranges(size, part_size) if r[0] not in done]
+    state_lock = threading.Lock()
+    fd = os.open(part_path, os.O_WRONLY)
+
+    def fetch_part(part):
+        idx, start, end = part
+        resp = client.get_object(
+            Bucket=R2_BUCKET_NAME, Key=key,
+            Range=f"bytes={start}-{end}", IfMatch=etag
+        )
+        offset = start
+        for chunk in resp["Body"].iter_chunks(chunk_size=1024 * 1024):
+            os.pwrite(fd, chunk, offset)
+            offset += len(chunk)
+        if offset != end + 1:
+            raise IOError(f"Short read for part {idx}: {offset - start}/{end - start + 1} bytes")
+        with state_lock:
+            done.add(idx)
+            state["done"] = sorted(done)
+            _save_resume_state(state_path, state)
+        return end - start + 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(fetch_part, p) for p in pending]
+            for future in as_completed(futures):
+                future.result()
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+    if expected_sha:
+        actual_sha = file_sha256(part_path)
+        if actual_sha != expected_sha:
+            # 손상된 부분 파일은 이어받지 않도록 폐기
+            os.remove(part_path)
+            os.remove(state_path)
+            raise IOError(f"Checksum mismatch for {key}: expected {expected_sha}, got {actual_sha}")
+
+    os.replace(part_path, local_path)
+    os.remove(state_path)
+    return {"size": size, "etag": etag, "sha256": expected_sha, "parts": len(pending)}
+
+
+def upload_object(local_path: str, key: str, metadata: dict = None,
+                  part_size_mb: int = None, concurrency: int = None) -> dict:
+    """
+    파일을 병렬 멀티파트로 업로드 (파트 크기 이하이면 단일 PUT)
+    - 업로드 전 SHA-256을 계산하여 메타데이터에 저장
+    """
+    part_size = (part_size_mb or PART_SIZE_MB) * 1024 * 1024
+    concurrency = concurrency or CONCURRENCY
+    client = get_r2_client()
+
+    size = os.path.getsize(local_path)
+    sha = file_sha256(local_path)
+    meta = dict(metadata or {})
+    meta[CHECKSUM_META_KEY] = sha
+
+    if size <= part_size:
+        with open(local_path, "rb") as f:
+            client.put_object(Bucket=R2_BUCKET_NAME, Key=key, Body=f.read(), Metadata=meta)
+        return {"size": size, "sha256": sha, "parts": 1}
+
+    upload_id = client.create_multipart_upload(
+        Bucket=R2_BUCKET_NAME, Key=key, Metadata=meta
+    )["UploadId"]
+    fd = os.open(local_path, os.O_RDONLY)
+
+    def send_part(part):
+        idx, start, end = part
+        body = os.pread(fd, end - start + 1, start)
+        resp = client.upload_part(
+            Bucket=R2_BUCKET_NAME, Key=key, UploadId=upload_id,
+            PartNumber=idx + 1, Body=body
         )
+        return {"PartNumber": idx + 1, "ETag": resp["ETag"]}
 
-    return boto3.client(
-        "s3",
-        endpoint_url=R2_ENDPOINT,
-        aws_access_key_id=R2_ACCESS_KEY_ID,
-        aws_secret_access_key=R2_SECRET_ACCESS_KEY,
-        config=Config(
-            signature_version="s3v4",
-            retries={"max_attempts": 3, "mode": "standard"}
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            parts = list(executor.map(send_part, _split_ranges(size, part_size)))
+        client.complete_multipart_upload(
+            Bucket=R2_BUCKET_NAME, Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": parts}
         )
+    except Exception:
+        client.abort_multipart_upload(Bucket=R2_BUCKET_NAME, Key=key, UploadId=upload_id)
+        raise
+    finally:
+        os.close(fd)
+
+    return {"size": size, "sha256": sha, "parts": len(parts)}
+
+
+def _iter_object_chunks(key: str, etag: str, size: int, part_size: int, concurrency: int):
+    """
+    병렬 Range GET 결과를 순서대로 yield (스트리밍 처리용)
+    - 최대 concurrency개 파트만 앞서 받아두므로 메모리는 part_size * concurrency로 제한
+    """
+    client = get_r2_client()
+
+    def fetch_part(part):
+        _, start, end = part
+        resp = client.get_object(
+            Bucket=R2_BUCKET_NAME, Key=key,
+            Range=f"bytes={start}-{end}", IfMatch=etag
+        )
+        data = resp["Body"].read()
+        if len(data) != end - start + 1:
+            raise IOError(f"Short read for {key} bytes={start}-{end}")
+        return data
+
+    ranges = _split_ranges(size, part_size)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        window = []
+        next_idx = 0
+        while next_idx < len(ranges) and len(window) < concurrency:
+            window.append(executor.submit(fetch_part, ranges[next_idx]))
+            next_idx += 1
+        while window:
+            data = window.pop(0).result()
+            if next_idx < len(ranges):
+                window.append(executor.submit(fetch_part, ranges[next_idx]))
+                next_idx += 1
+            yield data
+
+
+def _get_json(key: str):
+    from botocore.exceptions import ClientError
+
+    client = get_r2_client()
+    try:
+        resp = client.get_object(Bucket=R2_BUCKET_NAME, Key=key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            return None
+        raise
+    return json.loads(resp["Body"].read())
+
+
+def _put_json(key: str, data: dict):
+    client = get_r2_client()
+    client.put_object(
+        Bucket=R2_BUCKET_NAME, Key=key,
+        Body=json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"),
+        ContentType="application/json",
+        CacheControl="no-cache"
     )
 
 
+def get_latest_manifest() -> dict:
+    """게시된 최신 스냅샷 manifest (없으면 None)"""
+    return _get_json(SNAPSHOT_POINTER_KEY)
+
+
+def publish_snapshot(snapshot_dir: str = "snapshot") -> bool:
+    """
+    db_snapshot.py 결과물 게시
+    1. snapshots/{generation}/real_estate.db.zst (+ 핫 서브셋) 업로드
+    2. snapshots/{generation}/manifest.json 업로드
+    3. snapshots/latest.json 교체 (단일 PUT → 원자적 전환)
+    읽는 쪽은 latest.json만 따라가므로 업로드 중인 스냅샷은 보이지 않음
+    """
+    manifest_path = os.path.join(snapshot_dir, "manifest.json")
+    if not os.path.exists(manifest_path):
+        print(f"[R2] Snapshot manifest not found: {manifest_path}")
+        return False
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        generation = manifest["generation"]
+        prefix = f"{SNAPSHOT_PREFIX}/{generation}"
+        zst_path = os.path.join(snapshot_dir, manifest["compressed"]["file"])
+        start = datetime.now()
+
+        print(f"[R2] Publishing snapshot {generation} "
+              f"({manifest['compressed']['size'] / 1024 / 1024:.1f} MB compressed)...")
+        info = upload_object(zst_path, f"{prefix}/{manifest['compressed']['file']}", metadata={
+            "generation": generation,
+            "uploaded-at": datetime.now().isoformat(),
+        })
+        if info["sha256"] != manifest["compressed"]["sha256"]:
+            raise IOError("Compressed snapshot changed during upload")
+
+        if manifest.get("hot"):
+            hot = manifest["hot"]
+            hot_info = upload_object(os.path.join(snapshot_dir, hot["file"]), f"{prefix}/{hot['file']}",
+                                     metadata={"generation": generation})
+            if hot_info["sha256"] != hot["sha256"]:
+                raise IOError("Hot subset changed during upload")
+            hot["key"] = f"{prefix}/{hot['file']}"
+
+        manifest["key"] = f"{prefix}/{manifest['compressed']['file']}"
+        manifest["published_at"] = datetime.now().isoformat()
+        _put_json(f"{prefix}/manifest.json", manifest)
+        _put_json(SNAPSHOT_POINTER_KEY, manifest)
+
+        elapsed = (datetime.now() - start).total_seconds()
+        print(f"[R2] Snapshot published: {generation} ({elapsed:.1f}s)")
+        return True
+
+    except Exception as e:
+        print(f"[R2] Snapshot publish failed: {e}")
+        return False
+
+
+def _iter_file_chunks(path: str):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _decompress_to(chunks, local_path: str, key: str, zst_sha: str, db_sha: str):
+    """
+    zstd 청크를 local_path + ".part"에 풀고 압축본/원본 SHA-256 검증 후 원자적으로 교체
+    - 중간에 실패하면(중단 포함) .part를 지우고 예외를 다시 던짐
+    """
+    import zstandard
+
+    part_path = local_path + ".part"
+    zst_hash = hashlib.sha256()
+    db_hash = hashlib.sha256()
+    dobj = zstandard.ZstdDecompressor().decompressobj()
+    try:
+        with open(part_path, "wb") as out:
+            for chunk in chunks:
+                zst_hash.update(chunk)
+                data = dobj.decompress(chunk)
+                if data:
+                    db_hash.update(data)
+                    out.write(data)
+            data = dobj.flush()
+            if data:
+                db_hash.update(data)
+                out.write(data)
+            out.flush()
+            os.fsync(out.fileno())
+
+        errors = []
+        if zst_hash.hexdigest() != zst_sha:
+            errors.append("compressed")
+        if db_hash.hexdigest() != db_sha:
+            errors.append("db")
+        if errors:
+            raise IOError(f"Checksum mismatch for {key}: {', '.join(errors)}")
+
+        os.replace(part_path, local_path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+
+def _stream_decompress(key: str, local_path: str, zst_sha: str, db_sha: str) -> int:
+    """
+    zstd 오브젝트를 받으면서 바로 압축 해제 (압축본을 디스크에 따로 저장하지 않음)
+    - 압축본/원본 SHA-256 모두 검증 후 원자적으로 교체, 압축본 크기 반환
+    - 스트리밍은 이어받지 않음 (압축 해제 상태를 저장할 수 없어 실패 시 .part 폐기)
+    - 스트리밍이 실패하면 압축본을 local_path + ".zst"로 download_object 후 압축 해제
+      → 이 경로는 완료 파트를 기록하므로 다음 호출 시 남은 파트만 이어받음
+    """
+    client = get_r2_client()
+    head = client.head_object(Bucket=R2_BUCKET_NAME, Key=key)
+    zst_path = local_path + ".zst"
+
+    if not os.path.exists(zst_path + ".part.json"):
+        try:
+            _decompress_to(
+                _iter_object_chunks(key, head["ETag"], head["ContentLength"],
+                                    STREAM_PART_SIZE_MB * 1024 * 1024, CONCURRENCY),
+                local_path, key, zst_sha, db_sha
+            )
+            return head["ContentLength"]
+        except Exception as e:
+            print(f"[R2] Streaming download failed ({e}), falling back to {zst_path}")
+    else:
+        print(f"[R2] Resuming compressed download: {zst_path}")
+
+    download_object(key, zst_path)
+    try:
+        _decompress_to(_iter_file_chunks(zst_path), local_path, key, zst_sha, db_sha)
+    finally:
+        os.remove(zst_path)
+    return head["ContentLength"]
+
+
+def _write_local_manifest(local_path: str, manifest: dict):
+    with open(local_path + MANIFEST_SUFFIX, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def download_snapshot(local_path: str, manifest: dict) -> dict:
+    """
+    전체 스냅샷 다운로드 (스트리밍 압축 해제)
+    - manifest는 local_path + ".manifest.json"에 함께 저장
+    """
+    compressed_size = _stream_decompress(
+        manifest["key"], local_path,
+        manifest["compressed"]["sha256"], manifest["db"]["sha256"]
+    )
+    _write_local_manifest(local_path, manifest)
+    return {"size": manifest["db"]["size"], "compressed_size": compressed_size}
+
+
+def download_hot_db(local_path: str = None) -> bool:
+    """
+    핫 서브셋 DB 다운로드 (콜드 스타트 시 전체 DB 도착 전까지 서빙용)
+    - 세대는 "{generation}-hot"으로 기록하여 전체 DB 캐시와 섞이지 않게 함
+    """
+    local_path = local_path or LOCAL_DB_PATH
+
+    try:
+        start = datetime.now()
+        manifest = get_latest_manifest()
+        if not manifest or not manifest.get("hot"):
+            print("[R2] Hot subset not published")
+            return False
+
+        hot = manifest["hot"]
+        compressed_size = _stream_decompress(hot["key"], local_path, hot["sha256"], hot["db_sha256"])
+        _write_local_manifest(local_path, dict(manifest, generation=f"{manifest['generation']}-hot", partial=True))
+
+        elapsed = (datetime.now() - start).total_seconds()
+        print(f"[R2] Hot subset downloaded: {local_path} "
+              f"({compressed_size / 1024 / 1024:.1f} MB -> {hot['db_size'] / 1024 / 1024:.1f} MB, "
+              f"since {hot['cutoff']}, {elapsed:.1f}s)")
+        return True
+
+    except Exception as e:
+        print(f"[R2] Hot subset download failed: {e}")
+        return False
+
+
 def download_db(local_path: str = None) -> bool:
-    """R2에서 DB 파일 다운로드"""
+    """
+    R2에서 DB 파일 다운로드
+    - 게시된 스냅샷이 있으면 스트리밍 압축 해제 다운로드
+    - 없으면 기존 단일 파일(real_estate.db)을 병렬 + 이어받기 + 체크섬 검증으로 다운로드
+    """
+    from botocore.exceptions import ClientError
+
     local_path = local_path or LOCAL_DB_PATH
 
     try:
-        client = get_r2_client()
-        print(f"[R2] Downloading {DB_FILENAME} from R2...")
+        start = datetime.now()
+        manifest = get_latest_manifest()
+
+        if manifest:
+            print(f"[R2] Downloading snapshot {manifest['generation']} from R2...")
+            info = download_snapshot(local_path, manifest)
+            elapsed = (datetime.now() - start).total_seconds()
+            print(f"[R2] Download complete: {local_path} "
+                  f"({info['compressed_size'] / 1024 / 1024:.1f} MB -> {info['size'] / 1024 / 1024:.1f} MB, "
+                  f"{elapsed:.1f}s, verified)")
+            return True
 
-        client.download_file(R2_BUCKET_NAME, DB_FILENAME, local_path)
+        print(f"[R2] Downloading {DB_FILENAME} from R2...")
+        info = download_object(DB_FILENAME, local_path)
 
-        size_mb = os.path.getsize(local_path) / (1024 * 1024)
-        print(f"[R2] Download complete: {local_path} ({size_mb:.1f} MB)")
+        elapsed = (datetime.now() - start).total_seconds()
+        size_mb = info["size"] / (1024 * 1024)
+        verified = "verified" if info["sha256"] else "no checksum"
+        print(f"[R2] Download complete: {local_path} ({size_mb:.1f} MB, {elapsed:.1f}s, {verified})")
         return True
 
-    except client.exceptions.NoSuchKey:
-        print(f"[R2] File not found in R2: {DB_FILENAME}")
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            print(f"[R2] File not found in R2: {DB_FILENAME}")
+        else:
+            print(f"[R2] Download failed: {e}")
         return False
     except Exception as e:
         print(f"[R2] Download failed: {e}")
@@ -65,7 +537,7 @@ def download_db(local_path: str = None) -> bool:
 
 
 def upload_db(local_path: str = None) -> bool:
-    """DB 파일을 R2에 업로드"""
+    """DB 파일을 R2에 업로드 (병렬 멀티파트 + 체크섬)"""
     local_path = local_path or LOCAL_DB_PATH
 
     if not os.path.exists(local_path):
@@ -73,24 +545,22 @@ def upload_db(local_path: str = None) -> bool:
         return False
 
     try:
-        client = get_r2_client()
         size_mb = os.path.getsize(local_path) / (1024 * 1024)
         print(f"[R2] Uploading {local_path} ({size_mb:.1f} MB) to R2...")
+        start = datetime.now()
 
         # 메타데이터 추가
-        client.upload_file(
+        info = upload_object(
             local_path,
-            R2_BUCKET_NAME,
             DB_FILENAME,
-            ExtraArgs={
-                "Metadata": {
-                    "uploaded-at": datetime.now().isoformat(),
-                    "size-mb": str(round(size_mb, 1))
-                }
+            metadata={
+                "uploaded-at": datetime.now().isoformat(),
+                "size-mb": str(round(size_mb, 1))
             }
         )
 
-        print(f"[R2] Upload complete: {DB_FILENAME}")
+        elapsed = (datetime.now() - start).total_seconds()
+        print(f"[R2] Upload complete: {DB_FILENAME} ({info['parts']} parts, {elapsed:.1f}s, sha256={info['sha256'][:12]})")
         return True
 
     except Exception as e:
@@ -100,6 +570,8 @@ def upload_db(local_path: str = None) -> bool:
 
 def get_db_info() -> dict:
     """R2에 저장된 DB 정보 조회"""
+    from botocore.exceptions import ClientError
+
     try:
         client = get_r2_client()
         response = client.head_object(Bucket=R2_BUCKET_NAME, Key=DB_FILENAME)
@@ -112,7 +584,7 @@ def get_db_info() -> dict:
             "metadata": response.get("Metadata", {})
         }
 
-    except client.exceptions.ClientError as e:
+    except ClientError as e:
         if e.response["Error"]["Code"] == "404":
             return {"exists": False}
         raise
@@ -124,7 +596,7 @@ if __name__ == "__main__":
     import sys
 
     if len(sys.argv) < 2:
-        print("Usage: python r2_utils.py <download|upload|info>")
+        print("Usage: python r2_utils.py <download|download-hot|upload|publish [snapshot_dir]|info>")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -133,16 +605,32 @@ if __name__ == "__main__":
         success = download_db()
         sys.exit(0 if success else 1)
 
+    elif command == "download-hot":
+        success = download_hot_db()
+        sys.exit(0 if success else 1)
+
     elif command == "upload":
         success = upload_db()
         sys.exit(0 if success else 1)
 
+    elif command == "publish":
+        success = publish_snapshot(sys.argv[2] if len(sys.argv) > 2 else "snapshot")
+        sys.exit(0 if success else 1)
+
     elif command == "info":
+        manifest = get_latest_manifest()
+        if manifest:
+            print(f"Latest snapshot: {manifest['generation']}")
+            print(f"  Size: {manifest['db']['size'] / 1024 / 1024:.1f} MB "
+                  f"({manifest['compressed']['size'] / 1024 / 1024:.1f} MB compressed)")
+            print(f"  Rows: {manifest['row_counts']}")
         info = get_db_info()
         if info.get("exists"):
             print(f"DB exists in R2:")
             print(f"  Size: {info['size_mb']} MB")
             print(f"  Last modified: {info['last_modified']}")
+            if info["metadata"].get(CHECKSUM_META_KEY):
+                print(f"  SHA-256: {info['metadata'][CHECKSUM_META_KEY]}")
         else:
             print("DB not found in R2")
             if "error" in info:
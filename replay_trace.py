@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+요청 트레이스 재생 (request_trace.py가 기록한 JSONL → 로컬 서버)
+- 원래 시간 간격대로 요청 (--speed 1 = 실시간, 10 = 10배 빠르게, 0 = 간격 없이)
+- 동시 요청 수 상한 = 트레이스의 최대 동시 진행 수 (원래 트래픽의 동시성 재현, --concurrency로 변경)
+- 라우트 템플릿별 지연 분포(p50/p95/p99) + 원래 지연 + 캐시 히트율 + 상태 코드 불일치
+- 캐시 크기/쿼리 변경을 실제 접근 편중(인기 단지, 뉴스 후 검색 폭주, 사이트맵 크롤링)으로 평가
+
+Usage:
+  python replay_trace.py trace.jsonl [trace.jsonl.1 ...] [--base http://127.0.0.1:8000]
+                         [--speed 1] [--concurrency N] [--limit N] [--route /api/search] [--out report.json]
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+import http.client
+import urllib.parse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_api import percentile
+
+
+def load_trace(paths: list, limit: int = 0, route: str = "") -> list:
+    events = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 기록 중 잘린 마지막 줄
+                if route and not event["r"].startswith(route):
+                    continue
+                events.append(event)
+    events.sort(key=lambda e: e["t"])
+    return events[:limit] if limit else events
+
+
+def peak_concurrency(events: list) -> int:
+    """원래 트래픽에서 동시에 진행 중이던 요청 수의 최대값"""
+    edges = []
+    for e in events:
+        edges.append((e["t"], 1))
+        edges.append((e["t"] + e["ms"] / 1000, -1))
+    edges.sort(key=lambda x: (x[0], x[1]))
+    current = peak = 0
+    for _, delta in edges:
+        current += delta
+        peak = max(peak, current)
+    return max(peak, 1)
+
+
+class Replayer:
+    def __init__(self, base: str, speed: float, concurrency: int):
+        url = urllib.parse.urlsplit(base)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.speed = speed
+        self.concurrency = concurrency
+        self.local = threading.local()
+        self.results = []
+        self.lock = threading.Lock()
+
+    def connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=120)
+        return conn
+
+    def send(self, event: dict, scheduled: float):
+        target = urllib.parse.quote(event["p"]) + (f"?{event['q']}" if event["q"] else "")
+        lag = time.perf_counter() - scheduled
+        start = time.perf_counter()
+        try:
+            conn = self.connection()
+            conn.request("GET", target)
+            resp = conn.getresponse()
+            resp.read()
+            status, cache = resp.status, resp.getheader("X-Cache", "")
+        except (OSError, http.client.HTTPException):
+            self.local.conn = None
+            status, cache = 0, ""
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.results.append({"route": event["r"], "status": status, "original_status": event["s"],
+                                 "ms": elapsed * 1000, "original_ms": event["ms"], "cache": cache,
+                                 "lag_ms": lag * 1000})
+
+    def run(self, events: list) -> float:
+        t0 = events[0]["t"]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for event in events:
+                scheduled = start + ((event["t"] - t0) / self.speed if self.speed > 0 else 0)
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.send, event, scheduled)
+        return time.perf_counter() - start
+
+
+def report(results: list) -> dict:
+    routes = defaultdict(list)
+    for r in results:
+        routes[r["route"]].append(r)
+    summary = {}
+    for route, rows in sorted(routes.items(), key=lambda x: -len(x[1])):
+        ms = [r["ms"] for r in rows]
+        original = [r["original_ms"] for r in rows]
+        summary[route] = {
+            "requests": len(rows),
+            "errors": sum(1 for r in rows if r["status"] == 0 or r["status"] >= 500),
+            "status_mismatch": sum(1 for r in rows if r["status"] != r["original_status"]),
+            "cache_hit_ratio": round(sum(1 for r in rows if r["cache"] == "HIT") / len(rows), 3),
+            "p50_ms": round(percentile(ms, 50), 2),
+            "p95_ms": round(percentile(ms, 95), 2),
+            "p99_ms": round(percentile(ms, 99), 2),
+            "max_ms": round(max(ms), 2),
+            "original_p50_ms": round(percentile(original, 50), 2),
+            "original_p99_ms": round(percentile(original, 99), 2),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay an anonymized request trace")
+    parser.add_argument("traces", nargs="+", help="트레이스 JSONL (회전된 .1 파일 포함 가능)")
+    parser.add_argument("--base", default="http://127.0.0.1:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="재생 배속 (0 = 간격 없이)")
+    parser.add_argument("--concurrency", type=int, default=0, help="동시 요청 상한 (기본: 트레이스 최대 동시 수)")
+    parser.add_argument("--limit", type=int, default=0, help="앞에서부터 N개만")
+    parser.add_argument("--route", default="", help="라우트 템플릿 접두어로 필터")
+    parser.add_argument("--out", default="", help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    events = load_trace(args.traces, args.limit, args.route)
+    if not events:
+        print("[REPLAY] No events")
+        sys.exit(1)
+    span = events[-1]["t"] - events[0]["t"]
+    concurrency = args.concurrency or peak_concurrency(events)
+    print(f"[REPLAY] {len(events)} requests over {span:.1f}s, speed {args.speed}x, concurrency {concurrency}")
+
+    replayer = Replayer(args.base, args.speed, concurrency)
+    elapsed = replayer.run(events)
+    results = replayer.results
+    lags = [r["lag_ms"] for r in results]
+    summary = report(results)
+
+    print(f"{'route':<40}{'n':>6}{'err':>5}{'diff':>5}{'hit':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'orig p50':>10}{'orig p99':>10}")
+    for route, r in summary.items():
+        print(f"{route[:39]:<40}{r['requests']:>6}{r['errors']:>5}{r['status_mismatch']:>5}{r['cache_hit_ratio']:>6.2f}"
+              f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['original_p50_ms']:>10.2f}{r['original_p99_ms']:>10.2f}")
+    print(f"[REPLAY] Done in {elapsed:.1f}s ({len(results) / elapsed:.1f} req/s), "
+          f"schedule lag p50 {percentile(lags, 50):.1f}ms / p99 {percentile(lags, 99):.1f}ms")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"requests": len(results), "speed": args.speed, "concurrency": concurrency,
+                       "elapsed_sec": round(elapsed, 2), "routes": summary}, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"[REPLAY] Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+요청 트레이스 기록 (실제 트래픽 재생용, 익명화)
+- GET 요청 한 줄씩 JSONL: {"t": 시작 epoch초, "p": 경로, "q": 쿼리, "r": 라우트 템플릿,
+                          "s": 상태 코드, "ms": 지연, "c": 캐시 상태}
+- 클라이언트 IP/헤더/쿠키는 남기지 않고, 관리용 파라미터(secret 등)는 제거
+- 기록은 큐 → 전용 스레드에서 파일에 추가 (이벤트 루프에서 디스크 I/O 없음)
+- 파일이 max_bytes를 넘으면 <path>.1로 교체 (최근 두 파일만 유지)
+- 재생: replay_trace.py
+"""
+
+import os
+import json
+import queue
+import random
+import threading
+import urllib.parse
+
+SENSITIVE_PARAMS = {"secret", "profile", "last_event_id"}
+FLUSH_BATCH = 200
+
+
+def anonymize_query(query: str) -> str:
+    """관리용/식별 가능 파라미터 제거 후 다시 인코딩"""
+    if not query:
+        return ""
+    params = [(k, v) for k, v in urllib.parse.parse_qsl(query, keep_blank_values=True)
+              if k not in SENSITIVE_PARAMS]
+    return urllib.parse.urlencode(params)
+
+
+class TraceWriter:
+    def __init__(self, path: str, sample_rate: float = 1.0, max_bytes: int = 100 * 1024 * 1024):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="request-trace", daemon=True)
+        self._thread.start()
+
+    def record(self, start: float, path: str, query: str, route: str, status: int, elapsed: float, cache: str = ""):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.dropped += 1
+            return
+        event = {"t": round(start, 3), "p": path, "q": anonymize_query(query), "r": route or path,
+                 "s": status, "ms": round(elapsed * 1000, 2)}
+        if cache:
+            event["c"] = cache
+        self._queue.put(event)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < FLUSH_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = batch[-1] is None
+            events = [e for e in batch if e is not None]
+            if events:
+                try:
+                    self._write(events)
+                except OSError as e:
+                    print(f"[TRACE] Write failed: {e}", flush=True)
+            if done:
+                return
+
+    def _write(self, events: list):
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            os.replace(self.path, self.path + ".1")
+        with open(self.path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.written += len(events)
+
+    def stats(self) -> dict:
+        return {"path": self.path, "sample_rate": self.sample_rate, "written": self.written,
+                "dropped": self.dropped, "pending": self._queue.qsize()}
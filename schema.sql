@@ -41,12 +41,47 @@ CREATE TABLE transaction_insights (
     summary_text TEXT                -- 룰 기반 자동 생성 한줄평
 );
 
--- 5. 인덱스 최적화
+-- 5. 거래가 있는 아파트 (수집 시 ingest.record_deal로 갱신, sitemap 샤드용)
+CREATE TABLE apartments_with_deals (
+    apt_id INTEGER PRIMARY KEY,
+    tx_count INTEGER NOT NULL DEFAULT 0,
+    first_deal_date TEXT,
+    last_deal_date TEXT,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 5-1. (단지, 평형 버킷)별 전고점 / 마지막 거래가 (수집 시 ingest.record_price로 갱신)
+CREATE TABLE price_peaks (
+    apt_id INTEGER NOT NULL,
+    area_bucket INTEGER NOT NULL,    -- 전용면적 반올림
+    peak_amount INTEGER NOT NULL,
+    peak_date TEXT NOT NULL,
+    last_amount INTEGER NOT NULL,
+    last_date TEXT NOT NULL,
+    deal_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (apt_id, area_bucket)
+);
+
+-- 5-2. 신고가 / 전고점 대비 큰 하락 거래 (리더보드용, 최근 400일만 유지)
+CREATE TABLE deal_events (
+    transaction_id INTEGER PRIMARY KEY,
+    apt_id INTEGER NOT NULL,
+    area_bucket INTEGER NOT NULL,
+    deal_date TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    kind TEXT NOT NULL,              -- new_high | drop
+    reference_amount INTEGER NOT NULL, -- 직전 전고점
+    change_pct REAL NOT NULL,        -- 전고점 대비 상승/하락폭 (%)
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 6. 인덱스 최적화
 CREATE INDEX idx_trans_deal_date ON transactions(deal_date DESC);
 CREATE INDEX idx_trans_apt_id ON transactions(apt_id);
 CREATE INDEX idx_apt_lawd_cd ON apartments(lawd_cd);
+CREATE INDEX idx_deal_events_kind_date ON deal_events(kind, deal_date);
 
--- 6. FTS5 풀텍스트 검색 (trigram 토크나이저로 한글 부분 문자열 검색 지원)
+-- 7. FTS5 풀텍스트 검색 (trigram 토크나이저로 한글 부분 문자열 검색 지원)
 CREATE VIRTUAL TABLE apartments_fts USING fts5(
     name,
     dong,
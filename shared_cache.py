@@ -0,0 +1,109 @@
+"""
+워커 간 공유 캐시 (L2) + 무효화 버스
+- uvicorn --workers N 으로 실행 시 워커마다 프로세스 메모리(CACHE)가 따로 있음
+- 계산된 결과를 SQLite 파일(WAL)에 저장해 다른 워커가 재사용
+- 무효화/DB 교체 이벤트를 events 테이블에 기록 → 각 워커가 주기적으로 폴링해서 반영
+
+엔트리 신선도: created_at이 마지막 무효화 시각보다 이전이면 stale
+(무효화 시 행을 지우지 않음 → stale-while-revalidate 유지)
+"""
+
+import json
+import time
+import sqlite3
+import threading
+
+BUSY_TIMEOUT_MS = 5000
+EVENT_RETENTION = 1000  # 최근 이벤트만 보관
+
+
+class SharedCache:
+    """SQLite 기반 워커 간 공유 캐시"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()  # 스레드별 커넥션 (스레드풀에서 호출됨)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                generation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            );
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                origin INTEGER,
+                created_at REAL NOT NULL
+            );
+        """)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    # ---------- 캐시 ----------
+
+    def get(self, namespace: str, key: str, generation: str):
+        """같은 DB 세대에서 계산된 (value, created_at) 또는 None"""
+        row = self._conn().execute(
+            "SELECT value, created_at FROM entries WHERE namespace = ? AND key = ? AND generation = ?",
+            (namespace, key, generation)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, namespace: str, key: str, value, generation: str, created_at: float):
+        conn = self._conn()
+        # 다른 워커가 같은 세대의 더 최신 값을 먼저 넣었으면 덮어쓰지 않음
+        conn.execute("""
+            INSERT INTO entries (namespace, key, value, generation, created_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(namespace, key) DO UPDATE SET
+                value = excluded.value, generation = excluded.generation, created_at = excluded.created_at
+            WHERE excluded.generation != entries.generation OR excluded.created_at > entries.created_at
+        """, (namespace, key, json.dumps(value, ensure_ascii=False), generation, created_at))
+        conn.commit()
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    # ---------- 무효화 버스 ----------
+
+    def publish(self, kind: str, origin: int):
+        """이벤트 기록 ('invalidate' | 'clear' | 'reload') → (id, created_at)"""
+        conn = self._conn()
+        created_at = time.time()
+        cursor = conn.execute(
+            "INSERT INTO events (kind, origin, created_at) VALUES (?, ?, ?)",
+            (kind, origin, created_at)
+        )
+        event_id = cursor.lastrowid
+        if kind == "clear":
+            conn.execute("DELETE FROM entries")
+        conn.execute("DELETE FROM events WHERE id <= ?", (event_id - EVENT_RETENTION,))
+        conn.commit()
+        return event_id, created_at
+
+    def events_since(self, last_id: int) -> list:
+        """last_id 이후 이벤트 [(id, kind, origin, created_at)]"""
+        return self._conn().execute(
+            "SELECT id, kind, origin, created_at FROM events WHERE id > ? ORDER BY id",
+            (last_id,)
+        ).fetchall()
+
+    def last_event(self):
+        """(id, created_at) - 이벤트가 없으면 (0, 0.0)"""
+        row = self._conn().execute(
+            "SELECT id, created_at FROM events ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        return row or (0, 0.0)
@@ -1,12 +1,34 @@
 #!/bin/bash
 # Render 시작 스크립트
-# 서버 먼저 시작 → 백그라운드로 DB 다운로드 (health check 타임아웃 방지)
+# 핫 서브셋 다운로드 → 서버 시작 → 백그라운드로 전체 DB 다운로드 (health check 타임아웃 방지)
 
 echo "=== Starting API Server ==="
 echo "Time: $(date)"
 
-# DB 파일 확인 (1MB 이상이면 유효한 DB로 간주)
-if [ -f "real_estate.db" ] && [ $(stat -f%z "real_estate.db" 2>/dev/null || stat -c%s "real_estate.db" 2>/dev/null) -gt 1000000 ]; then
+# 핫 서브셋 여부 (snapshot_info.kind = 'hot')
+is_hot_subset() {
+    python -c "
+import sqlite3, sys
+conn = sqlite3.connect('real_estate.db')
+try:
+    row = conn.execute(\"SELECT value FROM snapshot_info WHERE key = 'kind'\").fetchone()
+except sqlite3.Error:
+    row = None
+sys.exit(0 if row and row[0] == 'hot' else 1)
+"
+}
+
+# 전체 DB 도착 전까지 서빙할 핫 서브셋 (최근 N개월) 먼저 다운로드
+if [ ! -f "real_estate.db" ] && [ -n "$R2_ENDPOINT" ]; then
+    echo "[STARTUP] Downloading hot subset DB from R2..."
+    python r2_utils.py download-hot || echo "[STARTUP] Hot subset unavailable"
+fi
+
+# DB 파일 확인 (1MB 이상이면 유효한 DB로 간주, 핫 서브셋이면 전체 DB 다운로드 필요)
+if [ -f "real_estate.db" ] && is_hot_subset; then
+    DB_SIZE=$(du -h real_estate.db | cut -f1)
+    echo "[STARTUP] Serving hot subset ($DB_SIZE) until the full database arrives"
+elif [ -f "real_estate.db" ] && [ $(stat -f%z "real_estate.db" 2>/dev/null || stat -c%s "real_estate.db" 2>/dev/null) -gt 1000000 ]; then
     DB_SIZE=$(du -h real_estate.db | cut -f1)
     echo "[STARTUP] Existing database found: $DB_SIZE - skipping download"
     SKIP_DOWNLOAD=1
@@ -47,12 +69,16 @@ EOF
 fi
 
 # 서버를 먼저 시작 (백그라운드)
-echo "[STARTUP] Starting uvicorn in background..."
-uvicorn api_server:app --host 0.0.0.0 --port ${PORT:-8000} &
+# WEB_CONCURRENCY > 1 이면 워커 간 공유 캐시(cache_shared.db) + 무효화 버스 자동 사용
+echo "[STARTUP] Starting uvicorn in background (workers: ${WEB_CONCURRENCY:-1})..."
+uvicorn api_server:app --host 0.0.0.0 --port ${PORT:-8000} --workers ${WEB_CONCURRENCY:-1} &
 SERVER_PID=$!
 
-# 서버가 시작될 때까지 잠시 대기
-sleep 3
+# 서버가 요청을 받을 수 있을 때까지 대기 (/healthz는 DB 조회 없음)
+for i in $(seq 1 60); do
+    curl -sf "http://localhost:${PORT:-8000}/healthz" > /dev/null && break
+    sleep 0.5
+done
 
 # R2에서 DB 다운로드
 if [ "$SKIP_DOWNLOAD" = "1" ]; then
@@ -60,20 +86,24 @@ if [ "$SKIP_DOWNLOAD" = "1" ]; then
 elif [ -n "$R2_ENDPOINT" ]; then
     echo "[STARTUP] Downloading database from R2 in background..."
     (
-        # 서버가 시작될 때까지 대기
-        sleep 5
-
         # DB 다운로드를 직접 하지 않고 API로 요청
         echo "[STARTUP] Triggering DB reload via API..."
-        curl -s -X POST "http://localhost:${PORT:-8000}/api/db/reload?secret=%EC%88%98%EC%A7%91%EC%99%84%EB%A3%8C" --max-time 300 && {
+        # secret은 api_server와 같은 ADMIN_SECRET (미설정/빈 값이면 기본값)
+        STATUS=$(curl -s -o /dev/null -w "%{http_code}" -G -X POST \
+            --data-urlencode "secret=${ADMIN_SECRET:-수집완료}" \
+            "http://localhost:${PORT:-8000}/api/db/reload" --max-time 300)
+        if [ "$STATUS" = "200" ]; then
             echo "[STARTUP] Database reload complete!"
-        } || {
-            echo "[STARTUP] API reload failed, trying direct download..."
+        elif [ "$STATUS" = "403" ]; then
+            # 직접 다운로드로 파일만 바꾸면 서버는 교체를 모름 (캐시/핫 모드 그대로) → 설정 오류로 중단
+            echo "[STARTUP] DB reload rejected (HTTP 403: ADMIN_SECRET mismatch) - still serving current DB"
+        else
+            echo "[STARTUP] API reload failed (HTTP ${STATUS:-000}), trying direct download..."
             python r2_utils.py download && {
                 DB_SIZE=$(du -h real_estate.db | cut -f1)
                 echo "[STARTUP] Database downloaded: $DB_SIZE"
-            }
-        }
+            } || echo "[STARTUP] Direct download failed - still serving current DB"
+        fi
     ) &
 else
     echo "[STARTUP] R2 not configured, skipping DB download"
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+결정적(시드 고정) 합성 DB 생성 - 쿼리 예산 검사/벤치마크용
+- schema.sql 그대로 사용, API가 서빙하는 수도권 전 지역(REGION_HIERARCHY)에 단지 분산
+- 단지별 거래 수는 롱테일 (일부 대단지에 거래 집중), 지역별 가격 수준 + 연도별 추세 + 노이즈
+- 거래일은 2006-01-01 ~ 기준일(기본 오늘)이라 최근 30일/1년 등 상대 기간 쿼리에도 데이터가 있음
+- 수집 상태 테이블(apartments_with_deals, price_peaks/deal_events, data_meta)까지 채움
+
+Usage: python synthetic_db.py <out.db> [transactions=100000] [seed=42]
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import hashlib
+from datetime import date, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+START_DATE = date(2006, 1, 1)
+TX_PER_APARTMENT = 150      # 평균 단지당 거래 수 (단지 수 = 거래 수 / 이 값)
+MIN_APARTMENTS_PER_REGION = 3
+INSIGHT_RATIO = 0.3         # 한줄평이 있는 거래 비율
+BATCH = 50000
+
+BRANDS = ["래미안", "자이", "힐스테이트", "푸르지오", "e편한세상", "아이파크", "롯데캐슬",
+          "더샵", "SK뷰", "현대", "삼성", "한양", "주공", "대림", "쌍용", "벽산"]
+AREAS = [39.6, 49.9, 59.9, 74.9, 84.9, 101.9, 114.9, 134.8]
+AREA_WEIGHTS = [3, 5, 25, 10, 35, 8, 8, 6]
+SUMMARIES = ["평이한 거래", "전고점 대비 하락 거래", "신고가 거래", "저층 급매 추정"]
+
+
+def region_codes():
+    """api_server와 같은 지역 목록 {code: (시도, 구/시)}"""
+    sys.path.insert(0, BASE_DIR)
+    from api_server import REGION_HIERARCHY
+    return {code: (city, name) for city, districts in REGION_HIERARCHY.items()
+            for code, name in districts.items()}
+
+
+def price_level(code: str) -> float:
+    """지역별 84㎡ 기준 가격 수준 (만원, 2006년)"""
+    if code in ("11680", "11650", "11710", "11170"):  # 강남/서초/송파/용산
+        return 90000
+    if code.startswith("11"):
+        return 45000
+    if code.startswith("41"):
+        return 28000
+    return 20000
+
+
+def build(path: str, transactions: int = 100000, seed: int = 42, as_of: date = None) -> dict:
+    from ingest import ensure_ingest_tables, rebuild_apartments_with_deals, rebuild_price_peaks, bump_data_version
+
+    rng = random.Random(seed)
+    as_of = as_of or date.today()
+    span_days = (as_of - START_DATE).days
+    regions = region_codes()
+
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    with open(os.path.join(BASE_DIR, "schema.sql"), "r", encoding="utf-8") as f:
+        conn.executescript(f.read())
+    start = time.time()
+
+    # 지역 / 단지
+    conn.executemany("INSERT INTO regions (code, city_name, district_name) VALUES (?, ?, ?)",
+                     [(code, city, name) for code, (city, name) in regions.items()])
+    apt_count = max(transactions // TX_PER_APARTMENT, len(regions) * MIN_APARTMENTS_PER_REGION)
+    codes = list(regions)
+    apartments = []
+    for i in range(1, apt_count + 1):
+        code = codes[(i - 1) % len(codes)] if i <= len(codes) * MIN_APARTMENTS_PER_REGION else rng.choice(codes)
+        district = regions[code][1]
+        apartments.append((
+            i, f"{rng.choice(BRANDS)}{district[:2]}{i}단지", code,
+            f"{district[:2]}{rng.randint(1, 8)}동", str(i), rng.randint(1980, 2024),
+        ))
+    conn.executemany(
+        "INSERT INTO apartments (id, name, lawd_cd, dong, jibun, build_year) VALUES (?, ?, ?, ?, ?, ?)",
+        apartments
+    )
+    conn.execute("INSERT INTO apartments_fts (rowid, name, dong) SELECT id, name, dong FROM apartments")
+
+    # 단지별 거래 비중: 파레토 분포 (소수 대단지에 거래 집중)
+    weights = [rng.paretovariate(2.0) for _ in apartments]
+    levels = [price_level(apt[2]) * rng.uniform(0.6, 1.6) for apt in apartments]
+    apt_ids = [apt[0] for apt in apartments]
+
+    tx_id = 0
+    while tx_id < transactions:
+        n = min(BATCH, transactions - tx_id)
+        picks = rng.choices(range(len(apt_ids)), weights=weights, k=n)
+        rows, insights = [], []
+        for idx in picks:
+            tx_id += 1
+            offset = rng.randint(0, span_days)
+            deal_date = START_DATE + timedelta(days=offset)
+            area = rng.choices(AREAS, weights=AREA_WEIGHTS)[0]
+            trend = 1 + 0.05 * (offset / 365)  # 연 5% 상승
+            amount = int(levels[idx] * (area / 84.9) * trend * rng.uniform(0.85, 1.15))
+            rows.append((tx_id, apt_ids[idx], amount, area, rng.randint(1, 35), deal_date.isoformat(),
+                         hashlib.md5(f"{seed}:{tx_id}".encode()).hexdigest()))
+            if rng.random() < INSIGHT_RATIO:
+                insights.append((tx_id, rng.choice(SUMMARIES)))
+        conn.executemany(
+            "INSERT INTO transactions (id, apt_id, amount, area, floor, deal_date, unique_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        conn.executemany("INSERT INTO transaction_insights (transaction_id, summary_text) VALUES (?, ?)", insights)
+
+    cursor = conn.cursor()
+    if not ensure_ingest_tables(cursor):  # schema.sql이 빈 테이블을 이미 만듦
+        rebuild_apartments_with_deals(cursor)
+    rebuild_price_peaks(cursor)
+    bump_data_version(cursor)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+    info = {"path": path, "apartments": apt_count, "transactions": transactions, "regions": len(regions),
+            "seed": seed, "as_of": as_of.isoformat(), "seconds": round(time.time() - start, 1)}
+    print(f"[SYNTH] {path}: {apt_count} apartments, {transactions} transactions "
+          f"across {len(regions)} regions in {info['seconds']}s")
+    return info
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python synthetic_db.py <out.db> [transactions=100000] [seed=42]")
+        sys.exit(1)
+    build(sys.argv[1],
+          int(sys.argv[2]) if len(sys.argv) > 2 else 100000,
+          int(sys.argv[3]) if len(sys.argv) > 3 else 42)
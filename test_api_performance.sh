@@ -1,5 +1,6 @@
 #!/bin/bash
-# API 성능 테스트 스크립트
+# API 성능 테스트 스크립트 (현재 DB로 빠른 수동 확인용)
+# 합성 DB 규모별 p50/p95/p99 측정 + 회귀 비교는 bench_api.py 사용
 
 API_BASE="http://127.0.0.1:8000"
 RUNS=10
@@ -14,7 +15,7 @@ echo "[테스트 1] 서버 재시작 후 첫 호출 (콜드 스타트)"
 echo "-------------------------------------------"
 lsof -ti :8000 | xargs kill -9 2>/dev/null
 sleep 1
-cd /Users/hongseong-il/.gemini/antigravity/scratch/real-estate-poc
+cd "$(dirname "$0")"
 python3 api_server.py > /dev/null 2>&1 &
 sleep 2
 
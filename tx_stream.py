@@ -0,0 +1,77 @@
+"""
+신규 거래 실시간 피드 (Server-Sent Events)
+- 프로세스당 broadcaster 하나: 수집/DB 교체 이벤트 때 새 거래를 한 번 조회해서 구독자 전체에 분배
+- 시퀀스 번호 = transactions.id (AUTOINCREMENT, 단조 증가) → Last-Event-ID로 이어받기
+- 구독자별 제한된 큐: 느린 클라이언트는 끊고 Last-Event-ID로 재접속 시 DB에서 다시 받게 함
+"""
+
+import json
+import asyncio
+
+QUEUE_SIZE = 1000
+
+
+class Subscriber:
+    __slots__ = ("queue", "regions", "overflowed")
+
+    def __init__(self, regions: set = None):
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.regions = regions  # None이면 전체
+        self.overflowed = False
+
+    def wants(self, event: dict) -> bool:
+        return self.regions is None or event.get("lawd_cd") in self.regions
+
+
+class TransactionBroadcaster:
+    def __init__(self):
+        self.subscribers = set()
+        self.last_seq = 0
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, regions: set = None) -> Subscriber:
+        sub = Subscriber(regions)
+        self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        self.subscribers.discard(sub)
+
+    def publish(self, events: list):
+        """id 오름차순 거래 목록 분배 (이벤트 루프에서 호출)"""
+        for event in events:
+            self.last_seq = max(self.last_seq, event["id"])
+            self.published += 1
+            for sub in list(self.subscribers):
+                if sub.overflowed or not sub.wants(event):
+                    continue
+                try:
+                    sub.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    sub.overflowed = True  # 스트림 종료 → 클라이언트가 Last-Event-ID로 재접속
+                    self.dropped += 1
+
+    def close(self):
+        """서버 종료 시 모든 스트림 종료"""
+        for sub in list(self.subscribers):
+            sub.overflowed = True
+            try:
+                sub.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscribers),
+            "last_seq": self.last_seq,
+            "published": self.published,
+            "dropped_slow_clients": self.dropped,
+        }
+
+
+def format_event(event: dict, kind: str = "transaction") -> str:
+    data = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+    if kind == "transaction":
+        return f"id: {event['id']}\nevent: {kind}\ndata: {data}\n\n"
+    return f"event: {kind}\ndata: {data}\n\n"